@@ -0,0 +1,13 @@
+"""
+Benchmarks of the render pipeline.
+
+The suite renders synthetic page JSON and times each phase separately, see
+workloads and phases. Everything runs offline: images are generated and
+registered as resources, and only installed fonts are used.
+
+    python -m benchmarks [--scales 1 2 3] [--repeat 5] [--json out.json]
+                         [--baseline old.json]
+
+The scripts next to this package benchmark single features and are run
+directly, e.g. ``python benchmarks/encoding.py``.
+"""
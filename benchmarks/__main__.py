@@ -0,0 +1,138 @@
+"""
+Run the render benchmark suite.
+
+Times every phase of rendering each synthetic workload at each scale and
+prints a table. Results are written as JSON, and compared with the results
+of an earlier run when a baseline is given: the run fails if a phase got
+slower than the threshold allows.
+
+    python -m benchmarks [--workloads deep rounded] [--scales 1 2 3]
+                         [--repeat 5] [--json out.json]
+                         [--baseline old.json] [--threshold 1.25]
+"""
+
+import argparse
+import json
+import platform
+import sys
+from typing import Dict, List, Tuple
+
+import PIL
+
+from .phases import PHASES, time_phases
+from .workloads import WORKLOADS, count_nodes, register_images
+
+
+def _compare(
+    results: List[dict], baseline: List[dict], threshold: float
+) -> List[str]:
+    """
+    Find the phases slower than in a baseline.
+
+    Args:
+        results: The results of this run.
+        baseline: The results of an earlier run.
+        threshold: The largest allowed ratio of new to old time.
+
+    Returns:
+        List[str]: A description of each regression.
+    """
+    old: Dict[Tuple[str, float, str], float] = {
+        (r["workload"], r["scale"], r["phase"]): r["ms"] for r in baseline
+    }
+    regressions = []
+    for result in results:
+        key = (result["workload"], result["scale"], result["phase"])
+        # Phases taking under a millisecond are dominated by noise
+        if key not in old or max(old[key], result["ms"]) < 1:
+            continue
+        ratio = result["ms"] / max(old[key], 1e-6)
+        if ratio > threshold:
+            regressions.append(
+                f"{key[0]} x{key[1]:g} {key[2]}: "
+                f"{old[key]:.2f} -> {result['ms']:.2f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--workloads",
+        nargs="+",
+        choices=list(WORKLOADS),
+        default=list(WORKLOADS),
+    )
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--json",
+        default="benchmark-results.json",
+        help="write the results to this file",
+    )
+    parser.add_argument("--baseline", help="results of an earlier run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="the slowdown over the baseline counted as a regression",
+    )
+    args = parser.parse_args()
+
+    register_images()
+    results: List[dict] = []
+    print(
+        f"{'workload':<14}{'scale':>6}{'nodes':>7}{'painters':>9}"
+        + "".join(f"{phase:>10}" for phase in PHASES)
+    )
+    for name in args.workloads:
+        document = WORKLOADS[name]()
+        nodes = count_nodes(document)
+        for scale in args.scales:
+            times, painters = time_phases(document, scale, repeat=args.repeat)
+            print(
+                f"{name:<14}{scale:>6g}{nodes:>7}{painters:>9}"
+                + "".join(f"{times[phase]:>10.2f}" for phase in PHASES)
+            )
+            results.extend(
+                {
+                    "workload": name,
+                    "scale": scale,
+                    "phase": phase,
+                    "ms": times[phase],
+                    "nodes": nodes,
+                    "painters": painters,
+                }
+                for phase in PHASES
+            )
+
+    with open(args.json, "w") as f:
+        json.dump(
+            {
+                "meta": {
+                    "python": platform.python_version(),
+                    "pillow": PIL.__version__,
+                    "platform": platform.platform(),
+                    "repeat": args.repeat,
+                },
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = _compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark the time/size trade-off of the encoding options.
+
+Renders a synthetic page once and encodes it with each option set, printing
+the median encode time and the output size. Runs offline.
+
+    python benchmarks/encoding.py [--scale 2] [--repeat 5] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image as PILImage
+
+from enana import (
+    BorderRadius,
+    Column,
+    Container,
+    EncodeOptions,
+    Image,
+    Padding,
+    Page,
+    Row,
+    Text,
+    encode_image,
+)
+
+CASES = {
+    "png level 1": EncodeOptions(format="png", compress_level=1),
+    "png level 6 (default)": EncodeOptions(format="png"),
+    "png level 9": EncodeOptions(format="png", compress_level=9),
+    "png level 6 rle": EncodeOptions(format="png", strategy="rle"),
+    "png level 6 huffman": EncodeOptions(format="png", strategy="huffman"),
+    "png level 6 rgba": EncodeOptions(format="png", opaque_rgb=False),
+    "png quantized 256": EncodeOptions(format="png", quantize=256),
+    "webp q90 method 4": EncodeOptions(format="webp"),
+    "webp q90 method 0": EncodeOptions(format="webp", method=0),
+    "webp lossless": EncodeOptions(format="webp", lossless=True, method=0),
+    "jpeg q90": EncodeOptions(format="jpeg"),
+}
+
+
+def _page(image: str) -> Page:
+    rows = [
+        Container(
+            color=(240, 240, 250, 255) if i % 2 else (255, 255, 255, 255),
+            padding=Padding.all(6),
+            child=Row(
+                children=[
+                    Container(
+                        width=40,
+                        height=40,
+                        color=(57, 197, 187, 255),
+                        border_radius=BorderRadius.all(8),
+                    ),
+                    Image(url=image, width=40, height=40),
+                    Text(text=f"Player {i}  Lv.{i * 7 % 99}", font_size=14),
+                ]
+            ),
+        )
+        for i in range(20)
+    ]
+    return Page(
+        child=Container(
+            color=(255, 255, 255, 255), child=Column(children=rows)
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    gradient = PILImage.linear_gradient("L").resize((64, 64))
+    with tempfile.TemporaryDirectory() as directory:
+        image = os.path.join(directory, "gradient.png")
+        PILImage.merge("RGB", [gradient, gradient.rotate(90), gradient]).save(
+            image
+        )
+        frame = _page(image).render(scale=args.scale)
+
+    results = []
+    print(f"{'options':<24}{'ms':>10}{'bytes':>12}")
+    for name, encoding in CASES.items():
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            data = encode_image(frame, encoding)
+            times.append(time.perf_counter() - start)
+        ms = statistics.median(times) * 1000
+        results.append({"options": name, "ms": ms, "bytes": len(data)})
+        print(f"{name:<24}{ms:>10.2f}{len(data):>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"size": frame.size, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
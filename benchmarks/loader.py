@@ -0,0 +1,143 @@
+"""
+Benchmark loading large generated widget documents from JSON.
+
+Builds leaderboard-like documents of increasing size and prints the median
+time of from_json per document and per node, with and without schema
+validation. Validation is skipped when jsonschema is not installed. Runs
+offline.
+
+    python benchmarks/loader.py [--rows 100 1000 5000] [--repeat 5]
+                                [--json out.json]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from enana.utils import from_json
+
+
+def _document(rows: int) -> dict:
+    entries = [
+        {
+            "type": "Container",
+            "color": [240, 240, 250, 255] if i % 2 else [255, 255, 255, 255],
+            "padding": {"top": 6, "right": 12, "bottom": 6, "left": 12},
+            "border_radius": 4,
+            "child": {
+                "type": "Row",
+                "children": [
+                    {
+                        "type": "Text",
+                        "text": f"#{i + 1}",
+                        "font_size": 14,
+                    },
+                    {
+                        "type": "Container",
+                        "width": 32,
+                        "height": 32,
+                        "margin": {
+                            "top": 0,
+                            "right": 8,
+                            "bottom": 0,
+                            "left": 8,
+                        },
+                        "color": [57, 197, 187, 255],
+                        "border_radius": {
+                            "top_left": 16,
+                            "top_right": 4,
+                            "bottom_right": 16,
+                            "bottom_left": 4,
+                        },
+                    },
+                    {
+                        "type": "Column",
+                        "children": [
+                            {"type": "Text", "text": f"Player {i}"},
+                            {
+                                "type": "Text",
+                                "text": f"Lv.{i * 7 % 99}",
+                                "font_size": 10,
+                                "color": [120, 120, 120, 255],
+                            },
+                        ],
+                    },
+                ],
+            },
+        }
+        for i in range(rows)
+    ]
+    return {
+        "type": "Page",
+        "child": {
+            "type": "Container",
+            "color": [255, 255, 255, 255],
+            "padding": 10,
+            "child": {"type": "Column", "children": entries},
+        },
+    }
+
+
+def _count(node: dict) -> int:
+    count = 1
+    if "child" in node:
+        count += _count(node["child"])
+    for child in node.get("children", ()):
+        count += _count(child)
+    return count
+
+
+def _time(document: dict, repeat: int, validate: bool) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        from_json(document, validate=validate)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100, 1000, 5000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        import jsonschema  # type: ignore[import]  # noqa: F401
+
+        modes = [False, True]
+    except ImportError:
+        modes = [False]
+
+    results = []
+    print(f"{'rows':>8}{'nodes':>10}{'validate':>10}{'ms':>10}{'us/node':>10}")
+    for rows in args.rows:
+        document = _document(rows)
+        nodes = _count(document)
+        for validate in modes:
+            ms = _time(document, args.repeat, validate) * 1000
+            per_node = ms * 1000 / nodes
+            results.append(
+                {
+                    "rows": rows,
+                    "nodes": nodes,
+                    "validate": validate,
+                    "ms": ms,
+                    "us_per_node": per_node,
+                }
+            )
+            print(
+                f"{rows:>8}{nodes:>10}{str(validate):>10}"
+                f"{ms:>10.2f}{per_node:>10.2f}"
+            )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark the memory held by large widget trees.
+
+Loads a generated document of styled containers with from_json and prints
+the memory still allocated by the widget tree, measured with tracemalloc,
+and the number of bytes per node. Runs offline.
+
+    python benchmarks/memory.py [--nodes 100000] [--json out.json]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from enana.utils import from_json
+
+COLORS = [[255, 255, 255, 255], [240, 240, 250, 255], [57, 197, 187, 255]]
+
+
+def _document(nodes: int) -> dict:
+    # Rows of four styled cells, each cell a container with a child
+    cells_per_row = 4
+    rows = max(nodes // (1 + 2 * cells_per_row), 1)
+    return {
+        "type": "Page",
+        "child": {
+            "type": "Column",
+            "children": [
+                {
+                    "type": "Row",
+                    "color": COLORS[i % 2],
+                    "padding": 4,
+                    "children": [
+                        {
+                            "type": "Container",
+                            "padding": {
+                                "top": 2,
+                                "right": 4,
+                                "bottom": 2,
+                                "left": 4,
+                            },
+                            "margin": 2,
+                            "border_radius": 6,
+                            "color": COLORS[2],
+                            "child": {
+                                "type": "Container",
+                                "width": 16,
+                                "height": 16,
+                                "color": COLORS[j % 2],
+                            },
+                        }
+                        for j in range(cells_per_row)
+                    ],
+                }
+                for i in range(rows)
+            ],
+        },
+    }
+
+
+def _count(node: dict) -> int:
+    count = 1
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        children = node.get("children", [])
+        if "child" in node:
+            children = children + [node["child"]]
+        count += len(children)
+        stack.extend(children)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    document = _document(args.nodes)
+    nodes = _count(document)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    page = from_json(document)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+
+    result = {
+        "nodes": nodes,
+        "held_bytes": held,
+        "peak_bytes": peak,
+        "bytes_per_node": held / nodes,
+        "load_ms": elapsed * 1000,
+    }
+    print(f"nodes           {nodes}")
+    print(f"held            {held / 1024 / 1024:.1f} MiB")
+    print(f"peak            {peak / 1024 / 1024:.1f} MiB")
+    print(f"bytes per node  {held / nodes:.0f}")
+    print(f"load            {elapsed * 1000:.0f} ms (traced)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Time the phases of rendering a page separately.
+
+A render is split into the phases Page.render goes through: loading the
+JSON, laying the page out into painters, rasterizing shapes, drawing texts,
+compositing images and encoding the result. Every repeat starts from the
+JSON with cold caches, so each phase does all of its work.
+"""
+
+import statistics
+import time
+from math import ceil
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image as PILImage
+
+from enana.generator import (
+    EncodeOptions,
+    composite_painters,
+    draw_image,
+    draw_texts,
+    encode_image,
+)
+from enana.glyphs import glyph_cache
+from enana.page import Page
+from enana.painter import ImagePainter
+from enana.typing import RenderQuality
+
+PHASES = ("from_json", "layout", "raster", "text", "image", "encode")
+
+
+def _run_once(
+    json: dict, scale: float, quality: RenderQuality
+) -> Tuple[Dict[str, float], int]:
+    """
+    Render a page once, timing each phase.
+
+    Args:
+        json: The page JSON.
+        scale: Scale factor for the image.
+        quality: Render quality tier.
+
+    Returns:
+        Tuple[Dict[str, float], int]: The seconds spent in each phase and
+        the number of painters.
+    """
+    glyph_cache.clear()
+    times: Dict[str, float] = {}
+
+    def timed(phase: str, func: Callable[[], object]) -> object:
+        start = time.perf_counter()
+        result = func()
+        times[phase] = time.perf_counter() - start
+        return result
+
+    page = timed("from_json", lambda: Page.from_json(json))
+    assert isinstance(page, Page)
+    painters = timed("layout", page._painters)
+    assert isinstance(painters, list)
+    image = PILImage.new(
+        "RGBA",
+        (ceil(page.child.width * scale), ceil(page.child.height * scale)),
+    )
+    timed(
+        "raster",
+        lambda: composite_painters(
+            painters, image.width, image.height, scale, quality, image
+        ),
+    )
+    timed("text", lambda: draw_texts(image, painters, scale, quality))
+
+    def draw_images() -> None:
+        for painter in painters:
+            if isinstance(painter, ImagePainter):
+                draw_image(image, painter, scale, quality)
+
+    timed("image", draw_images)
+    timed("encode", lambda: encode_image(image, EncodeOptions()))
+    return times, len(painters)
+
+
+def time_phases(
+    json: dict,
+    scale: float = 1.0,
+    quality: RenderQuality = RenderQuality.FINAL,
+    repeat: int = 5,
+) -> Tuple[Dict[str, float], int]:
+    """
+    Time each phase of rendering a page.
+
+    Args:
+        json: The page JSON.
+        scale: Scale factor for the image.
+        quality: Render quality tier.
+        repeat: The number of renders.
+
+    Returns:
+        Tuple[Dict[str, float], int]: The median milliseconds of each phase,
+        in the order of PHASES, and the number of painters.
+    """
+    runs: List[Tuple[Dict[str, float], int]] = [
+        _run_once(json, scale, quality) for _ in range(repeat)
+    ]
+    times = {
+        phase: statistics.median(run[phase] for run, _ in runs) * 1000
+        for phase in PHASES
+    }
+    return times, runs[0][1]
@@ -0,0 +1,284 @@
+"""
+Generators of synthetic page JSON stressing one aspect of rendering each.
+
+Every workload is a function of a size parameter returning page JSON that
+conforms to widget.schema.json. Image workloads refer to images registered
+with register_images, so no workload touches the network.
+"""
+
+from typing import Callable, Dict, List
+
+from PIL import Image as PILImage
+
+from enana.resources import register_image
+
+# Registered image resources, see register_images
+IMAGES = ("bench-gradient", "bench-photo", "bench-icon")
+
+WHITE = [255, 255, 255, 255]
+GREY = [240, 240, 250, 255]
+ACCENT = [57, 197, 187, 255]
+INK = [40, 40, 40, 255]
+
+
+def register_images() -> None:
+    """
+    Register the images used by the workloads as resources.
+    """
+    gradient = PILImage.linear_gradient("L").resize((256, 256))
+    register_image(
+        IMAGES[0],
+        PILImage.merge("RGB", [gradient, gradient.rotate(90), gradient]),
+    )
+    noise = PILImage.effect_noise((640, 480), 64).convert("L")
+    register_image(
+        IMAGES[1],
+        PILImage.merge("RGB", [noise, gradient.resize(noise.size), noise]),
+    )
+    icon = PILImage.new("RGBA", (64, 64))
+    icon.paste(tuple(ACCENT), (8, 8, 56, 56))
+    register_image(IMAGES[2], icon)
+
+
+def _page(child: dict) -> dict:
+    return {
+        "type": "Page",
+        "child": {
+            "type": "Container",
+            "color": WHITE,
+            "padding": 10,
+            "child": child,
+        },
+    }
+
+
+def deep(size: int = 400) -> dict:
+    """
+    Containers and rows nested size levels deep around a single text.
+
+    Args:
+        size: The nesting depth.
+
+    Returns:
+        dict: The page JSON.
+    """
+    node: dict = {"type": "Text", "text": "innermost", "font_size": 14}
+    for level in range(size):
+        if level % 2:
+            node = {
+                "type": "Container",
+                "padding": 1,
+                "color": GREY if level % 4 == 1 else WHITE,
+                "child": node,
+            }
+        else:
+            node = {"type": "Row", "children": [node]}
+    return _page(node)
+
+
+def wide_row(size: int = 400) -> dict:
+    """
+    A single row of size cells.
+
+    Args:
+        size: The number of cells.
+
+    Returns:
+        dict: The page JSON.
+    """
+    return _page(
+        {
+            "type": "Row",
+            "children": [
+                {
+                    "type": "Container",
+                    "color": GREY if i % 2 else WHITE,
+                    "padding": 4,
+                    "child": {"type": "Text", "text": str(i), "font_size": 12},
+                }
+                for i in range(size)
+            ],
+        }
+    )
+
+
+def long_column(size: int = 400) -> dict:
+    """
+    A leaderboard of size rows.
+
+    Args:
+        size: The number of rows.
+
+    Returns:
+        dict: The page JSON.
+    """
+    rows = [
+        {
+            "type": "Container",
+            "color": GREY if i % 2 else WHITE,
+            "padding": {"top": 6, "right": 12, "bottom": 6, "left": 12},
+            "child": {
+                "type": "Row",
+                "children": [
+                    {"type": "Text", "text": f"#{i + 1}", "font_size": 14},
+                    {
+                        "type": "Container",
+                        "width": 24,
+                        "height": 24,
+                        "margin": {
+                            "top": 0,
+                            "right": 8,
+                            "bottom": 0,
+                            "left": 8,
+                        },
+                        "color": ACCENT,
+                    },
+                    {"type": "Text", "text": f"Player {i}", "font_size": 14},
+                ],
+            },
+        }
+        for i in range(size)
+    ]
+    return _page({"type": "Column", "children": rows})
+
+
+def text_heavy(size: int = 60) -> dict:
+    """
+    Paragraphs of wrapped Latin, CJK and mixed text.
+
+    Args:
+        size: The number of paragraphs.
+
+    Returns:
+        dict: The page JSON.
+    """
+    samples = [
+        "The quick brown fox jumps over the lazy dog. " * 6,
+        "排行榜每小时更新一次，分数相同时按达成时间排序。" * 4,
+        "Season 3 排名 top 100 players receive 限定 rewards. " * 3,
+    ]
+    return _page(
+        {
+            "type": "Column",
+            "children": [
+                {
+                    "type": "Container",
+                    "padding": 6,
+                    "child": {
+                        "type": "Text",
+                        "text": samples[i % len(samples)],
+                        "font_size": 12 + i % 3 * 2,
+                        "max_width": 480,
+                        "color": INK,
+                    },
+                }
+                for i in range(size)
+            ],
+        }
+    )
+
+
+def image_heavy(size: int = 120) -> dict:
+    """
+    A grid of size images in the three sizing modes.
+
+    Args:
+        size: The number of images.
+
+    Returns:
+        dict: The page JSON.
+    """
+    modes = ["cover", "contain", "default"]
+    columns = 10
+    return _page(
+        {
+            "type": "Column",
+            "children": [
+                {
+                    "type": "Row",
+                    "children": [
+                        {
+                            "type": "Image",
+                            "resource": IMAGES[(row + column) % len(IMAGES)],
+                            "width": 48,
+                            "height": 48,
+                            "size": modes[column % len(modes)],
+                        }
+                        for column in range(columns)
+                    ],
+                }
+                for row in range((size + columns - 1) // columns)
+            ],
+        }
+    )
+
+
+def rounded(size: int = 400) -> dict:
+    """
+    A grid of size cards with assorted rounded corners.
+
+    Args:
+        size: The number of cards.
+
+    Returns:
+        dict: The page JSON.
+    """
+    columns = 20
+    return _page(
+        {
+            "type": "Column",
+            "children": [
+                {
+                    "type": "Row",
+                    "children": [
+                        {
+                            "type": "Container",
+                            "width": 32,
+                            "height": 32,
+                            "margin": 2,
+                            "color": ACCENT if (row + column) % 2 else GREY,
+                            "border_radius": {
+                                "top_left": (row + column) % 16,
+                                "top_right": 4,
+                                "bottom_right": column % 16,
+                                "bottom_left": 16,
+                            },
+                        }
+                        for column in range(columns)
+                    ],
+                }
+                for row in range((size + columns - 1) // columns)
+            ],
+        }
+    )
+
+
+WORKLOADS: Dict[str, Callable[..., dict]] = {
+    "deep": deep,
+    "wide_row": wide_row,
+    "long_column": long_column,
+    "text_heavy": text_heavy,
+    "image_heavy": image_heavy,
+    "rounded": rounded,
+}
+
+
+def count_nodes(json: dict) -> int:
+    """
+    Count the widget nodes of a JSON tree.
+
+    Args:
+        json: The widget JSON.
+
+    Returns:
+        int: The number of nodes.
+    """
+    count = 0
+    stack: List[dict] = [json]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if "child" in node:
+            stack.append(node["child"])
+        stack.extend(node.get("children", ()))
+    return count
@@ -7,22 +7,33 @@ This module provides the main components and utilities for creating UI interface
 # flake8: noqa: F403
 # flake8: noqa: F405
 from .column import Column
+from .compiled import CompiledPage
 from .container import Container
+from .generator import (
+    EncodeOptions,
+    FrameBuffer,
+    RenderStats,
+    encode_image,
+    save_image,
+)
 from .image import Image, ImageSize
 from .page import Page
 from .painter import Painter
 from .row import Row
+from .template import Template
 from .text import Text
-from .typing import BorderRadius, Margin, Padding
+from .typing import BorderRadius, Margin, Padding, RenderQuality
 from .utils import hex_to_rgba
 from .widget import Widget
 
 __all__ = [
     "Column",
+    "CompiledPage",
     "Container",
     "Page",
     "Painter",
     "Row",
+    "Template",
     "Text",
     "Widget",
     "hex_to_rgba",
@@ -31,4 +42,10 @@ __all__ = [
     "BorderRadius",
     "Margin",
     "Padding",
+    "RenderQuality",
+    "EncodeOptions",
+    "FrameBuffer",
+    "RenderStats",
+    "encode_image",
+    "save_image",
 ]
@@ -0,0 +1,181 @@
+"""
+Asyncio counterparts of the blocking Page API.
+
+Remote images are fetched with non-blocking I/O (aiohttp when installed,
+otherwise requests on a worker thread), while parsing, rasterization and
+encoding are offloaded to an executor so the event loop stays responsive.
+Cancelling a coroutine cancels its pending fetches and any executor step
+that has not started yet; a step that is already running completes in the
+background and its result is discarded.
+"""
+
+import asyncio
+import io
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+from PIL import Image as PILImage
+
+from .generator import EncodeOptions, save_image
+from .image import prefetched_images, remote_image_urls
+from .page import Page
+from .typing import RenderQuality
+
+
+async def _fetch_all(urls: List[str]) -> Dict[str, bytes]:
+    """
+    Download several URLs concurrently.
+
+    Args:
+        urls: The URLs to download.
+
+    Returns:
+        Dict[str, bytes]: The response body of each URL.
+    """
+    try:
+        import aiohttp
+    except ImportError:
+        import requests
+
+        def _get(url: str) -> bytes:
+            response = requests.get(url)
+            response.raise_for_status()
+            return response.content
+
+        bodies = await asyncio.gather(
+            *(asyncio.to_thread(_get, url) for url in urls)
+        )
+        return dict(zip(urls, bodies))
+
+    async with aiohttp.ClientSession(raise_for_status=True) as session:
+
+        async def _get_async(url: str) -> bytes:
+            async with session.get(url) as response:
+                return await response.read()
+
+        bodies = await asyncio.gather(*(_get_async(url) for url in urls))
+    return dict(zip(urls, bodies))
+
+
+def _decode(data: Dict[str, bytes]) -> Dict[str, PILImage.Image]:
+    """
+    Decode downloaded image files.
+
+    Args:
+        data: The file contents of each image by URL.
+
+    Returns:
+        Dict[str, PILImage.Image]: The decoded RGBA image of each URL.
+    """
+    return {
+        url: PILImage.open(io.BytesIO(body)).convert("RGBA")
+        for url, body in data.items()
+    }
+
+
+def _build_page(json: dict, images: Mapping[str, PILImage.Image]) -> Page:
+    """
+    Create a Page from JSON, using already fetched images.
+
+    Args:
+        json: JSON dictionary, conforming to widget.schema.json
+        images: Decoded images by URL.
+
+    Returns:
+        Page: The corresponding Page object
+    """
+    token = prefetched_images.set(images)
+    try:
+        return Page.from_json(json)
+    finally:
+        prefetched_images.reset(token)
+
+
+async def fetch_images(json: dict) -> Dict[str, PILImage.Image]:
+    """
+    Fetch and decode all remote images referenced by a widget JSON tree.
+
+    Args:
+        json: JSON dictionary, conforming to widget.schema.json
+
+    Returns:
+        Dict[str, PILImage.Image]: The decoded RGBA image of each URL.
+    """
+    urls = list(dict.fromkeys(remote_image_urls(json)))
+    if not urls:
+        return {}
+    data = await _fetch_all(urls)
+    return await asyncio.to_thread(_decode, data)
+
+
+async def page_from_json(
+    json: dict, *, executor: Optional[Executor] = None
+) -> Page:
+    """
+    Create a Page object from a JSON dictionary without blocking the loop.
+
+    Args:
+        json: JSON dictionary, conforming to widget.schema.json
+        executor: Executor for parsing and layout, defaults to the loop's
+            default executor.
+
+    Returns:
+        Page: The corresponding Page object
+    """
+    images = await fetch_images(json)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _build_page, json, images)
+
+
+async def render(
+    page: Page,
+    *,
+    scale: float = 1.0,
+    quality: RenderQuality | str = RenderQuality.FINAL,
+    executor: Optional[Executor] = None,
+) -> PILImage.Image:
+    """
+    Render a page to an in-memory image without blocking the loop.
+
+    Args:
+        page: The page to render.
+        scale: Scale factor for the image, defaults to 1.0.
+        quality: Render quality tier, "final" by default.
+        executor: Executor for rasterization, defaults to the loop's default
+            executor.
+
+    Returns:
+        PILImage.Image: The rendered RGBA image.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(page.render, scale=scale, quality=quality)
+    )
+
+
+async def paint(
+    page: Page,
+    *,
+    scale: float = 1.0,
+    filename: Path,
+    quality: RenderQuality | str = RenderQuality.FINAL,
+    encoding: Optional[EncodeOptions] = None,
+    executor: Optional[Executor] = None,
+) -> None:
+    """
+    Paint a page to an image file without blocking the loop.
+
+    Args:
+        page: The page to render.
+        scale: Scale factor for the image, defaults to 1.0.
+        filename: Path to save the generated image.
+        quality: Render quality tier, "final" by default.
+        encoding: Encoding options, the format defaults to the file extension.
+        executor: Executor for rasterization and encoding, defaults to the
+            loop's default executor.
+    """
+    img = await render(page, scale=scale, quality=quality, executor=executor)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, save_image, img, filename, encoding)
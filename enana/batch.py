@@ -0,0 +1,236 @@
+"""
+Streaming batch rendering of JSON Lines page documents.
+
+Documents are read lazily, at most ``max_in_flight`` of them are being
+rendered at any time and results are written in input order as soon as they
+are ready, so memory use does not grow with the length of the input.
+"""
+
+import io
+import json
+import math
+import sys
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Deque, Dict, Iterable, Optional, Tuple
+
+from .generator import CPU_COUNT
+from .worker import render_document
+
+
+def _render_line(line: str, scale: float, format: str) -> Tuple[bytes, float]:
+    """
+    Render one JSON Lines record in a worker process.
+
+    Args:
+        line: A page document serialized as JSON.
+        scale: Scale factor for the image.
+        format: The output format, "png", "webp" or "jpeg".
+
+    Returns:
+        Tuple[bytes, float]: The encoded image and the render time in seconds.
+    """
+    start = time.perf_counter()
+    data = render_document(json.loads(line), scale, format)
+    return data, time.perf_counter() - start
+
+
+class LatencyHistogram:
+    """
+    Constant-memory latency histogram with logarithmic buckets.
+
+    Percentiles are accurate to the bucket growth factor (2%).
+    """
+
+    GROWTH = 1.02
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty histogram.
+        """
+        self.count = 0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float) -> None:
+        """
+        Record a latency.
+
+        Args:
+            seconds: The latency in seconds.
+        """
+        bucket = math.floor(math.log(max(seconds, 1e-6), self.GROWTH))
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def percentile(self, p: float) -> float:
+        """
+        Get a latency percentile.
+
+        Args:
+            p: The percentile, between 0 and 100.
+
+        Returns:
+            float: The upper bound of the bucket holding the percentile, in
+            seconds, or 0 if nothing was recorded.
+        """
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= max(rank, 1):
+                return self.GROWTH ** (bucket + 1)
+        return 0.0
+
+
+class _TarWriter:
+    """
+    Writes results as members of a streamed tar archive.
+    """
+
+    def __init__(self, fileobj: IO[bytes]):
+        """
+        Initialize the writer.
+
+        Args:
+            fileobj: The binary stream to write the archive to.
+        """
+        self._tar = tarfile.open(fileobj=fileobj, mode="w|")
+
+    def write(self, name: str, data: bytes) -> None:
+        """
+        Append a file to the archive.
+
+        Args:
+            name: The name of the file.
+            data: The content of the file.
+        """
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        """
+        Finish the archive.
+        """
+        self._tar.close()
+
+
+class _DirectoryWriter:
+    """
+    Writes results as files in a directory.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Initialize the writer, creating the directory if needed.
+
+        Args:
+            directory: The directory to write the files to.
+        """
+        self._directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, name: str, data: bytes) -> None:
+        """
+        Write a file into the directory.
+
+        Args:
+            name: The name of the file.
+            data: The content of the file.
+        """
+        (self._directory / name).write_bytes(data)
+
+    def close(self) -> None:
+        """
+        Do nothing, files are complete once written.
+        """
+
+
+def render_batch(
+    lines: Iterable[str],
+    *,
+    output: Optional[Path] = None,
+    tar: Optional[IO[bytes]] = None,
+    scale: float = 1.0,
+    format: str = "png",
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    log: IO[str] = sys.stderr,
+) -> int:
+    """
+    Render JSON Lines page documents in parallel.
+
+    Result N (counting non-empty lines from 0) is named ``N.<format>`` with
+    six digits of zero padding, and is written either into ``output`` or
+    into the tar stream ``tar``. A throughput summary is printed to ``log``.
+
+    Args:
+        lines: Page documents, one JSON object per line.
+        output: Directory to write the images to.
+        tar: Binary stream to write a tar archive of the images to.
+        scale: Scale factor for the images.
+        format: The output format, "png", "webp" or "jpeg".
+        workers: The number of render processes, defaults to the CPU count.
+        max_in_flight: The maximum number of documents being rendered,
+            defaults to twice the number of workers.
+        log: Stream for errors and the summary.
+
+    Returns:
+        int: The number of documents that failed to render.
+    """
+    if (output is None) == (tar is None):
+        raise ValueError("Exactly one of output and tar must be given")
+    writer: _TarWriter | _DirectoryWriter
+    if tar is not None:
+        writer = _TarWriter(tar)
+    else:
+        assert output is not None
+        writer = _DirectoryWriter(output)
+    workers = workers or CPU_COUNT
+    limit = max_in_flight or 2 * workers
+    histogram = LatencyHistogram()
+    failures = 0
+    pending: Deque[Tuple[int, Future]] = deque()
+    start = time.perf_counter()
+
+    def _collect() -> None:
+        nonlocal failures
+        index, future = pending.popleft()
+        try:
+            data, seconds = future.result()
+        except Exception as e:
+            failures += 1
+            print(f"document {index}: {e}", file=log)
+            return
+        histogram.add(seconds)
+        writer.write(f"{index:06d}.{format}", data)
+
+    with ProcessPoolExecutor(workers) as executor:
+        index = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            if len(pending) >= limit:
+                _collect()
+            pending.append(
+                (index, executor.submit(_render_line, line, scale, format))
+            )
+            index += 1
+        while pending:
+            _collect()
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"rendered {histogram.count} pages ({failures} failed) "
+        f"in {elapsed:.2f}s, "
+        f"{histogram.count / elapsed if elapsed else 0:.1f} pages/s, "
+        f"p50 {histogram.percentile(50) * 1000:.1f}ms, "
+        f"p99 {histogram.percentile(99) * 1000:.1f}ms",
+        file=log,
+    )
+    return failures
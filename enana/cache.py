@@ -0,0 +1,306 @@
+"""
+Content-addressed cache of rendered pages.
+
+A render is identified by a hash of the canonical page JSON, the scale, the
+output format, the renderer version and the content of the local images and
+font files the page references, so editing a referenced file invalidates
+the entry even though the JSON is unchanged. Texts without a fallback list
+reference the default fallback fonts, installing or removing one of them
+invalidates their entries too. Registered image resources are identified by
+a hash of their pixels and remote images by their URL. The hash is suitable
+as an HTTP ETag.
+
+Looking a page up only needs its JSON, so a hit skips parsing, layout and
+rasterization entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import PIL
+
+from .fonts import DEFAULT_FALLBACK, find_font
+from .resources import image_digest
+from .worker import render_document
+
+# Bump when a change of the renderer changes the output for the same page,
+# so existing cache entries and ETags are not served anymore
+RENDER_VERSION = 1
+
+# File digests by path, reused while the file's size and mtime are unchanged
+_file_digests: Dict[str, Tuple[int, int, str]] = {}
+_file_digests_lock = threading.Lock()
+
+
+def _file_digest(path: str) -> Optional[str]:
+    """
+    Hash the content of a file.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The hex digest of the file, or None if it is not a readable file.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _file_digests_lock:
+        cached = _file_digests.get(path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    digest = hasher.hexdigest()
+    with _file_digests_lock:
+        _file_digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def _resources(document: Any) -> Iterator[Tuple[str, str]]:
+    """
+    Find the image and font references of a widget JSON tree.
+
+    Args:
+        document: JSON dictionary, conforming to widget.schema.json
+
+    Yields:
+        Tuple[str, str]: The kind ("image", "resource" or "font") and the
+        reference.
+    """
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            if node.get("type") == "Image" and isinstance(
+                node.get("url"), str
+            ):
+                yield "image", node["url"]
+            elif node.get("type") == "Image" and isinstance(
+                node.get("resource"), str
+            ):
+                yield "resource", node["resource"]
+            elif node.get("type") == "Text":
+                yield "font", str(node.get("font", "Arial"))
+                fallback = node.get("fallback")
+                for font in DEFAULT_FALLBACK if fallback is None else fallback:
+                    yield "font", str(font)
+            stack.extend(
+                value
+                for value in node.values()
+                if isinstance(value, (dict, list))
+            )
+
+
+def _resource_digest(kind: str, reference: str) -> str:
+    """
+    Identify the content behind an image URL, resource name or font name.
+
+    Args:
+        kind: "image", "resource" or "font".
+        reference: The image URL, resource name or font name.
+
+    Returns:
+        str: A digest of the file content for local files, otherwise the
+        reference itself.
+    """
+    if kind == "image":
+        if reference.startswith(("http://", "https://", "data:")):
+            return reference
+        path = reference[7:] if reference.startswith("file://") else reference
+    elif kind == "resource":
+        return image_digest(reference) or reference
+    else:
+        location = find_font(reference)
+        path = location[0] if location is not None else reference
+    return _file_digest(path) or reference
+
+
+def render_key(document: Any, scale: float, format: str) -> str:
+    """
+    Hash a render by its canonical JSON, scale, format and resources.
+
+    The key also covers RENDER_VERSION and the Pillow version, whose
+    rasterization and encoding the output depends on.
+
+    Args:
+        document: JSON dictionary, conforming to widget.schema.json
+        scale: Scale factor for the image.
+        format: The output format.
+
+    Returns:
+        str: The hex digest identifying the render.
+    """
+    resources = sorted(
+        {
+            f"{kind}:{_resource_digest(kind, reference)}"
+            for kind, reference in _resources(document)
+        }
+    )
+    canonical = json.dumps(
+        [
+            RENDER_VERSION,
+            PIL.__version__,
+            document,
+            float(scale),
+            format,
+            resources,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    A two-tier cache of encoded renders keyed by render_key.
+
+    The memory tier is an LRU bounded by total size. The optional disk tier
+    keeps every entry as a file named after its key, and disk hits are
+    promoted to memory.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[Path] = None,
+    ):
+        """
+        Initialize the RenderCache.
+
+        Args:
+            max_bytes: The maximum total size of the memory tier.
+            directory: The directory of the disk tier, None disables it.
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._size = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        """
+        Get the disk tier file of a key.
+
+        Args:
+            key: The render key.
+
+        Returns:
+            Path: The file holding the entry.
+        """
+        assert self.directory is not None
+        return self.directory / key[:2] / key
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """
+        Put an entry in the memory tier, evicting the least recently used.
+
+        Args:
+            key: The render key.
+            data: The encoded image.
+        """
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached render.
+
+        Args:
+            key: The render key.
+
+        Returns:
+            The encoded image, or None if it is not cached.
+        """
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                return data
+        if self.directory is None:
+            return None
+        try:
+            data = self._path(key).read_bytes()
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Cache a render in both tiers.
+
+        Args:
+            key: The render key.
+            data: The encoded image.
+        """
+        self._remember(key, data)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(exist_ok=True)
+        # Write to a temporary file first so readers never see partial data
+        fd, temp = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def render(
+        self,
+        document: dict,
+        *,
+        scale: float = 1.0,
+        format: str = "png",
+        renderer: Callable[[dict, float, str], bytes] = render_document,
+    ) -> Tuple[bytes, str]:
+        """
+        Render a page document, or return the cached render.
+
+        Args:
+            document: JSON dictionary, conforming to widget.schema.json
+            scale: Scale factor for the image.
+            format: The output format, "png" or "webp".
+            renderer: The function rendering documents on a miss.
+
+        Returns:
+            Tuple[bytes, str]: The encoded image and its key, usable as ETag.
+        """
+        key = render_key(document, scale, format)
+        data = self.get(key)
+        if data is None:
+            data = renderer(document, scale, format)
+            self.put(key, data)
+        return data, key
@@ -0,0 +1,137 @@
+"""
+Command line interface of Enana.
+"""
+
+import argparse
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the enana command.
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="enana", description="Render Enana pages."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve", help="run an HTTP server rendering page JSON"
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="render processes, defaults to the CPU count",
+    )
+    serve.add_argument(
+        "--max-pending",
+        type=int,
+        default=64,
+        help="renders queued or running before answering 503",
+    )
+    serve.add_argument(
+        "--cache-mb",
+        type=int,
+        default=256,
+        help="size of the in-memory response cache in MiB",
+    )
+    serve.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="directory of the on-disk response cache",
+    )
+    serve.add_argument(
+        "--max-scale",
+        type=float,
+        default=8.0,
+        help="largest scale accepted before answering 400",
+    )
+    serve.add_argument(
+        "--max-body-mb",
+        type=int,
+        default=8,
+        help="largest request body in MiB accepted before answering 413",
+    )
+
+    render = commands.add_parser(
+        "render", help="render JSON Lines page documents in parallel"
+    )
+    render.add_argument(
+        "input", help="JSON Lines file with one page per line, - for stdin"
+    )
+    destination = render.add_mutually_exclusive_group(required=True)
+    destination.add_argument(
+        "-o", "--output", type=Path, help="directory to write the images to"
+    )
+    destination.add_argument(
+        "--tar", help="tar archive to stream the images to, - for stdout"
+    )
+    render.add_argument("--scale", type=float, default=1.0)
+    render.add_argument(
+        "--format", choices=["png", "webp", "jpeg"], default="png"
+    )
+    render.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="render processes, defaults to the CPU count",
+    )
+    render.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="documents rendering at once, defaults to twice the workers",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        from .server import serve as run_server
+
+        run_server(
+            args.host,
+            args.port,
+            workers=args.workers,
+            max_pending=args.max_pending,
+            cache_bytes=args.cache_mb * 1024 * 1024,
+            cache_dir=args.cache_dir,
+            max_scale=args.max_scale,
+            max_body_bytes=args.max_body_mb * 1024 * 1024,
+        )
+    elif args.command == "render":
+        from .batch import render_batch
+
+        with ExitStack() as stack:
+            lines = (
+                sys.stdin
+                if args.input == "-"
+                else stack.enter_context(open(args.input, encoding="utf-8"))
+            )
+            tar = None
+            if args.tar == "-":
+                tar = sys.stdout.buffer
+            elif args.tar is not None:
+                tar = stack.enter_context(open(args.tar, "wb"))
+            failures = render_batch(
+                lines,
+                output=args.output,
+                tar=tar,
+                scale=args.scale,
+                format=args.format,
+                workers=args.workers,
+                max_in_flight=args.max_in_flight,
+            )
+        return 1 if failures else 0
+    return 0
@@ -1,7 +1,6 @@
 from typing import List, Optional, Tuple
 
 from .container import Container
-from .painter import Painter
 from .typing import BorderRadius, Margin, Padding
 from .widget import Widget
 
@@ -41,16 +40,15 @@ class Column(Container):
             child=None,
         )
         self._children = children or []
+        for child in self._children:
+            child._parent = self
 
-    @property
-    def width(self) -> int | float:
+    def _measure(self) -> None:
         """
-        Get the width of the column.
-
-        If the width is not explicitly set, it will be calculated based on the maximum width of its children.
+        Compute the size of the column from its children.
 
-        Returns:
-            The width of the column.
+        Unless set explicitly, the width is the maximum width of its
+        children and the height the sum of the heights of its children.
         """
         if self._width is None:
             max_child_width = max(
@@ -61,18 +59,6 @@ class Column(Container):
                 + self._padding.horizontal
                 + self._margin.horizontal
             )
-        return self._width
-
-    @property
-    def height(self) -> int | float:
-        """
-        Get the height of the column.
-
-        If the height is not explicitly set, it will be calculated based on the sum of heights of its children.
-
-        Returns:
-            The height of the column.
-        """
         if self._height is None:
             total_child_height = sum(
                 (child.height for child in self._children), 0
@@ -82,37 +68,21 @@ class Column(Container):
                 + self._padding.vertical
                 + self._margin.vertical
             )
-        return self._height
 
-    @property
-    def painters(self) -> List[Painter]:
-        """
-        Get the list of painters for this column.
-
-        Returns:
-            A list of Painter objects that will be used to render this column.
-        """
-        # Ensure dimensions are calculated
-        width = self.width
-        height = self.height
+    def _child_widgets(self) -> List[Widget]:
+        return self._children
 
-        # Create container painter
-        painters = [
-            Painter(
-                width=width,
-                height=height,
-                func=self._paint_func,
-                color=self._color,
-            )
-        ]
+    def _instance_fields(self) -> tuple:
+        return self._style_fields() + (
+            tuple(child.instance_key for child in self._children),
+        )
 
-        # Calculate position for each child and add their painters
+    def _placements(self) -> List[Tuple[Widget, int | float, int | float]]:
+        placements = []
         current_y = self._padding.top + self._margin.top
         for child in self._children:
-            for painter in child.painters:
-                painter.offset_x += self._padding.left + self._margin.left
-                painter.offset_y += current_y
-                painters.append(painter)
+            placements.append(
+                (child, self._padding.left + self._margin.left, current_y)
+            )
             current_y += child.height
-
-        return painters
+        return placements
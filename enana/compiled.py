@@ -0,0 +1,647 @@
+"""
+Compiled pages, laid out once and rendered any number of times.
+
+Compiling a page walks the widget tree a single time and keeps everything
+that does not depend on the render scale: the display list of positioned
+painters in paint order, the decoded images, the text line breaks and a
+spatial index for region renders. Rendering a compiled page only rasterizes.
+
+Compiled pages can be saved to a versioned binary file and memory-mapped
+back by another process, which can then render without parsing JSON or
+laying anything out. The file holds the display list, text line breaks,
+the groups of repeated subtrees and the raw RGBA pixels of the images, which
+are used straight from the mapping. Fonts are stored by name and resolved
+in the loading process.
+
+File layout, all little-endian:
+
+- header: magic, format version, page width and height, number of
+  painters, strings, groups and images, and the offsets of the sections
+  below
+- painters: one record per painter in paint order, a common part (kind,
+  color, offset, size, start and count of its group references) followed
+  by a kind-specific part
+- strings: texts, font names and text lines, each a u32 byte length and
+  UTF-8 bytes
+- groups: the 16 byte instance key of each subtree group, followed by the
+  group references of the painters, each a u32 group number
+- images: width, height and data offset of each image
+- pixels: raw RGBA image data, each image aligned to 16 bytes
+"""
+
+import math
+import mmap
+import struct
+from math import ceil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image as PILImage
+
+from .generator import (
+    EncodeOptions,
+    FrameBuffer,
+    InstanceGroups,
+    RenderStats,
+    draw_painters,
+    instance_groups,
+    save_image,
+)
+from .image import ImageSize
+from .painter import ImagePainter, Painter, RectPainter, TextPainter
+from .spatial import PainterGrid
+from .typing import BorderRadius, RenderQuality
+
+MAGIC = b"ENANACP\0"
+FORMAT_VERSION = 3
+
+_HEADER = struct.Struct("<8sHxxddIIIIQQQQ")
+_COMMON = struct.Struct("<B4B3xddddII")
+_RECT = struct.Struct("<8d")
+_TEXT = struct.Struct("<IIddIiII")
+_IMAGE = struct.Struct("<IB3x")
+_IMAGE_ENTRY = struct.Struct("<IIQ")
+_LENGTH = struct.Struct("<I")
+_GROUP = struct.Struct("<I")
+_KEY_SIZE = 16
+
+_RECT_KIND, _TEXT_KIND, _IMAGE_KIND = 1, 2, 3
+_IMAGE_SIZES = list(ImageSize)
+
+
+class _Strings:
+    """
+    String table builder, deduplicating repeated strings.
+    """
+
+    def __init__(self) -> None:
+        self.items: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        """
+        Add a string to the table.
+
+        Args:
+            value: The string.
+
+        Returns:
+            int: The index of the string.
+        """
+        if value not in self._index:
+            self._index[value] = len(self.items)
+            self.items.append(value)
+        return self._index[value]
+
+    def add_run(self, values: Sequence[str]) -> int:
+        """
+        Add consecutive strings to the table, without deduplication.
+
+        Args:
+            values: The strings.
+
+        Returns:
+            int: The index of the first string.
+        """
+        start = len(self.items)
+        self.items.extend(values)
+        return start
+
+
+class CompiledPage:
+    """
+    A laid out page.
+
+    The attributes and the display list of a CompiledPage never change
+    after it is created. Rendering only fills caches of its painters, such
+    as the resized pixels of an ImagePainter, which are replaced atomically.
+    One instance can therefore be rendered concurrently from several threads
+    and at several scales. Changes to the widgets it was compiled from are
+    not reflected, compile the page again instead.
+    """
+
+    __slots__ = (
+        "_width",
+        "_height",
+        "_painters",
+        "_grid",
+        "_instances",
+        "_source",
+    )
+
+    _width: int | float
+    _height: int | float
+    _painters: Tuple[Painter, ...]
+    _grid: PainterGrid
+    _instances: InstanceGroups
+    _source: Any
+
+    def __init__(
+        self,
+        painters: Sequence[Painter],
+        width: int | float,
+        height: int | float,
+        source: Any = None,
+    ):
+        """
+        Initialize the CompiledPage, see Page.compile.
+
+        Args:
+            painters: The laid out painters sorted by z-index, topmost first.
+            width: The width of the page in layout units.
+            height: The height of the page in layout units.
+            source: The memory map images were loaded from, kept open for
+                as long as the page lives.
+        """
+        painters = tuple(painters)
+        object.__setattr__(self, "_width", width)
+        object.__setattr__(self, "_height", height)
+        object.__setattr__(self, "_painters", painters)
+        object.__setattr__(self, "_grid", PainterGrid(list(painters)))
+        object.__setattr__(self, "_instances", instance_groups(painters))
+        object.__setattr__(self, "_source", source)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    @property
+    def width(self) -> int | float:
+        """
+        The width of the page in layout units.
+        """
+        return self._width
+
+    @property
+    def height(self) -> int | float:
+        """
+        The height of the page in layout units.
+        """
+        return self._height
+
+    @property
+    def painters(self) -> Tuple[Painter, ...]:
+        """
+        The display list, sorted by z-index, topmost first.
+        """
+        return self._painters
+
+    def size(self, scale: float = 1.0) -> Tuple[int, int]:
+        """
+        Get the pixel size of a render.
+
+        Args:
+            scale: Scale factor for the image.
+
+        Returns:
+            Tuple[int, int]: The width and height in pixels.
+        """
+        return ceil(self._width * scale), ceil(self._height * scale)
+
+    def render(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        stats: Optional[RenderStats] = None,
+    ) -> PILImage.Image:
+        """
+        Render the page to an in-memory image.
+
+        Repeated identical subtrees, such as the rows of a list, are rendered
+        once and copied wherever that gives the same pixels.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+            stats: Counters to update with the work done.
+
+        Returns:
+            PILImage.Image: The rendered RGBA image.
+        """
+        image = PILImage.new("RGBA", self.size(scale))
+        return draw_painters(
+            self._painters,
+            scale,
+            RenderQuality(quality),
+            image,
+            instancing=True,
+            stats=stats,
+            instances=self._instances,
+            grid=self._grid,
+        )
+
+    def render_scales(
+        self,
+        scales: Iterable[float],
+        *,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> List[PILImage.Image]:
+        """
+        Render the page at several scales, such as 1x, 2x and 3x.
+
+        Everything that does not depend on the scale is computed once when
+        the page is compiled and shared by all the renders: the layout, the
+        decoded images, the text line breaks, the spatial index and the
+        groups of repeated subtrees. Each scale then plans its instances,
+        resolves its font sizes and rasterizes, like render.
+
+        Args:
+            scales: The scale factors.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            List[PILImage.Image]: The rendered RGBA images, in the order of
+            scales.
+        """
+        return [self.render(scale=scale, quality=quality) for scale in scales]
+
+    def render_region(
+        self,
+        box: Tuple[int, int, int, int],
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> PILImage.Image:
+        """
+        Render a rectangle of the page, see Page.render_region.
+
+        Args:
+            box: The (left, top, right, bottom) pixel box to render.
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            PILImage.Image: The rendered RGBA region.
+        """
+        left, top, right, bottom = box
+        if right <= left or bottom <= top:
+            raise ValueError(f"Empty region: {box}")
+        image = PILImage.new("RGBA", (right - left, bottom - top))
+        return draw_painters(
+            self._grid.query(box, scale),
+            scale,
+            RenderQuality(quality),
+            image,
+            (left, top),
+        )
+
+    def render_buffer(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> FrameBuffer:
+        """
+        Render the page into a raw RGBA buffer, see Page.render_buffer.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            FrameBuffer: The rendered pixels.
+        """
+        frame = FrameBuffer(*self.size(scale))
+        draw_painters(
+            self._painters,
+            scale,
+            RenderQuality(quality),
+            frame.image,
+            instancing=True,
+            instances=self._instances,
+            grid=self._grid,
+        )
+        return frame
+
+    def paint(
+        self,
+        *,
+        scale: float = 1.0,
+        filename: Path,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        encoding: Optional[EncodeOptions] = None,
+    ) -> None:
+        """
+        Paint the page to an image file.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            filename: Path to save the generated image.
+            quality: Render quality tier, "final" by default.
+            encoding: Encoding options, the format defaults to the file extension.
+        """
+        save_image(
+            self.render(scale=scale, quality=quality), filename, encoding
+        )
+
+    def save(self, filename: Path) -> None:
+        """
+        Save the compiled page to a binary file, see the module docs.
+
+        Args:
+            filename: The path of the file to write.
+
+        Raises:
+            ValueError: If the page has painters other than rectangles,
+                texts and images, whose shape functions cannot be saved.
+        """
+        strings = _Strings()
+        images: Dict[int, int] = {}
+        pixels: List[PILImage.Image] = []
+        # Group numbers by group id, the key of each group and the group
+        # references of all painters
+        group_numbers: Dict[int, int] = {}
+        group_keys: List[bytes] = []
+        references: List[int] = []
+        records = bytearray()
+        for painter in self._painters:
+            if isinstance(painter, RectPainter):
+                kind = _RECT_KIND
+                radius = painter.border_radius
+                extra = _RECT.pack(
+                    painter.left,
+                    painter.top,
+                    painter.rect_width,
+                    painter.rect_height,
+                    radius.top_left,
+                    radius.top_right,
+                    radius.bottom_right,
+                    radius.bottom_left,
+                )
+            elif isinstance(painter, TextPainter):
+                kind = _TEXT_KIND
+                lines = painter.lines
+                extra = _TEXT.pack(
+                    strings.add(painter.text),
+                    strings.add(painter.font),
+                    painter.font_size,
+                    (
+                        math.nan
+                        if painter.max_width is None
+                        else painter.max_width
+                    ),
+                    strings.add_run(lines) if lines is not None else 0,
+                    len(lines) if lines is not None else -1,
+                    strings.add_run(painter.fallback),
+                    len(painter.fallback),
+                )
+            elif isinstance(painter, ImagePainter):
+                kind = _IMAGE_KIND
+                if id(painter.image) not in images:
+                    images[id(painter.image)] = len(pixels)
+                    pixels.append(painter.image.convert("RGBA"))
+                extra = _IMAGE.pack(
+                    images[id(painter.image)],
+                    _IMAGE_SIZES.index(painter.size),
+                )
+            else:
+                raise ValueError(f"Cannot save {painter.__class__.__name__}")
+            groups_start = len(references)
+            for key, group in painter.groups:
+                if group not in group_numbers:
+                    group_numbers[group] = len(group_keys)
+                    group_keys.append(key)
+                references.append(group_numbers[group])
+            records += _COMMON.pack(
+                kind,
+                *painter.color,
+                painter.offset_x,
+                painter.offset_y,
+                painter.width,
+                painter.height,
+                groups_start,
+                len(painter.groups),
+            )
+            records += extra
+
+        table = bytearray()
+        for value in strings.items:
+            encoded = value.encode("utf-8")
+            table += _LENGTH.pack(len(encoded)) + encoded
+
+        groups = b"".join(group_keys) + b"".join(
+            _GROUP.pack(number) for number in references
+        )
+
+        strings_offset = _HEADER.size + len(records)
+        groups_offset = strings_offset + len(table)
+        images_offset = groups_offset + len(groups)
+        data_offset = images_offset + _IMAGE_ENTRY.size * len(pixels)
+        entries = bytearray()
+        for image in pixels:
+            data_offset += -data_offset % 16
+            entries += _IMAGE_ENTRY.pack(
+                image.width, image.height, data_offset
+            )
+            data_offset += image.width * image.height * 4
+
+        with open(filename, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    self._width,
+                    self._height,
+                    len(self._painters),
+                    len(strings.items),
+                    len(group_keys),
+                    len(pixels),
+                    _HEADER.size,
+                    strings_offset,
+                    groups_offset,
+                    images_offset,
+                )
+            )
+            f.write(records)
+            f.write(table)
+            f.write(groups)
+            f.write(entries)
+            for image in pixels:
+                f.write(b"\0" * (-f.tell() % 16))
+                f.write(image.tobytes())
+
+    @classmethod
+    def load(cls, filename: Path) -> "CompiledPage":
+        """
+        Load a compiled page saved with save, memory-mapping the file.
+
+        Image pixels are used straight from the mapping, so loading does not
+        decode or copy them.
+
+        Args:
+            filename: The path of the file to read.
+
+        Returns:
+            CompiledPage: The compiled page.
+
+        Raises:
+            ValueError: If the file is not a compiled page of this version.
+        """
+        with open(filename, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < _HEADER.size:
+            raise ValueError(f"Not a compiled page: {filename}")
+        (
+            magic,
+            version,
+            width,
+            height,
+            painter_count,
+            string_count,
+            group_count,
+            image_count,
+            records_offset,
+            strings_offset,
+            groups_offset,
+            images_offset,
+        ) = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"Not a compiled page: {filename}")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported compiled page version {version}, "
+                f"expected {FORMAT_VERSION}"
+            )
+
+        strings = []
+        position = strings_offset
+        for _ in range(string_count):
+            (length,) = _LENGTH.unpack_from(data, position)
+            position += _LENGTH.size
+            end = position + length
+            strings.append(data[position:end].decode("utf-8"))
+            position += length
+
+        # Groups are numbered in the file, the numbers stand in for the ids
+        # of the widgets they were compiled from
+        references_offset = groups_offset + group_count * _KEY_SIZE
+        keys = data[groups_offset:references_offset]
+        group_keys = [
+            keys[start:end]
+            for start, end in zip(
+                range(0, len(keys), _KEY_SIZE),
+                range(_KEY_SIZE, len(keys) + 1, _KEY_SIZE),
+            )
+        ]
+
+        images = []
+        for index in range(image_count):
+            image_width, image_height, offset = _IMAGE_ENTRY.unpack_from(
+                data, images_offset + index * _IMAGE_ENTRY.size
+            )
+            end = offset + image_width * image_height * 4
+            view = memoryview(data)[offset:end]
+            images.append(
+                PILImage.frombuffer(
+                    "RGBA",
+                    (image_width, image_height),
+                    view,  # type: ignore[arg-type]
+                    "raw",
+                    "RGBA",
+                    0,
+                    1,
+                )
+            )
+
+        painters: List[Painter] = []
+        position = records_offset
+        for index in range(painter_count):
+            (
+                kind,
+                r,
+                g,
+                b,
+                a,
+                offset_x,
+                offset_y,
+                p_width,
+                p_height,
+                groups_start,
+                groups_count,
+            ) = _COMMON.unpack_from(data, position)
+            position += _COMMON.size
+            painter: Painter
+            if kind == _RECT_KIND:
+                fields = _RECT.unpack_from(data, position)
+                position += _RECT.size
+                painter = RectPainter(
+                    width=p_width,
+                    height=p_height,
+                    color=(r, g, b, a),
+                    left=fields[0],
+                    top=fields[1],
+                    rect_width=fields[2],
+                    rect_height=fields[3],
+                    border_radius=BorderRadius(
+                        top_left=fields[4],
+                        top_right=fields[5],
+                        bottom_right=fields[6],
+                        bottom_left=fields[7],
+                    ),
+                )
+            elif kind == _TEXT_KIND:
+                (
+                    text,
+                    font,
+                    font_size,
+                    max_width,
+                    start,
+                    count,
+                    fallback,
+                    fallback_count,
+                ) = _TEXT.unpack_from(data, position)
+                position += _TEXT.size
+                end = start + count
+                fallback_end = fallback + fallback_count
+                painter = TextPainter(
+                    text=strings[text],
+                    font=strings[font],
+                    font_size=_number(font_size),
+                    max_width=(
+                        None if math.isnan(max_width) else _number(max_width)
+                    ),
+                    color=(r, g, b, a),
+                    width=p_width,
+                    height=p_height,
+                    lines=None if count < 0 else strings[start:end],
+                    fallback=strings[fallback:fallback_end],
+                )
+            elif kind == _IMAGE_KIND:
+                image, size = _IMAGE.unpack_from(data, position)
+                position += _IMAGE.size
+                painter = ImagePainter(
+                    image=images[image],
+                    width=p_width,
+                    height=p_height,
+                    size=_IMAGE_SIZES[size],
+                )
+            else:
+                raise ValueError(f"Unknown painter kind {kind} in {filename}")
+            painter.offset_x = _number(offset_x)
+            painter.offset_y = _number(offset_y)
+            for reference in range(groups_start, groups_start + groups_count):
+                (number,) = _GROUP.unpack_from(
+                    data, references_offset + reference * _GROUP.size
+                )
+                painter.groups.append((group_keys[number], number))
+            # Keep the saved paint order if the painters are sorted again
+            painter.z_index = painter_count - index
+            painters.append(painter)
+
+        return cls(painters, _number(width), _number(height), source=data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(width={self._width}, height={self._height}, painters={len(self._painters)})"
+
+
+def _number(value: float) -> int | float:
+    """
+    Restore a number stored as a double to an int when it is integral.
+
+    Args:
+        value: The stored value.
+
+    Returns:
+        int | float: The value, as an int if it has no fractional part.
+    """
+    return int(value) if value.is_integer() else value
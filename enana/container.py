@@ -1,6 +1,6 @@
 from typing import List, Optional, Tuple
 
-from .painter import Painter
+from .painter import Painter, RectPainter
 from .typing import BorderRadius, Margin, Padding
 from .widget import Widget
 
@@ -37,6 +37,8 @@ class Container(Widget):
         self._margin = margin or Margin.zero()
         self._border_radius = border_radius or BorderRadius.zero()
         self._child = child
+        if child is not None:
+            child._parent = self
 
     @property
     def width(self) -> int | float:
@@ -49,8 +51,7 @@ class Container(Widget):
             The width of the container.
         """
         if self._width is None:
-            # Trigger painters property calculation, which will set self._width
-            _ = self.painters
+            self._layout()
         return super().width
 
     @property
@@ -64,92 +65,91 @@ class Container(Widget):
             The height of the container.
         """
         if self._height is None:
-            # Trigger painters property calculation, which will set self._height
-            _ = self.painters
+            self._layout()
         return super().height
 
-    def _paint_func(self, x: int | float, y: int | float) -> bool:
+    def _background_painter(
+        self, width: int | float, height: int | float
+    ) -> Painter:
         """
-        Paint function to determine if a pixel should be colored.
+        Create the painter that fills the background of this container.
 
         Args:
-            x: The x-coordinate.
-            y: The y-coordinate.
+            width: The width of the container.
+            height: The height of the container.
 
         Returns:
-            True if the pixel should be colored, False otherwise.
+            The painter for the background of this container.
         """
-        assert self._width is not None
-        assert self._height is not None
-        width = self._original_width or (
-            self._width - self._padding.horizontal
+        return RectPainter(
+            width=width,
+            height=height,
+            color=self._color,
+            left=self._margin.left,
+            top=self._margin.top,
+            rect_width=self._original_width
+            or (width - self._padding.horizontal),
+            rect_height=self._original_height
+            or (height - self._padding.vertical),
+            border_radius=self._border_radius,
         )
-        height = self._original_height or (
-            self._height - self._padding.vertical
-        )
-        margin = self._margin
-        border_radius = self._border_radius
-        if (
-            margin.left <= x < margin.left + width
-            and margin.top <= y < margin.top + height
-        ):
-            if not border_radius:
-                return True
-            assert (
-                border_radius.top_left
-                == border_radius.top_right
-                == border_radius.bottom_left
-                == border_radius.bottom_right
-            ), "border_radius must be the same on all sides"
-            if (
-                margin.left + border_radius.top_left
-                <= x
-                < margin.left + width - border_radius.top_right
-            ):
-                return True
-            if (
-                margin.top + border_radius.top_left
-                <= y
-                < margin.top + height - border_radius.bottom_left
-            ):
-                return True
-            X = x - margin.left
-            Y = y - margin.top
-            if X <= border_radius.top_left and Y <= border_radius.top_left:
-                return (X - border_radius.top_left) ** 2 + (
-                    Y - border_radius.top_left
-                ) ** 2 <= border_radius.top_left**2
-            if (
-                X >= width - border_radius.top_right
-                and Y <= border_radius.top_right
-            ):
-                return (X - (width - border_radius.top_right)) ** 2 + (
-                    Y - border_radius.top_right
-                ) ** 2 <= border_radius.top_right**2
-            if (
-                X >= width - border_radius.bottom_right
-                and Y >= height - border_radius.bottom_right
-            ):
-                return (X - (width - border_radius.bottom_right)) ** 2 + (
-                    Y - (height - border_radius.bottom_right)
-                ) ** 2 <= border_radius.bottom_right**2
-            if (
-                X <= border_radius.bottom_left
-                and Y >= height - border_radius.bottom_left
-            ):
-                return (X - border_radius.bottom_left) ** 2 + (
-                    Y - (height - border_radius.bottom_left)
-                ) ** 2 <= border_radius.bottom_left**2
-        return False
 
-    @property
-    def painters(self) -> List[Painter]:
+    def _style_fields(self) -> tuple:
         """
-        Get the list of painters for this container.
+        Get the style values of this container, see instance_key.
 
         Returns:
-            A list of Painter objects that will be used to render this container.
+            tuple: The type name, fixed size, color, padding, margin and
+            border radius.
         """
+        padding, margin, radius = (
+            self._padding,
+            self._margin,
+            self._border_radius,
+        )
+        return (
+            self.__class__.__name__,
+            self._original_width,
+            self._original_height,
+            tuple(self._color),
+            (padding.top, padding.right, padding.bottom, padding.left),
+            (margin.top, margin.right, margin.bottom, margin.left),
+            (
+                radius.top_left,
+                radius.top_right,
+                radius.bottom_right,
+                radius.bottom_left,
+            ),
+        )
+
+    _properties = {
+        "width": "_original_width",
+        "height": "_original_height",
+        "color": "_color",
+        "padding": "_padding",
+        "margin": "_margin",
+        "border_radius": "_border_radius",
+    }
+
+    def _invalidate(self) -> None:
+        super()._invalidate()
+        self._width = self._original_width
+        self._height = self._original_height
+
+    def _instance_fields(self) -> tuple:
+        return self._style_fields() + (
+            self._child.instance_key if self._child is not None else None,
+        )
+
+    _groups_painters = True
+
+    def _child_widgets(self) -> List[Widget]:
+        return [self._child] if self._child is not None else []
+
+    def _needs_measure(self) -> bool:
+        return self._width is None or self._height is None
+
+    def _measure(self) -> None:
         if self._width is None:
             if self._child is not None:
                 self._width = (
@@ -171,17 +171,29 @@ class Container(Widget):
             else:
                 self._height = self._padding.vertical + self._margin.vertical
 
-        painters = [
-            Painter(
-                width=self._width,
-                height=self._height,
-                func=self._paint_func,
-                color=self._color,
+    def _placements(self) -> List[Tuple[Widget, int | float, int | float]]:
+        if self._child is None:
+            return []
+        return [
+            (
+                self._child,
+                self._padding.left + self._margin.left,
+                self._padding.top + self._margin.top,
             )
         ]
-        if self._child is not None:
-            for painter in self._child.painters:
-                painter.offset_x += self._padding.left + self._margin.left
-                painter.offset_y += self._padding.top + self._margin.top
-                painters.append(painter)
-        return painters
+
+    def _own_painters(self) -> List[Painter]:
+        return [self._background_painter(self.width, self.height)]
+
+    @property
+    def painters(self) -> List[Painter]:
+        """
+        Get the list of painters for this container.
+
+        The subtree is laid out and flattened without recursion, so deeply
+        nested documents are not limited by the recursion limit.
+
+        Returns:
+            A list of Painter objects that will be used to render this container.
+        """
+        return self._flatten()
@@ -0,0 +1,351 @@
+"""
+Per-character font fallback.
+
+A FallbackFont chains a primary font with fallback fonts and is used in
+place of a font object wherever text is measured and drawn. Each character
+is drawn with the first font of the chain whose cmap covers it, so mixed
+Latin, CJK and symbol text renders without tofu as long as some installed
+font has the glyphs.
+
+Coverage is read from the cmap table of each font file once and cached as
+a set of code points, so choosing the font of a character is a set lookup.
+Text that the primary font covers entirely is measured and drawn exactly as
+without fallback.
+"""
+
+import io
+import struct
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterator, List, Sequence, Tuple
+
+from PIL import ImageDraw
+
+# Preferred cmap subtables as (platform, encoding), full Unicode first
+_SUBTABLES = ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0))
+
+_coverages: "weakref.WeakKeyDictionary[Any, FrozenSet[int]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _cmap_format_4(data: bytes, offset: int) -> Iterator[int]:
+    """
+    Read the mapped code points of a format 4 cmap subtable.
+
+    Args:
+        data: The font file.
+        offset: The offset of the subtable.
+
+    Yields:
+        int: Each code point mapped to a glyph.
+    """
+    (segments,) = struct.unpack_from(">H", data, offset + 6)
+    segments //= 2
+    ends = struct.unpack_from(f">{segments}H", data, offset + 14)
+    starts_at = offset + 16 + 2 * segments
+    starts = struct.unpack_from(f">{segments}H", data, starts_at)
+    deltas = struct.unpack_from(
+        f">{segments}h", data, starts_at + 2 * segments
+    )
+    ranges_at = starts_at + 4 * segments
+    ranges = struct.unpack_from(f">{segments}H", data, ranges_at)
+    for i in range(segments):
+        if starts[i] == 0xFFFF:
+            continue
+        for code in range(starts[i], ends[i] + 1):
+            if ranges[i] == 0:
+                glyph = (code + deltas[i]) & 0xFFFF
+            else:
+                # Offset relative to the idRangeOffset entry itself
+                at = ranges_at + 2 * i + ranges[i] + 2 * (code - starts[i])
+                if at + 2 > len(data):
+                    continue
+                (glyph,) = struct.unpack_from(">H", data, at)
+                if glyph:
+                    glyph = (glyph + deltas[i]) & 0xFFFF
+            if glyph:
+                yield code
+
+
+def _cmap_format_12(data: bytes, offset: int) -> Iterator[int]:
+    """
+    Read the mapped code points of a format 12 cmap subtable.
+
+    Args:
+        data: The font file.
+        offset: The offset of the subtable.
+
+    Yields:
+        int: Each code point mapped to a glyph.
+    """
+    (groups,) = struct.unpack_from(">I", data, offset + 12)
+    for i in range(groups):
+        start, end, glyph = struct.unpack_from(
+            ">III", data, offset + 16 + 12 * i
+        )
+        # Glyph 0 is the missing glyph
+        yield from range(start + (glyph == 0), end + 1)
+
+
+def read_coverage(data: bytes, index: int = 0) -> FrozenSet[int]:
+    """
+    Read the code points a font maps to glyphs from its cmap table.
+
+    Args:
+        data: The content of a TrueType or OpenType file or collection.
+        index: The face index in a collection.
+
+    Returns:
+        FrozenSet[int]: The covered code points, empty if the font has no
+        supported cmap subtable.
+    """
+    face = 0
+    if data[:4] == b"ttcf":
+        (face,) = struct.unpack_from(">I", data, 12 + 4 * index)
+    (tables,) = struct.unpack_from(">H", data, face + 4)
+    cmap = None
+    for i in range(tables):
+        tag, _, table_offset, _ = struct.unpack_from(
+            ">4sIII", data, face + 12 + 16 * i
+        )
+        if tag == b"cmap":
+            cmap = table_offset
+    if cmap is None:
+        return frozenset()
+    (count,) = struct.unpack_from(">H", data, cmap + 2)
+    subtables = {}
+    for i in range(count):
+        platform, encoding, offset = struct.unpack_from(
+            ">HHI", data, cmap + 4 + 8 * i
+        )
+        subtables[(platform, encoding)] = cmap + offset
+    for key in _SUBTABLES:
+        offset = subtables.get(key)
+        if offset is None:
+            continue
+        (format,) = struct.unpack_from(">H", data, offset)
+        if format == 12:
+            return frozenset(_cmap_format_12(data, offset))
+        if format == 4:
+            return frozenset(_cmap_format_4(data, offset))
+    return frozenset()
+
+
+@lru_cache(maxsize=64)
+def _file_coverage(path: str, index: int) -> FrozenSet[int]:
+    """
+    Read the coverage of a font file, once per file and face.
+
+    Args:
+        path: The font file.
+        index: The face index in a collection.
+
+    Returns:
+        FrozenSet[int]: The covered code points.
+    """
+    with open(path, "rb") as f:
+        return read_coverage(f.read(), index)
+
+
+def font_coverage(font: Any) -> FrozenSet[int]:
+    """
+    Get the code points a font object has glyphs for.
+
+    Args:
+        font: A FreeType font object.
+
+    Returns:
+        FrozenSet[int]: The covered code points, empty if the font file
+        cannot be read.
+    """
+    with _lock:
+        coverage = _coverages.get(font)
+    if coverage is not None:
+        return coverage
+    path = getattr(font, "path", None)
+    index = getattr(font, "index", 0)
+    try:
+        if isinstance(path, str):
+            coverage = _file_coverage(path, index)
+        elif isinstance(path, io.BytesIO):
+            coverage = read_coverage(path.getvalue(), index)
+        else:
+            coverage = frozenset()
+    except (OSError, struct.error):
+        coverage = frozenset()
+    with _lock:
+        _coverages[font] = coverage
+    return coverage
+
+
+class FallbackFont:
+    """
+    A primary font with fallback fonts for the characters it lacks.
+    """
+
+    def __init__(self, fonts: Sequence[Any]):
+        """
+        Initialize the FallbackFont.
+
+        Args:
+            fonts: The font objects at the same size, the primary first.
+        """
+        self.fonts = tuple(fonts)
+        self.primary = self.fonts[0]
+        self._coverages = [font_coverage(font) for font in self.fonts]
+        ascent = self.primary.getmetrics()[0]
+        # Fonts are aligned on the baseline of the primary font
+        self._shifts = [ascent - font.getmetrics()[0] for font in self.fonts]
+        # Lines of multiline text are spaced as Pillow spaces them
+        self._line_spacing = self.primary.getbbox("A")[3] + 4
+
+    def runs(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Split text into runs drawn with the same font.
+
+        Whitespace stays in the run before it. Characters no font covers
+        are drawn with the primary font.
+
+        Args:
+            text: The text.
+
+        Returns:
+            List[Tuple[str, int]]: The runs and the index of their font.
+        """
+        primary = self._coverages[0]
+        if all(ord(char) in primary or char.isspace() for char in text):
+            return [(text, 0)]
+        runs: List[Tuple[str, int]] = []
+        start = 0
+        current = -1
+        for position, char in enumerate(text):
+            if char.isspace() and current >= 0:
+                continue
+            code = ord(char)
+            font = next(
+                (
+                    i
+                    for i, coverage in enumerate(self._coverages)
+                    if code in coverage
+                ),
+                0,
+            )
+            if font != current:
+                if current >= 0:
+                    runs.append((text[start:position], current))
+                start, current = position, font
+        runs.append((text[start:], max(current, 0)))
+        return runs
+
+    def placed_runs(self, text: str) -> Iterator[Tuple[str, Any, int, int]]:
+        """
+        Lay out the runs of text.
+
+        Lines separated by newlines are laid out below each other, left
+        aligned, like Pillow lays out multiline text.
+
+        Args:
+            text: The text.
+
+        Yields:
+            Tuple[str, Any, int, int]: Each run, its font and its integer
+            (x, y) offset from the text position.
+        """
+        for number, line in enumerate(text.split("\n")):
+            x = 0.0
+            y = number * self._line_spacing
+            for run, index in self.runs(line):
+                font = self.fonts[index]
+                yield run, font, int(x), y + self._shifts[index]
+                x += font.getlength(run)
+
+    def getlength(self, text: str) -> float:
+        """
+        Get the advance width of a single line of text.
+
+        Args:
+            text: The line of text.
+
+        Returns:
+            float: The width in pixels.
+        """
+        return sum(
+            self.fonts[index].getlength(run) for run, index in self.runs(text)
+        )
+
+    def getbbox(self, text: str) -> Tuple[int, int, int, int]:
+        """
+        Get the ink box of text drawn at (0, 0).
+
+        Args:
+            text: The text, lines separated by newlines.
+
+        Returns:
+            Tuple[int, int, int, int]: The (left, top, right, bottom) box.
+        """
+        boxes = []
+        for run, font, dx, dy in self.placed_runs(text):
+            left, top, right, bottom = font.getbbox(run)
+            boxes.append((left + dx, top + dy, right + dx, bottom + dy))
+        return (
+            min(box[0] for box in boxes),
+            min(box[1] for box in boxes),
+            max(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+
+    def getmetrics(self) -> Tuple[int, int]:
+        """
+        Get the ascent and descent of the primary font.
+
+        Returns:
+            Tuple[int, int]: The ascent and descent in pixels.
+        """
+        return self.primary.getmetrics()
+
+
+def text_bbox(
+    draw: ImageDraw.ImageDraw, text: str, font: Any
+) -> Tuple[float, float, float, float]:
+    """
+    Measure the ink box of text drawn at (0, 0), with or without fallback.
+
+    Args:
+        draw: A drawing context used to measure the text.
+        text: The text.
+        font: A font object or a FallbackFont.
+
+    Returns:
+        The (left, top, right, bottom) box.
+    """
+    if isinstance(font, FallbackFont):
+        runs = font.runs(text)
+        if len(runs) > 1 or runs[0][1] != 0:
+            return font.getbbox(text)
+        font = font.primary
+    return draw.textbbox((0, 0), text, font=font)
+
+
+@lru_cache(maxsize=256)
+def fallback_font(fonts: Tuple[Any, ...]) -> Any:
+    """
+    Get a FallbackFont for a chain of font objects, reusing instances.
+
+    Args:
+        fonts: The font objects, the primary first.
+
+    Returns:
+        The FallbackFont, or the primary font if the chain has no other
+        font covering any character.
+    """
+    primary = font_coverage(fonts[0])
+    chain = [fonts[0]]
+    for font in fonts[1:]:
+        if font not in chain and not font_coverage(font) <= primary:
+            chain.append(font)
+    if len(chain) == 1:
+        return fonts[0]
+    return FallbackFont(chain)
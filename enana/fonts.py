@@ -0,0 +1,384 @@
+"""
+Index of the fonts installed on the system.
+
+Font names such as ``"Arial"``, ``"DejaVu Sans Bold"`` or ``"NotoSansCJK-
+Regular.ttc"`` are resolved to font files without asking the platform. The
+standard font directories are scanned once, the family and style names of
+every face are read, and the index is saved to a cache file. The cache is
+reused as long as the modification times of the scanned directories are
+unchanged, which is what installing or removing a font changes.
+
+Common families that are not installed fall back to metric-compatible or
+similar families, so ``"Arial"`` resolves to Liberation Sans or DejaVu Sans
+on a typical Linux server.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import ImageFont
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc")
+CACHE_VERSION = 1
+
+# Styles a family name alone refers to, preferred in this order
+REGULAR_STYLES = ("regular", "book", "normal", "roman", "medium")
+# Style suffixes recognized in font names, longest first
+STYLES = (
+    "bolditalic",
+    "boldoblique",
+    "italic",
+    "oblique",
+    "bold",
+    "regular",
+    "book",
+)
+# Families to try when a family is not installed, by normalized name
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "arial": ("liberationsans", "arimo", "helvetica", "dejavusans"),
+    "helvetica": ("liberationsans", "arimo", "arial", "dejavusans"),
+    "timesnewroman": ("liberationserif", "tinos", "times", "dejavuserif"),
+    "times": ("liberationserif", "tinos", "timesnewroman", "dejavuserif"),
+    "couriernew": ("liberationmono", "cousine", "courier", "dejavusansmono"),
+    "courier": ("liberationmono", "cousine", "couriernew", "dejavusansmono"),
+    "sansserif": ("dejavusans", "notosans", "liberationsans", "arial"),
+    "serif": ("dejavuserif", "notoserif", "liberationserif", "timesnewroman"),
+    "monospace": ("dejavusansmono", "notosansmono", "liberationmono"),
+}
+
+# Fonts tried for characters the font of a Text lacks, in order. Fonts that
+# are not installed are skipped. Text is drawn as single color glyph masks,
+# so color emoji fonts are not supported: bitmap fonts such as Noto Color
+# Emoji only load at their fixed strike size and are skipped, and emoji are
+# drawn from the monochrome glyphs of the symbol fonts if at all.
+DEFAULT_FALLBACK = (
+    "Noto Sans CJK SC",
+    "Noto Sans CJK JP",
+    "Source Han Sans SC",
+    "WenQuanYi Zen Hei",
+    "WenQuanYi Micro Hei",
+    "Droid Sans Fallback",
+    "Noto Sans",
+    "DejaVu Sans",
+    "Noto Sans Symbols",
+    "Noto Sans Symbols2",
+)
+
+# A font file and the index of the face in it
+FontLocation = Tuple[str, int]
+
+
+def normalize(name: str) -> str:
+    """
+    Normalize a font name for lookups.
+
+    Args:
+        name: A family name, a family and style, or a file name.
+
+    Returns:
+        str: The name in lower case without spaces, dashes and underscores.
+    """
+    return "".join(c for c in name.lower() if c not in " -_")
+
+
+def font_directories() -> List[Path]:
+    """
+    Get the standard font directories of the platform.
+
+    Returns:
+        List[Path]: The directories, existing or not.
+    """
+    home = Path.home()
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        directories = [Path(windir) / "Fonts"]
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            directories.append(Path(local) / "Microsoft" / "Windows" / "Fonts")
+        return directories
+    if sys.platform == "darwin":
+        return [
+            Path("/System/Library/Fonts"),
+            Path("/Library/Fonts"),
+            home / "Library" / "Fonts",
+        ]
+    data_home = os.environ.get("XDG_DATA_HOME") or str(home / ".local/share")
+    data_dirs = (
+        os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    )
+    directories = [Path(data_home) / "fonts", home / ".fonts"]
+    directories += [Path(d) / "fonts" for d in data_dirs.split(":") if d]
+    # Keep the order, drop duplicates
+    return list(dict.fromkeys(directories))
+
+
+def default_cache_file() -> Path:
+    """
+    Get the path of the font index cache file.
+
+    Returns:
+        Path: The file in the user cache directory.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home())
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "enana" / "fonts.json"
+
+
+def _mtime(path: str) -> Optional[int]:
+    """
+    Get the modification time of a directory.
+
+    Args:
+        path: The directory.
+
+    Returns:
+        The modification time in nanoseconds, or None if it does not exist.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _faces(path: str) -> List[Tuple[int, str, str]]:
+    """
+    Read the family and style names of the faces in a font file.
+
+    Args:
+        path: The font file.
+
+    Returns:
+        List[Tuple[int, str, str]]: The index, family and style of each
+        face, empty if the file is not a readable font.
+    """
+    faces = []
+    index = 0
+    while True:
+        try:
+            font = ImageFont.truetype(path, 10, index=index)
+        except (OSError, ValueError):
+            break
+        family, style = font.getname()
+        faces.append((index, family or "", style or ""))
+        # Only collections hold more than one face
+        if not path.lower().endswith((".ttc", ".otc")):
+            break
+        index += 1
+    return faces
+
+
+class FontIndex:
+    """
+    Mapping of normalized font names to font files.
+
+    Names are file names with or without extension, "family style" and the
+    family alone for its regular face.
+    """
+
+    def __init__(
+        self,
+        names: Dict[str, FontLocation],
+        directories: Dict[str, Optional[int]],
+    ):
+        """
+        Initialize the FontIndex.
+
+        Args:
+            names: The font locations by normalized name.
+            directories: The modification times of the scanned directories,
+                None for directories that did not exist.
+        """
+        self.names = names
+        self.directories = directories
+
+    @classmethod
+    def scan(cls, roots: Sequence[Path]) -> "FontIndex":
+        """
+        Index the fonts in directories and their subdirectories.
+
+        Args:
+            roots: The directories to scan.
+
+        Returns:
+            FontIndex: The index.
+        """
+        names: Dict[str, FontLocation] = {}
+        regular: Dict[str, int] = {}
+        directories: Dict[str, Optional[int]] = {}
+        for root in roots:
+            directories[str(root)] = _mtime(str(root))
+            for directory, subdirectories, files in os.walk(root):
+                subdirectories.sort()
+                directories[directory] = _mtime(directory)
+                for file in sorted(files):
+                    if not file.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(directory, file)
+                    faces = _faces(path)
+                    if not faces:
+                        continue
+                    # Earlier directories take precedence, like fontconfig
+                    names.setdefault(normalize(file), (path, 0))
+                    names.setdefault(
+                        normalize(os.path.splitext(file)[0]), (path, 0)
+                    )
+                    for index, family, style in faces:
+                        family_key = normalize(family)
+                        names.setdefault(
+                            family_key + normalize(style), (path, index)
+                        )
+                        rank = (
+                            REGULAR_STYLES.index(normalize(style))
+                            if normalize(style) in REGULAR_STYLES
+                            else len(REGULAR_STYLES)
+                        )
+                        if rank < regular.get(
+                            family_key, len(REGULAR_STYLES) + 1
+                        ):
+                            regular[family_key] = rank
+                            names[family_key] = (path, index)
+        return cls(names, directories)
+
+    @classmethod
+    def load(cls, cache_file: Path) -> Optional["FontIndex"]:
+        """
+        Load an index from a cache file, if it is still valid.
+
+        Args:
+            cache_file: The cache file written by save.
+
+        Returns:
+            The index, or None if the file is missing, unreadable or any of
+            the scanned directories changed since.
+        """
+        try:
+            data = json.loads(cache_file.read_text("utf-8"))
+            if data["version"] != CACHE_VERSION:
+                return None
+            directories = data["directories"]
+            names = {
+                key: (str(path), int(index))
+                for key, (path, index) in data["names"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        for directory, mtime in directories.items():
+            if _mtime(directory) != mtime:
+                return None
+        return cls(names, directories)
+
+    def save(self, cache_file: Path) -> None:
+        """
+        Save the index to a cache file, ignoring unwritable locations.
+
+        Args:
+            cache_file: The cache file.
+        """
+        data = {
+            "version": CACHE_VERSION,
+            "directories": self.directories,
+            "names": self.names,
+        }
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see partial data
+            fd, temp = tempfile.mkstemp(dir=cache_file.parent)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(temp, cache_file)
+            except BaseException:
+                os.unlink(temp)
+                raise
+        except OSError:
+            pass
+
+    def is_current(self, roots: Sequence[Path]) -> bool:
+        """
+        Check if the index covers exactly the given unchanged directories.
+
+        Args:
+            roots: The directories the index should cover.
+
+        Returns:
+            True if no root was added, created or modified since the scan.
+        """
+        return all(
+            str(root) in self.directories
+            and self.directories[str(root)] == _mtime(str(root))
+            for root in roots
+        )
+
+    def find(self, name: str) -> Optional[FontLocation]:
+        """
+        Find the font file of a font name.
+
+        Args:
+            name: A file name, a family name, or a family and style such as
+                "Arial Bold".
+
+        Returns:
+            The font file and face index, or None if no installed font
+            matches the name or one of its fallback families.
+        """
+        key = normalize(name)
+        location = self.names.get(key)
+        if location is not None:
+            return location
+        key = normalize(os.path.splitext(name)[0])
+        location = self.names.get(key)
+        if location is not None:
+            return location
+        style = next((s for s in STYLES if key.endswith(s)), "")
+        family = key[: len(key) - len(style)]
+        for alias in ALIASES.get(family, ()):
+            location = self.names.get(alias + style) or self.names.get(alias)
+            if location is not None:
+                return location
+        return None
+
+
+_index: Optional[FontIndex] = None
+_lock = threading.Lock()
+
+
+def font_index() -> FontIndex:
+    """
+    Get the index of the system fonts, loading or building it once.
+
+    Returns:
+        FontIndex: The index shared by the process.
+    """
+    global _index
+    with _lock:
+        if _index is None:
+            roots = font_directories()
+            cache_file = default_cache_file()
+            index = FontIndex.load(cache_file)
+            if index is None or not index.is_current(roots):
+                index = FontIndex.scan(roots)
+                index.save(cache_file)
+            _index = index
+        return _index
+
+
+def find_font(name: str) -> Optional[FontLocation]:
+    """
+    Resolve a font path or name to a font file.
+
+    Args:
+        name: The path of a font file, or a name for FontIndex.find.
+
+    Returns:
+        The font file and face index, or None if the font is not found.
+    """
+    if os.path.isfile(name):
+        return name, 0
+    return font_index().find(name)
@@ -1,10 +1,30 @@
+import io
 import multiprocessing
+import struct
+import zlib
+from math import ceil, floor
 from pathlib import Path
-from typing import Any, Callable, List, Optional, Tuple, Union
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from PIL import Image, ImageDraw
 
-from .painter import ImagePainter
+from .fallback import text_bbox
+from .glyphs import draw_run
+from .linebreak import break_lines
+from .painter import ImagePainter, Painter, RectPainter, TextPainter
+from .spatial import PainterGrid, overlaps
+from .typing import RenderQuality
 
 try:
     # Get the number of CPU cores for multiprocessing
@@ -14,11 +34,343 @@ except NotImplementedError:
     CPU_COUNT = 4
 
 
+class EncodeOptions:
+    """
+    Options for encoding rendered images.
+
+    PNG output can trade speed for size with compress_level, the zlib
+    strategy and palette quantization; WebP and JPEG are usually much
+    smaller. With opaque_rgb, pages without any transparent pixel are
+    written without the alpha channel.
+    """
+
+    STRATEGIES = {
+        "default": zlib.Z_DEFAULT_STRATEGY,
+        "filtered": zlib.Z_FILTERED,
+        "huffman": zlib.Z_HUFFMAN_ONLY,
+        "rle": zlib.Z_RLE,
+        "fixed": zlib.Z_FIXED,
+    }
+
+    def __init__(
+        self,
+        *,
+        format: Optional[str] = None,
+        compress_level: int = 6,
+        strategy: str = "default",
+        optimize: bool = False,
+        quantize: Optional[int] = None,
+        quality: int = 90,
+        lossless: bool = False,
+        method: int = 4,
+        opaque_rgb: bool = True,
+    ):
+        """
+        Initialize the EncodeOptions.
+
+        Args:
+            format: "png", "webp" or "jpeg", None infers it from the file name
+                when saving and uses PNG otherwise.
+            compress_level: PNG zlib level, 0 (fastest) to 9 (smallest).
+            strategy: PNG zlib strategy, one of STRATEGIES.
+            optimize: Let the PNG encoder search for the smallest output, slow.
+            quantize: Reduce PNG output to a palette of this many colors.
+            quality: WebP and JPEG quality, 0 to 100.
+            lossless: Use lossless WebP.
+            method: WebP effort, 0 (fastest) to 6 (smallest).
+            opaque_rgb: Drop the alpha channel when every pixel is opaque.
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown PNG strategy: {strategy}")
+        self.format = format.lower() if format else None
+        self.compress_level = compress_level
+        self.strategy = strategy
+        self.optimize = optimize
+        self.quantize = quantize
+        self.quality = quality
+        self.lossless = lossless
+        self.method = method
+        self.opaque_rgb = opaque_rgb
+
+    def prepare(self, img: Image.Image, format: str) -> Image.Image:
+        """
+        Convert an image to the mode it will be encoded in.
+
+        Args:
+            img: The RGBA image to encode.
+            format: The output format.
+
+        Returns:
+            Image.Image: The image to pass to the encoder.
+        """
+        opaque = (
+            img.mode != "RGBA" or img.getchannel("A").getextrema()[0] == 255
+        )
+        if format == "jpeg":
+            if not opaque:
+                # JPEG has no alpha, flatten onto white
+                background = Image.new("RGBA", img.size, (255, 255, 255, 255))
+                img = Image.alpha_composite(background, img)
+            return img.convert("RGB")
+        if self.opaque_rgb and opaque and img.mode == "RGBA":
+            img = img.convert("RGB")
+        if format == "png" and self.quantize:
+            img = img.quantize(
+                colors=self.quantize, method=Image.Quantize.FASTOCTREE
+            )
+        return img
+
+    def params(self, format: str) -> dict:
+        """
+        Get the Pillow save parameters of a format.
+
+        Args:
+            format: The output format.
+
+        Returns:
+            dict: Keyword arguments for PIL.Image.Image.save.
+        """
+        if format == "png":
+            return {
+                "compress_level": self.compress_level,
+                "compress_type": self.STRATEGIES[self.strategy],
+                "optimize": self.optimize,
+            }
+        if format == "webp":
+            return {
+                "quality": self.quality,
+                "lossless": self.lossless,
+                "method": self.method,
+            }
+        if format == "jpeg":
+            return {"quality": self.quality}
+        return {}
+
+
+def encode_image(
+    img: Image.Image, encoding: Optional[EncodeOptions] = None
+) -> bytes:
+    """
+    Encode an image to bytes.
+
+    Args:
+        img: The RGBA image to encode.
+        encoding: Encoding options, defaults to PNG with default settings.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    encoding = encoding or EncodeOptions()
+    format = encoding.format or "png"
+    buffer = io.BytesIO()
+    encoding.prepare(img, format).save(
+        buffer, format=format.upper(), **encoding.params(format)
+    )
+    return buffer.getvalue()
+
+
+def save_image(
+    img: Image.Image, filename: Path, encoding: Optional[EncodeOptions] = None
+) -> None:
+    """
+    Encode an image to a file.
+
+    Args:
+        img: The RGBA image to encode.
+        filename: The file path to save the image to.
+        encoding: Encoding options, the format defaults to the file extension.
+    """
+    encoding = encoding or EncodeOptions()
+    format = encoding.format
+    if format is None:
+        extension = Path(filename).suffix.lower()
+        format = Image.registered_extensions().get(extension, "PNG").lower()
+    encoding.prepare(img, format).save(
+        filename, format=format.upper(), **encoding.params(format)
+    )
+
+
+class PNGStreamWriter:
+    """
+    Incremental PNG encoder for images produced a few rows at a time.
+
+    Rows are compressed as they arrive, so only the compressor state is kept
+    in memory. Rows are stored unfiltered, which compresses flat UI colors
+    well and costs nothing to compute.
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        width: int,
+        height: int,
+        encoding: Optional[EncodeOptions] = None,
+    ):
+        """
+        Write the PNG header.
+
+        Args:
+            fileobj: The binary stream to write to.
+            width: The width of the image.
+            height: The height of the image.
+            encoding: Encoding options, compress_level and strategy apply.
+        """
+        encoding = encoding or EncodeOptions()
+        self._file = fileobj
+        self.width = width
+        self.height = height
+        self._rows = 0
+        self._compressor = zlib.compressobj(
+            encoding.compress_level,
+            zlib.DEFLATED,
+            zlib.MAX_WBITS,
+            zlib.DEF_MEM_LEVEL,
+            EncodeOptions.STRATEGIES[encoding.strategy],
+        )
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits per channel, RGBA, no interlacing
+        self._chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+        )
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        """
+        Write a PNG chunk.
+
+        Args:
+            kind: The chunk type.
+            data: The chunk data.
+        """
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write(self, strip: Image.Image) -> None:
+        """
+        Append rows to the image.
+
+        Args:
+            strip: An RGBA image as wide as the PNG holding the next rows.
+        """
+        if strip.mode != "RGBA" or strip.width != self.width:
+            raise ValueError("Strips must be RGBA and as wide as the image")
+        if self._rows + strip.height > self.height:
+            raise ValueError("More rows written than the image height")
+        stride = self.width * 4
+        pixels = strip.tobytes()
+        data = bytearray()
+        for offset in range(0, len(pixels), stride):
+            data += b"\x00"
+            data += pixels[offset : offset + stride]  # noqa: E203
+        self._rows += strip.height
+        compressed = self._compressor.compress(bytes(data))
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+
+    def close(self) -> None:
+        """
+        Finish the image.
+
+        Raises:
+            ValueError: If fewer rows than the image height were written.
+        """
+        if self._rows != self.height:
+            raise ValueError(
+                f"{self._rows} rows written, the image has {self.height}"
+            )
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+
+
+class FrameBuffer:
+    """
+    The raw RGBA pixels of a rendered frame, for zero-copy consumers.
+
+    Pixels are stored row by row, 4 bytes per pixel, without padding, in a
+    bytearray owned by this object. The image attribute is a Pillow image
+    wrapping the same memory, so the renderer draws straight into it.
+
+    Lifetime rules: memoryviews and NumPy arrays obtained from a FrameBuffer
+    share its memory and keep it alive, so they stay valid after the
+    FrameBuffer itself is dropped. Writes through any of them are visible in
+    all the others. Pillow operations returning a new image (convert,
+    resize, ...) copy the pixels and are not shared. The buffer never
+    changes size, so exported views cannot be invalidated.
+    """
+
+    mode = "RGBA"
+
+    def __init__(self, width: int, height: int):
+        """
+        Allocate a transparent frame.
+
+        Args:
+            width: The width of the frame in pixels.
+            height: The height of the frame in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.stride = width * 4
+        self.data = bytearray(self.stride * height)
+        self.image = Image.frombuffer(
+            "RGBA",
+            (width, height),
+            self.data,  # type: ignore[arg-type]
+            "raw",
+            "RGBA",
+            0,
+            1,
+        )
+        # Pillow marks mapped buffers read-only and copies them on the first
+        # write, which would detach the image from data
+        self.image.readonly = 0
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """
+        Export the pixels through the buffer protocol.
+
+        Args:
+            flags: The buffer request flags.
+
+        Returns:
+            memoryview: A view of the pixels shaped (height, width, 4).
+        """
+        return self.memoryview()
+
+    def memoryview(self) -> memoryview:
+        """
+        Get a view of the pixels.
+
+        Returns:
+            memoryview: A writable view of unsigned bytes shaped (height, width, 4).
+        """
+        return memoryview(self.data).cast("B", (self.height, self.width, 4))
+
+    def to_numpy(self) -> Any:
+        """
+        Get the pixels as a NumPy array without copying.
+
+        Returns:
+            numpy.ndarray: A writable uint8 array shaped (height, width, 4).
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        import numpy
+
+        return numpy.frombuffer(self.data, dtype=numpy.uint8).reshape(
+            self.height, self.width, 4
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(width={self.width}, height={self.height})"
+
+
 def _generate_chunk(
     func: Callable[[int, int], Tuple[int, int, int, int]],
     y_start: int,
     y_end: int,
     width: int,
+    tile: int = 1,
 ) -> List[Tuple[int, int, int, int]]:
     """
     Generates pixel data for a chunk of an image.
@@ -28,45 +380,59 @@ def _generate_chunk(
         y_start: The starting y-coordinate of the chunk.
         y_end: The ending y-coordinate of the chunk.
         width: The width of the image.
+        tile: The edge length of the pixel tiles sharing one sample.
 
     Returns:
         A list containing the RGBA values of all pixels in the chunk.
     """
     chunk_data = []
-    # Iterate over each pixel in the chunk
-    for y in range(y_start, y_end):
-        for x in range(width):
-            # Call the function to generate pixel data and add it to the list
-            chunk_data.append(func(x, y))
+    if tile <= 1:
+        # Iterate over each pixel in the chunk
+        for y in range(y_start, y_end):
+            for x in range(width):
+                # Call the function to generate pixel data and add it to the list
+                chunk_data.append(func(x, y))
+        return chunk_data
+    # Sample the top-left pixel of each tile and repeat it across the tile
+    for y in range(y_start, y_end, tile):
+        row = []
+        for x in range(0, width, tile):
+            row.extend([func(x, y)] * tile)
+        del row[width:]
+        for _ in range(min(tile, y_end - y)):
+            chunk_data.extend(row)
     return chunk_data
 
 
-def generate_image(
+def render_image(
     func: Callable[[int, int], Tuple[int, int, int, int]],
     width: int,
     height: int,
-    filename: Path,
-) -> None:
+    tile: int = 1,
+) -> Image.Image:
     """
-    Creates and saves an image in parallel using multiprocessing.
+    Creates an image in parallel using multiprocessing.
 
     Args:
         func: A function that takes x and y coordinates and returns an RGBA tuple.
         width: The width of the image.
         height: The height of the image.
-        filename: The file path to save the image to.
+        tile: The edge length of the pixel tiles sharing one sample, 1 samples every pixel.
+
+    Returns:
+        The generated RGBA image.
     """
     # Create a process pool
     with multiprocessing.Pool(CPU_COUNT) as pool:
-        # Calculate the height of each chunk
-        chunk_size = height // CPU_COUNT
+        # Calculate the height of each chunk, aligned to whole tiles
+        chunk_size = height // CPU_COUNT // tile * tile
         # Create a list of tasks, where each task processes a chunk of the image
         tasks = [
-            (func, i * chunk_size, (i + 1) * chunk_size, width)
+            (func, i * chunk_size, (i + 1) * chunk_size, width, tile)
             for i in range(CPU_COUNT)
         ]
         # Ensure the last task processes up to the bottom of the image
-        tasks[-1] = (func, tasks[-1][1], height, width)
+        tasks[-1] = (func, tasks[-1][1], height, width, tile)
         # Execute the tasks in parallel using starmap
         results = pool.starmap(_generate_chunk, tasks)
     # Combine the pixel data from all chunks into a single list
@@ -75,111 +441,608 @@ def generate_image(
     img = Image.new("RGBA", (width, height))
     # Put the pixel data into the image
     img.putdata(pixel_data)
-    # Save the image
-    img.save(filename)
+    return img
+
+
+def generate_image(
+    func: Callable[[int, int], Tuple[int, int, int, int]],
+    width: int,
+    height: int,
+    filename: Path,
+    tile: int = 1,
+    encoding: Optional[EncodeOptions] = None,
+) -> None:
+    """
+    Creates and saves an image in parallel using multiprocessing.
+
+    Args:
+        func: A function that takes x and y coordinates and returns an RGBA tuple.
+        width: The width of the image.
+        height: The height of the image.
+        filename: The file path to save the image to.
+        tile: The edge length of the pixel tiles sharing one sample, 1 samples every pixel.
+        encoding: Encoding options, the format defaults to the file extension.
+    """
+    save_image(render_image(func, width, height, tile), filename, encoding)
+
+
+def composite_painters(
+    painters: Sequence[Painter],
+    width: int,
+    height: int,
+    scale: float,
+    quality: RenderQuality = RenderQuality.FINAL,
+    image: Optional[Image.Image] = None,
+    origin: Tuple[int, int] = (0, 0),
+) -> Image.Image:
+    """
+    Composite the shapes of painters onto an image.
+
+    Painters are drawn back to front, so earlier painters end up on top,
+    matching the order used by DrawFunction.
+
+    Args:
+        painters: Painters sorted from the topmost to the bottommost.
+        width: The width of the image.
+        height: The height of the image.
+        scale: Scale factor for the drawing.
+        quality: The render quality tier.
+        image: A transparent RGBA image of the given size to draw on, a new
+            one is created when None.
+        origin: The page pixel at the top-left corner of the image, for
+            drawing a region of the page.
+
+    Returns:
+        The composited RGBA image.
+    """
+    img = image if image is not None else Image.new("RGBA", (width, height))
+    for painter in reversed(painters):
+        if all(painter.color):
+            painter.rasterize(img, scale, quality, origin)
+    return img
 
 
 def draw_text(
-    image: Path,
+    image: Union[Path, Image.Image],
     text: str,
     position: Tuple[int, int],
     color: Tuple[int, int, int, int],
     font: Union[str, Any] = "Arial",
     font_size: int = 12,
     max_width: Optional[int] = None,
+    quality: RenderQuality = RenderQuality.FINAL,
+    lines: Optional[Sequence[str]] = None,
+    stats: Optional["RenderStats"] = None,
+    fallback: Sequence[str] = (),
 ):
     """
     Draw text on an existing image with automatic line wrapping support.
 
+    Lines are drawn through the glyph run cache, see enana.glyphs.
+
     Args:
-        image: Path to the image file.
+        image: Path to the image file, or an image to draw on in place.
         text: The text to draw.
         position: The (x, y) coordinates where the text should start.
         color: The RGBA color of the text.
         font: The font name or font object to use.
         font_size: The font size in points.
         max_width: The maximum width before wrapping occurs.
+        quality: The render quality tier, selects the text layout engine.
+        lines: The lines of a wrapped text broken at layout time, used
+            instead of wrapping at max_width again.
+        stats: Counters to update.
+        fallback: Names of fonts for the characters the font lacks.
     """
     # Open the image
-    img = Image.open(image)
-    # Get the image size
-    width, height = img.size
+    img = image if isinstance(image, Image.Image) else Image.open(image)
     # Create a font object
     from .utils import get_font
 
-    font_obj = get_font(font, font_size)
+    font_obj = get_font(font, font_size, quality.layout_engine, fallback)
     # Create a drawing context
     draw = ImageDraw.Draw(img)
 
     # Handle automatic line wrapping
     if max_width is None:
         # If no max_width is set, draw the text directly
-        draw.text(position, text, font=font_obj, fill=color)
-    else:
-        # Implement automatic line wrapping
-        x, y = position
-
-        # Calculate single line height
-        line_height = int(
-            draw.textbbox((0, 0), "A", font=font_obj)[3]
-            - draw.textbbox((0, 0), "A", font=font_obj)[1]
-        )
-        line_height = int(line_height * 1.5)  # Line height coefficient
+        lines = [text]
+    elif lines is None:
+        lines = wrap_text(draw, text, font_obj, max_width)
+    _draw_lines(
+        draw,
+        position,
+        lines,
+        font_obj,
+        _line_height(draw, font_obj),
+        color,
+        stats,
+    )
 
-        # Split words
-        words = text.split()
-        if not words:
-            return
+    # Save the image
+    if not isinstance(image, Image.Image):
+        img.save(image)
 
-        current_line = words[0]
 
-        for word in words[1:]:
-            # Test the width of current line plus the next word
-            test_line = f"{current_line} {word}"
-            test_bbox = draw.textbbox((0, 0), test_line, font=font_obj)
-            test_width = int(test_bbox[2] - test_bbox[0])
+def _line_height(draw: ImageDraw.ImageDraw, font: Any) -> int:
+    """
+    Get the distance between the lines of wrapped text.
 
-            if test_width <= max_width:
-                # If adding the next word still fits within max_width, continue
-                current_line = test_line
-            else:
-                # Otherwise, draw the current line and start a new one
-                draw.text((x, y), current_line, font=font_obj, fill=color)
-                y += line_height
-                current_line = word
+    Args:
+        draw: A drawing context used to measure the text.
+        font: The font object.
 
-        # Draw the last line
-        draw.text((x, y), current_line, font=font_obj, fill=color)
+    Returns:
+        int: The line height in pixels.
+    """
+    bbox = text_bbox(draw, "A", font)
+    return int(int(bbox[3] - bbox[1]) * 1.5)  # Line height coefficient
 
-    # Save the image
-    img.save(image)
+
+def _draw_lines(
+    draw: ImageDraw.ImageDraw,
+    position: Tuple[int, int],
+    lines: Sequence[str],
+    font: Any,
+    line_height: int,
+    color: Tuple[int, int, int, int],
+    stats: Optional["RenderStats"],
+) -> None:
+    """
+    Draw lines of text below each other.
+
+    Args:
+        draw: The drawing context of the target image.
+        position: The (x, y) position of the first line.
+        lines: The lines of text.
+        font: The font object, at the drawn size.
+        line_height: The distance between lines.
+        color: The RGBA color of the text.
+        stats: Counters to update.
+    """
+    x, y = position
+    for line in lines:
+        hit = draw_run(draw, (x, y), line, font, color)
+        if stats is not None:
+            stats.glyph_runs += 1
+            stats.glyph_hits += hit
+        y += line_height
+
+
+def draw_texts(
+    image: Image.Image,
+    painters: Sequence[Painter],
+    scale: float,
+    quality: RenderQuality,
+    origin: Tuple[int, int] = (0, 0),
+    stats: Optional["RenderStats"] = None,
+) -> None:
+    """
+    Draw the text painters among painters onto an image in one pass.
+
+    Fonts and line heights are resolved once per font and size, and texts
+    are drawn in the order of painters through one drawing context.
+
+    Args:
+        image: The RGBA image to draw on, modified in place.
+        painters: The painters, non-text painters are skipped.
+        scale: Scale factor for the drawing.
+        quality: Render quality tier, selects the text layout engine.
+        origin: The page pixel at the top-left corner of the image.
+        stats: Counters to update.
+    """
+    from .utils import get_font
+
+    draw = ImageDraw.Draw(image)
+    fonts: Dict[Tuple[Any, int, Tuple[str, ...]], Tuple[Any, int]] = {}
+    for painter in painters:
+        if not isinstance(painter, TextPainter):
+            continue
+        font_size = int(painter.font_size * scale)
+        font_key = (painter.font, font_size, painter.fallback)
+        resolved = fonts.get(font_key)
+        if resolved is None:
+            font = get_font(
+                painter.font,
+                font_size,
+                quality.layout_engine,
+                painter.fallback,
+            )
+            resolved = fonts[font_key] = (font, _line_height(draw, font))
+        font, line_height = resolved
+        if painter.max_width is None:
+            lines: Sequence[str] = [painter.text]
+        elif painter.lines is not None:
+            lines = painter.lines
+        else:
+            lines = wrap_text(
+                draw, painter.text, font, int(painter.max_width * scale)
+            )
+        _draw_lines(
+            draw,
+            (
+                int(painter.offset_x * scale) - origin[0],
+                int(painter.offset_y * scale) - origin[1],
+            ),
+            lines,
+            font,
+            line_height,
+            painter.color,
+            stats,
+        )
+
+
+def wrap_text(
+    draw: ImageDraw.ImageDraw, text: str, font: Any, max_width: int | float
+) -> List[str]:
+    """
+    Break text into lines so that each line fits max_width.
+
+    Lines break at spaces and between CJK characters, see enana.linebreak.
+
+    Args:
+        draw: A drawing context used to measure the text.
+        text: The text to wrap.
+        font: The font object to measure with.
+        max_width: The maximum width of a line.
+
+    Returns:
+        List[str]: The lines, empty if the text has no words.
+    """
+    return [line for line, _ in break_lines(draw, text, font, max_width)]
 
 
 def draw_image(
-    image: Path,
+    image: Union[Path, Image.Image],
     image_painter: "ImagePainter",
     scale: float,
+    quality: RenderQuality = RenderQuality.FINAL,
+    origin: Tuple[int, int] = (0, 0),
 ):
     """
     Draw one image onto another image.
 
     Args:
-        image: Path to the target image file.
+        image: Path to the target image file, or an image to draw on in place.
         image_painter: ImagePainter object containing the image to draw and related parameters.
         scale: Scale factor for the drawing.
+        quality: The render quality tier, selects the resampling filter.
+        origin: The page pixel at the top-left corner of the target image.
     """
     # Open the target image
-    img = Image.open(image)
+    img = image if isinstance(image, Image.Image) else Image.open(image)
 
-    # Call _resize_image method during rendering with scale factor
-    resized_image = image_painter._resize_image(scale)
+    # Resize during rendering with the scale factor
+    resized_image = image_painter.resized_image(scale, quality)
 
     # Calculate drawing position
-    x = int(image_painter.offset_x * scale)
-    y = int(image_painter.offset_y * scale)
+    x = int(image_painter.offset_x * scale) - origin[0]
+    y = int(image_painter.offset_y * scale) - origin[1]
 
     # Draw the image
     img.paste(resized_image, (x, y), resized_image)
 
     # Save the image
-    img.save(image)
+    if not isinstance(image, Image.Image):
+        img.save(image)
+
+
+class RenderStats:
+    """
+    Counters collected while rendering, pass one to a render to inspect it.
+
+    Attributes:
+        painters: Painters drawn directly onto the page.
+        instances: Repeated subtrees blitted from a tile.
+        tiles: Tiles rendered for repeated subtrees.
+        glyph_runs: Lines of text drawn.
+        glyph_hits: Lines of text drawn from the glyph run cache.
+        redrawn: Page pixels redrawn by an incremental render.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize all counters to zero.
+        """
+        self.painters = 0
+        self.instances = 0
+        self.tiles = 0
+        self.glyph_runs = 0
+        self.glyph_hits = 0
+        self.redrawn = 0
+
+    @property
+    def tile_hits(self) -> int:
+        """
+        The number of instances blitted from an already rendered tile.
+        """
+        return self.instances - self.tiles
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
+
+
+def _fills(
+    painter: Painter,
+    box: Tuple[int, int, int, int],
+    image: Image.Image,
+    scale: float,
+    origin: Tuple[int, int],
+) -> bool:
+    """
+    Check if a painter fills a pixel box with a single flat color.
+
+    Args:
+        painter: The painter.
+        box: The (left, top, right, bottom) page pixel box.
+        image: The image being drawn on.
+        scale: Scale factor for the drawing.
+        origin: The page pixel at the top-left corner of the image.
+
+    Returns:
+        True if the painter is a rectangle covering the box away from its
+        rounded corners, False otherwise.
+    """
+    if not isinstance(painter, RectPainter):
+        return False
+    rect = painter._pixel_box(
+        image,
+        scale,
+        painter.left,
+        painter.top,
+        painter.left + painter.rect_width,
+        painter.top + painter.rect_height,
+        origin,
+    )
+    if rect is None or not (
+        rect[0] <= box[0]
+        and rect[1] <= box[1]
+        and box[2] <= rect[2]
+        and box[3] <= rect[3]
+    ):
+        return False
+    radius = painter.border_radius
+    x0, y0, x1, y1 = rect
+    for r, (cx, cy) in (
+        (radius.top_left, (x0, y0)),
+        (radius.top_right, (x1, y0)),
+        (radius.bottom_right, (x1, y1)),
+        (radius.bottom_left, (x0, y1)),
+    ):
+        size = ceil(r * scale)
+        if size and overlaps(
+            box,
+            (
+                cx - size if cx == x1 else cx,
+                cy - size if cy == y1 else cy,
+                cx if cx == x1 else cx + size,
+                cy if cy == y1 else cy + size,
+            ),
+        ):
+            return False
+    return True
+
+
+# The member painter indices of each subtree group, the instance key of
+# each group and the number of groups with each key, see instance_groups
+InstanceGroups = Tuple[
+    Dict[int, List[int]], Dict[int, bytes], Dict[bytes, int]
+]
+
+
+def instance_groups(painters: Sequence[Painter]) -> InstanceGroups:
+    """
+    Group the painters of a display list by the subtrees they belong to.
+
+    The grouping does not depend on the scale, so it can be computed once
+    for a display list that is rendered repeatedly, see CompiledPage.
+
+    Args:
+        painters: The painters sorted by z-index, topmost first.
+
+    Returns:
+        InstanceGroups: The groups, their keys and the count of each key.
+    """
+    groups: Dict[int, List[int]] = {}
+    keys: Dict[int, bytes] = {}
+    for index, painter in enumerate(painters):
+        for key, group in painter.groups:
+            groups.setdefault(group, []).append(index)
+            keys[group] = key
+    counts: Dict[bytes, int] = {}
+    for key in keys.values():
+        counts[key] = counts.get(key, 0) + 1
+    return groups, keys, counts
+
+
+def _plan_instances(
+    painters: Sequence[Painter],
+    scale: float,
+    image: Image.Image,
+    origin: Tuple[int, int],
+    instances: Optional[InstanceGroups] = None,
+    grid: Optional[PainterGrid] = None,
+) -> List[Tuple[tuple, Tuple[int, int, int, int], List[int], List[int]]]:
+    """
+    Find repeated subtrees that can be rendered once and blitted.
+
+    A subtree is instanced when another subtree has the same instance key,
+    it sits at the same sub-pixel phase, and nothing but flat rectangles
+    drawn below it touches its pixels. Its final pixels then only depend on
+    its key, its phase and the color below it.
+
+    Args:
+        painters: The painters sorted by z-index, topmost first.
+        scale: Scale factor for the drawing.
+        image: The image being drawn on.
+        origin: The page pixel at the top-left corner of the image.
+        instances: The groups of painters, computed when None.
+        grid: A spatial index of painters, built when None.
+
+    Returns:
+        A list of (tile key, page pixel box, member indices, indices of the
+        flat rectangles below) of the instanced subtrees.
+    """
+    groups, keys, counts = (
+        instances if instances is not None else instance_groups(painters)
+    )
+    if all(count < 2 for count in counts.values()):
+        return []
+
+    bounds = [painter.bounds(scale) for painter in painters]
+    indices = {id(painter): index for index, painter in enumerate(painters)}
+    if grid is None:
+        grid = PainterGrid(list(painters))
+    covered: Set[int] = set()
+    backdrops: Set[int] = set()
+    plan = []
+    # Outermost subtrees first, they contain the most painters
+    for group in sorted(groups, key=lambda g: -len(groups[g])):
+        members = groups[group]
+        if (
+            counts[keys[group]] < 2
+            or covered.intersection(members)
+            or backdrops.intersection(members)
+        ):
+            continue
+        box = (
+            min(bounds[i][0] for i in members),
+            min(bounds[i][1] for i in members),
+            max(bounds[i][2] for i in members),
+            max(bounds[i][3] for i in members),
+        )
+        member_set = set(members)
+        below = []
+        for other in grid.query(box, scale):
+            index = indices[id(other)]
+            if index in member_set or not overlaps(bounds[index], box):
+                continue
+            if not isinstance(other, (TextPainter, ImagePainter)) and not all(
+                other.color
+            ):
+                # Never drawn, see composite_painters
+                continue
+            if (
+                index > members[-1]
+                and index not in covered
+                and _fills(other, box, image, scale, origin)
+            ):
+                below.append(index)
+                continue
+            break
+        else:
+            anchor_x = min(painters[i].offset_x for i in members) * scale
+            anchor_y = min(painters[i].offset_y for i in members) * scale
+            below.sort(reverse=True)
+            tile_key = (
+                keys[group],
+                round(anchor_x % 1, 6),
+                round(anchor_y % 1, 6),
+                box[0] - floor(anchor_x),
+                box[1] - floor(anchor_y),
+                box[2] - box[0],
+                box[3] - box[1],
+                tuple(painters[i].color for i in below),
+            )
+            plan.append((tile_key, box, members, below))
+            covered.update(members)
+            backdrops.update(below)
+    return plan
+
+
+def draw_painters(
+    painters: Sequence[Painter],
+    scale: float,
+    quality: RenderQuality,
+    image: Image.Image,
+    origin: Tuple[int, int] = (0, 0),
+    *,
+    instancing: bool = False,
+    stats: Optional[RenderStats] = None,
+    instances: Optional[InstanceGroups] = None,
+    grid: Optional[PainterGrid] = None,
+) -> Image.Image:
+    """
+    Draw painters onto an image covering the page from origin on.
+
+    Shapes are composited first, then texts, then images.
+
+    With instancing, repeated identical subtrees (see Widget.instance_key)
+    are rendered once into a tile, which is blitted at every other
+    occurrence. Only subtrees whose pixels provably match are instanced, so
+    the result is the same either way.
+
+    Args:
+        painters: The painters sorted by z-index, topmost first.
+        scale: Scale factor for the image.
+        quality: Render quality tier.
+        image: The transparent RGBA image to draw on.
+        origin: The page pixel at the top-left corner of the image.
+        instancing: Reuse the rendering of repeated subtrees.
+        stats: Counters to update.
+        instances: The instance_groups of painters, when precomputed.
+        grid: A spatial index of painters, when prebuilt.
+
+    Returns:
+        Image.Image: The image that was drawn on.
+    """
+    if instancing:
+        plan = _plan_instances(painters, scale, image, origin, instances, grid)
+        if plan:
+            instanced: Set[int] = set()
+            for _, _, members, _ in plan:
+                instanced.update(members)
+            # Flat rectangles below the instances are drawn in both passes
+            rest = [
+                painter
+                for index, painter in enumerate(painters)
+                if index not in instanced
+            ]
+            draw_painters(rest, scale, quality, image, origin, stats=stats)
+            tiles: Dict[tuple, Image.Image] = {}
+            for tile_key, box, members, below in plan:
+                tile = tiles.get(tile_key)
+                if tile is None:
+                    tile = Image.new(
+                        "RGBA", (box[2] - box[0], box[3] - box[1])
+                    )
+                    draw_painters(
+                        [painters[i] for i in sorted(members + below)],
+                        scale,
+                        quality,
+                        tile,
+                        (box[0], box[1]),
+                    )
+                    tiles[tile_key] = tile
+                    if stats is not None:
+                        stats.tiles += 1
+                if stats is not None:
+                    stats.instances += 1
+                image.paste(tile, (box[0] - origin[0], box[1] - origin[1]))
+            return image
+
+    if stats is not None:
+        stats.painters += len(painters)
+    img = composite_painters(
+        painters,
+        width=image.width,
+        height=image.height,
+        scale=scale,
+        quality=quality,
+        image=image,
+        origin=origin,
+    )
+
+    draw_texts(img, painters, scale, quality, origin, stats)
+
+    for image_painter in painters:
+        if isinstance(image_painter, ImagePainter):
+            draw_image(
+                image=img,
+                image_painter=image_painter,
+                scale=scale,
+                quality=quality,
+                origin=origin,
+            )
+
+    return img
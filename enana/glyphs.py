@@ -0,0 +1,142 @@
+"""
+Cache of rasterized glyph runs.
+
+Pages repeat the same short strings many times, such as column headers,
+units and rank numbers. A glyph run is one line of text rasterized with one
+font into an alpha mask; the mask does not depend on the color or the
+position, so it is rendered by FreeType once and every later occurrence is
+a single colored paste of the cached mask.
+
+Masks are drawn at integer positions, where FreeType output does not depend
+on the position, so cached runs are pixel-identical to drawing the text.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from .fallback import FallbackFont
+
+# A mask and the offset of its top-left corner from the text position
+GlyphRun = Tuple[Image.Image, Tuple[int, int]]
+
+
+class GlyphCache:
+    """
+    An LRU of glyph run masks bounded by their total size in bytes.
+
+    Thread-safe, runs rendered concurrently are rendered twice and one of
+    them is kept.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Initialize the GlyphCache.
+
+        Args:
+            max_bytes: The maximum total size of the cached masks.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        # Keyed by (text, font), the key keeps the font object alive
+        self._items: OrderedDict[Tuple[str, Any], GlyphRun] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str, font: Any) -> Tuple[Optional[GlyphRun], bool]:
+        """
+        Get the mask of a single line of text.
+
+        Args:
+            text: The line of text, without line breaks.
+            font: The font object, at the drawn size.
+
+        Returns:
+            The mask and offset, None if the text draws no pixels, and
+            whether it was cached.
+        """
+        key = (text, font)
+        with self._lock:
+            run = self._items.get(key)
+            if run is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return run, True
+            self.misses += 1
+        left, top, right, bottom = (int(v) for v in font.getbbox(text))
+        if right <= left or bottom <= top:
+            return None, False
+        mask = Image.new("L", (right - left, bottom - top))
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        run = (mask, (left, top))
+        size = mask.width * mask.height
+        if size > self.max_bytes:
+            return run, False
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = run
+                self._size += size
+                while self._size > self.max_bytes:
+                    _, (evicted, _) = self._items.popitem(last=False)
+                    self._size -= evicted.width * evicted.height
+        return run, False
+
+    def clear(self) -> None:
+        """
+        Drop all cached masks.
+        """
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+# Shared by all renders in the process
+glyph_cache = GlyphCache()
+
+
+def draw_run(
+    draw: ImageDraw.ImageDraw,
+    position: Tuple[int, int],
+    text: str,
+    font: Any,
+    color: Tuple[int, int, int, int],
+) -> bool:
+    """
+    Draw a line of text through the glyph cache.
+
+    Args:
+        draw: The drawing context of the target image.
+        position: The integer (x, y) position of the text.
+        text: The line of text.
+        font: The font object or FallbackFont, at the drawn size.
+        color: The RGBA color of the text.
+
+    Returns:
+        bool: Whether the masks were cached.
+    """
+    if isinstance(font, FallbackFont):
+        placed = list(font.placed_runs(text))
+        if len(placed) > 1 or placed[0][1] is not font.primary:
+            cached = True
+            for part, part_font, x, y in placed:
+                cached &= draw_run(
+                    draw,
+                    (position[0] + x, position[1] + y),
+                    part,
+                    part_font,
+                    color,
+                )
+            return cached
+        font = font.primary
+    if "\n" in text:
+        # Multiline text is laid out by Pillow
+        draw.text(position, text, font=font, fill=color)
+        return False
+    run, hit = glyph_cache.get(text, font)
+    if run is not None:
+        mask, (dx, dy) = run
+        draw.bitmap((position[0] + dx, position[1] + dy), mask, fill=color)
+    return hit
@@ -1,13 +1,50 @@
 import base64
 import io
+from contextvars import ContextVar
 from enum import Enum
-from typing import List
+from typing import Any, Iterator, List, Mapping, Optional
 
 from PIL import Image as PILImage
 
 from .painter import Painter
+from .resources import ImageSource, decode_image, get_image
 from .widget import Widget
 
+# Images fetched ahead of time by URL, consulted before loading a URL
+prefetched_images: ContextVar[Mapping[str, PILImage.Image]] = ContextVar(
+    "prefetched_images", default={}
+)
+
+
+def remote_image_urls(json: Any) -> Iterator[str]:
+    """
+    Find the http(s) URLs of all Image widgets in a widget JSON tree.
+
+    Args:
+        json: JSON dictionary, conforming to widget.schema.json
+
+    Yields:
+        str: The URL of each remote image, in document order.
+    """
+    stack = [json]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            url = node.get("url")
+            if (
+                node.get("type") == "Image"
+                and isinstance(url, str)
+                and url.startswith(("http://", "https://"))
+            ):
+                yield url
+            stack.extend(
+                value
+                for value in reversed(node.values())
+                if isinstance(value, (dict, list))
+            )
+
 
 class ImageSize(Enum):
     """
@@ -27,8 +64,15 @@ class Image(Widget):
     """
     An image widget for displaying images.
 
+    Exactly one of url, image and resource must be given.
+
     Args:
         url: The URL of the image, supports http(s), file, and base64 formats.
+        image: An in-memory image, either a PIL image or the content of an
+            image file as bytes or any bytes-like buffer. RGBA PIL images are
+            used without copying.
+        resource: The name of an image registered with
+            enana.resources.register_image.
         width: The width of the image container.
         height: The height of the image container.
         size: The image sizing mode, defaults to DEFAULT.
@@ -37,26 +81,42 @@ class Image(Widget):
     def __init__(
         self,
         *,
-        url: str,
+        url: Optional[str] = None,
+        image: Optional[ImageSource] = None,
+        resource: Optional[str] = None,
         width: int | float,
         height: int | float,
         size: ImageSize = ImageSize.DEFAULT,
     ):
+        if sum(source is not None for source in (url, image, resource)) != 1:
+            raise ValueError(
+                "Image widget needs exactly one of url, image and resource"
+            )
         self._url = url
         self._width = width
         self._height = height
         self._size = size
-        self._image = self._load_image()
+        if image is not None:
+            self._image = decode_image(image)
+        elif resource is not None:
+            self._image = get_image(resource)
+        else:
+            self._image = self._load_image()
 
     def _load_image(self) -> PILImage.Image:
         """
         Load an image from various sources.
 
         Supports http(s) URLs, local files, and base64 encoded images.
+        Images already present in prefetched_images are used as is.
 
         Returns:
             PILImage.Image: The loaded image object.
         """
+        assert self._url is not None
+        prefetched = prefetched_images.get().get(self._url)
+        if prefetched is not None:
+            return prefetched
         if self._url.startswith("http://") or self._url.startswith("https://"):
             # Load image from network
             import requests
@@ -77,6 +137,28 @@ class Image(Widget):
             # Default to local file path
             return PILImage.open(self._url).convert("RGBA")
 
+    _properties = {
+        "image": "_image",
+        "width": "_width",
+        "height": "_height",
+        "size": "_size",
+    }
+
+    def _invalidate(self) -> None:
+        super()._invalidate()
+        self._image = decode_image(self._image)
+        self._size = ImageSize(self._size)
+
+    def _instance_fields(self) -> tuple:
+        # Images are identified by the decoded image they draw
+        return (
+            "Image",
+            id(self._image),
+            self._width,
+            self._height,
+            self._size.value,
+        )
+
     @property
     def painters(self) -> List[Painter]:
         """
@@ -91,11 +173,11 @@ class Image(Widget):
         width: int | float = self._width  # type: ignore
         height: int | float = self._height  # type: ignore
 
-        return [
-            ImagePainter(
-                image=self._image,
-                width=width,
-                height=height,
-                size=self._size,
-            )
-        ]
+        painter = ImagePainter(
+            image=self._image,
+            width=width,
+            height=height,
+            size=self._size,
+        )
+        painter.slot = self._slot
+        return [painter]
@@ -0,0 +1,182 @@
+"""
+Line breaking for Latin, CJK and mixed text.
+
+Lines may break at spaces and between CJK characters, following the basic
+kinsoku rules: closing punctuation and small kana never start a line and
+opening brackets never end one. Runs of other characters, such as Latin
+words and numbers, are never broken.
+
+Line widths are estimated from per-font tables of character advances and
+their prefix sums, so the break position of each line is found by binary
+search. Only the chosen line, and its neighbouring break candidates when
+kerning or side bearings make the estimate wrong, are measured exactly.
+"""
+
+import threading
+import weakref
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Tuple
+
+from PIL import ImageDraw
+
+from .fallback import text_bbox
+
+# Characters that may not start a line
+NO_START = frozenset(
+    "、。，．：；！？）」』】〕〉》〗〙〛｝］〞”’"
+    "ゝゞーァィゥェォッャュョヮヵヶぁぃぅぇぉっゃゅょゎゕゖㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ"
+    "々〻・…‥〜～％‰℃｡｣､･ｰｧｨｩｪｫｯｬｭｮ"
+)
+# Characters that may not end a line
+NO_END = frozenset("（「『【〔〈《〖〘〚｛［〝“‘｢")
+# Characters that are not separated from an identical neighbour
+NO_SPLIT = frozenset("…‥—―")
+
+# Advance widths by character, per font object
+_advances: "weakref.WeakKeyDictionary[Any, Dict[str, float]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def is_cjk(char: str) -> bool:
+    """
+    Check if a character belongs to a script written without spaces.
+
+    Args:
+        char: A single character.
+
+    Returns:
+        True for CJK ideographs, kana, CJK punctuation and full-width forms.
+    """
+    code = ord(char)
+    return (
+        0x2E80 <= code <= 0x2FDF
+        or 0x3000 <= code <= 0x30FF
+        or 0x3100 <= code <= 0x31FF
+        or 0x3200 <= code <= 0x4DBF
+        or 0x4E00 <= code <= 0x9FFF
+        or 0xF900 <= code <= 0xFAFF
+        or 0xFE30 <= code <= 0xFE4F
+        or 0xFF00 <= code <= 0xFFEF
+        or 0x20000 <= code <= 0x3FFFF
+    )
+
+
+def can_break(before: str, after: str) -> bool:
+    """
+    Check if a line may break between two adjacent characters.
+
+    Args:
+        before: The character ending the line.
+        after: The character starting the next line.
+
+    Returns:
+        True if a line break is allowed between them.
+    """
+    if not (is_cjk(before) or is_cjk(after)):
+        return False
+    if after in NO_START or before in NO_END:
+        return False
+    return not (before == after and before in NO_SPLIT)
+
+
+def advances(font: Any, text: str) -> List[float]:
+    """
+    Get the prefix sums of the character advances of a text.
+
+    Advances are cached per font, so each character is measured once.
+
+    Args:
+        font: The font object.
+        text: The text.
+
+    Returns:
+        List[float]: len(text) + 1 sums, the estimated width of text[i:j]
+        is sums[j] - sums[i].
+    """
+    with _lock:
+        table = _advances.get(font)
+        if table is None:
+            table = _advances[font] = {}
+    missing = set(text).difference(table)
+    if missing:
+        measured = {char: font.getlength(char) for char in missing}
+        with _lock:
+            table.update(measured)
+    return list(accumulate((table[char] for char in text), initial=0.0))
+
+
+def _stops(text: str) -> List[Tuple[int, int]]:
+    """
+    Find the break opportunities of a normalized text.
+
+    Args:
+        text: The text, with single spaces between words.
+
+    Returns:
+        List[Tuple[int, int]]: The (end of line, start of next line) indices
+        of each opportunity, ending with (len(text), len(text)).
+    """
+    stops = []
+    for index in range(1, len(text)):
+        char = text[index]
+        if char == " ":
+            stops.append((index, index + 1))
+        elif text[index - 1] != " " and can_break(text[index - 1], char):
+            stops.append((index, index))
+    stops.append((len(text), len(text)))
+    return stops
+
+
+def break_lines(
+    draw: ImageDraw.ImageDraw, text: str, font: Any, max_width: int | float
+) -> List[Tuple[str, int]]:
+    """
+    Break text into lines that fit max_width.
+
+    Whitespace runs are collapsed into single spaces, and lines that
+    cannot be broken, such as a single long word, may exceed max_width.
+
+    Args:
+        draw: A drawing context used to measure the text.
+        text: The text to break.
+        font: The font object to measure with.
+        max_width: The maximum width of a line.
+
+    Returns:
+        List[Tuple[str, int]]: The lines and the right edge of their ink,
+        empty if the text has no words.
+    """
+    text = " ".join(text.split())
+    if not text:
+        return []
+    sums = advances(font, text)
+    stops = _stops(text)
+    ends = [sums[end] for end, _ in stops]
+
+    def measure(start: int, stop: int) -> Tuple[bool, int]:
+        end = stops[stop][0]
+        bbox = text_bbox(draw, text[start:end], font)
+        return int(bbox[2] - bbox[0]) <= max_width, int(bbox[2])
+
+    lines = []
+    start = 0
+    first = 0
+    while first < len(stops):
+        # The last stop whose estimated width fits, at least the first one
+        stop = max(bisect_right(ends, sums[start] + max_width) - 1, first)
+        fits, right = measure(start, stop)
+        while not fits and stop > first:
+            stop -= 1
+            fits, right = measure(start, stop)
+        while fits and stop + 1 < len(stops):
+            next_fits, next_right = measure(start, stop + 1)
+            if not next_fits:
+                break
+            stop, right = stop + 1, next_right
+        lines.append((text[start : stops[stop][0]], right))  # noqa: E203
+        start = stops[stop][1]
+        first = stop + 1
+    return lines
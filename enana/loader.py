@@ -0,0 +1,424 @@
+"""
+Table-driven loading of widget trees from JSON.
+
+Each widget type is registered with a build function and the fields of its
+nodes that hold child nodes. Loading a node looks its type up in the table,
+loads the child nodes and calls the build function, so no code runs per
+node beyond the build function of its type. Other widget types can be
+registered with register_widget.
+
+Documents can optionally be validated against widget.schema.json first.
+Validation requires the jsonschema package; the schema is read and compiled
+once per process.
+"""
+
+import json as jsonlib
+from functools import lru_cache
+from importlib.resources import files
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .column import Column
+from .container import Container
+from .image import Image, ImageSize
+from .page import Page
+from .row import Row
+from .text import Text
+from .typing import BorderRadius, Margin, Padding, intern_color
+from .widget import Widget
+
+# The schema of widget JSON, shipped as package data
+SCHEMA_FILE = files(__package__) / "widget.schema.json"
+
+# A build function and the fields of a node that hold child nodes
+WidgetType = Tuple[Callable[..., Widget], Tuple[str, ...]]
+
+_types: Dict[str, WidgetType] = {}
+
+
+def register_widget(
+    name: str,
+    build: Callable[..., Widget],
+    child_fields: Sequence[str] = (),
+) -> None:
+    """
+    Register a widget type for loading from JSON.
+
+    Args:
+        name: The value of the "type" field of the nodes.
+        build: Called with the node and, for each child field present in the
+            node, the loaded widget or list of widgets as a keyword argument
+            named after the field. Returns the widget.
+        child_fields: The fields holding a child node or a list of child
+            nodes.
+    """
+    _types[name] = (build, tuple(child_fields))
+
+
+def _parse_sides(cls: Any, value: Any) -> Any:
+    """
+    Parse a padding or margin given as a number, a list or a dictionary.
+
+    Args:
+        cls: Padding or Margin.
+        value: A number for all sides, a [top, right, bottom, left] list or
+            a dictionary of sides.
+
+    Returns:
+        The object, or None if the value has none of these forms.
+    """
+    if isinstance(value, dict):
+        return cls(
+            top=value.get("top", 0),
+            right=value.get("right", 0),
+            bottom=value.get("bottom", 0),
+            left=value.get("left", 0),
+        )
+    elif isinstance(value, (int, float)):
+        return cls(top=value, right=value, bottom=value, left=value)
+    elif isinstance(value, list) and len(value) == 4:
+        return cls(
+            top=value[0], right=value[1], bottom=value[2], left=value[3]
+        )
+    return None
+
+
+def _parse_border_radius(value: Any) -> Optional[BorderRadius]:
+    """
+    Parse a border radius given as a number, a list or a dictionary.
+
+    Args:
+        value: A number for all corners, a [top_left, top_right,
+            bottom_right, bottom_left] list or a dictionary of corners.
+
+    Returns:
+        The BorderRadius, or None if the value has none of these forms.
+    """
+    if isinstance(value, dict):
+        return BorderRadius(
+            top_left=value.get("top_left", 0),
+            top_right=value.get("top_right", 0),
+            bottom_right=value.get("bottom_right", 0),
+            bottom_left=value.get("bottom_left", 0),
+        )
+    elif isinstance(value, (int, float)):
+        return BorderRadius(
+            top_left=value,
+            top_right=value,
+            bottom_right=value,
+            bottom_left=value,
+        )
+    elif isinstance(value, list) and len(value) == 4:
+        return BorderRadius(
+            top_left=value[0],
+            top_right=value[1],
+            bottom_right=value[2],
+            bottom_left=value[3],
+        )
+    return None
+
+
+def _box_style(json: dict) -> Dict[str, Any]:
+    """
+    Read the fields shared by Container, Row and Column.
+
+    Args:
+        json: The node.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments of the widget.
+    """
+    return {
+        "width": json.get("width"),
+        "height": json.get("height"),
+        "color": intern_color(json.get("color", (0, 0, 0, 0))),
+        "padding": (
+            _parse_sides(Padding, json["padding"])
+            if "padding" in json
+            else None
+        ),
+        "margin": (
+            _parse_sides(Margin, json["margin"]) if "margin" in json else None
+        ),
+        "border_radius": (
+            _parse_border_radius(json["border_radius"])
+            if "border_radius" in json
+            else None
+        ),
+    }
+
+
+def _build_page(json: dict, child: Optional[Widget] = None) -> Page:
+    if child is None:
+        raise ValueError("Page widget must have a child widget")
+    return Page(child=child)
+
+
+def _build_container(json: dict, child: Optional[Widget] = None) -> Container:
+    return Container(**_box_style(json), child=child)
+
+
+def _build_column(json: dict, children: Optional[list] = None) -> Column:
+    if children is None:
+        raise ValueError("Column widget must have children")
+    return Column(**_box_style(json), children=children)
+
+
+def _build_row(json: dict, children: Optional[list] = None) -> Row:
+    if children is None:
+        raise ValueError("Row widget must have children")
+    return Row(**_box_style(json), children=children)
+
+
+def _build_text(json: dict) -> Text:
+    if "text" not in json:
+        raise ValueError("Text widget must have text content")
+    return Text(
+        text=json["text"],
+        font=json.get("font", "Arial"),
+        font_size=json.get("font_size", 12),
+        max_width=json.get("max_width"),
+        color=intern_color(json.get("color", (0, 0, 0, 255))),
+        fallback=json.get("fallback"),
+    )
+
+
+def _build_image(json: dict) -> Image:
+    if "url" not in json and "resource" not in json:
+        raise ValueError("Image widget must have a url or a resource")
+    if "width" not in json:
+        raise ValueError("Image widget must have a width")
+    if "height" not in json:
+        raise ValueError("Image widget must have a height")
+    size = json.get("size", "default")
+    return Image(
+        url=json.get("url"),
+        resource=json.get("resource"),
+        width=json["width"],
+        height=json["height"],
+        size=(
+            ImageSize(size.lower())
+            if isinstance(size, str)
+            else ImageSize.DEFAULT
+        ),
+    )
+
+
+register_widget("Page", _build_page, ("child",))
+register_widget("Container", _build_container, ("child",))
+register_widget("Column", _build_column, ("children",))
+register_widget("Row", _build_row, ("children",))
+register_widget("Text", _build_text)
+register_widget("Image", _build_image)
+
+
+@lru_cache(maxsize=1)
+def schema_validators() -> Dict[str, Any]:
+    """
+    Get a validator for each widget type of widget.schema.json.
+
+    The schema is read and compiled once. Each validator checks a single
+    node against the definition of its type, child nodes are only checked
+    to be objects.
+
+    Returns:
+        Dict[str, Any]: The jsonschema validators by widget type.
+
+    Raises:
+        ImportError: If jsonschema is not installed.
+        FileNotFoundError: If the schema file is not available.
+    """
+    import jsonschema  # type: ignore[import]
+
+    schema = jsonlib.loads(SCHEMA_FILE.read_text("utf-8"))
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    # Child nodes are validated on their own, only their shape is checked
+    # as part of the parent
+    for name, definition in schema["definitions"].items():
+        child_fields = _types[name][1] if name in _types else ()
+        for part in definition.get("allOf", [definition]):
+            properties = part.get("properties", {})
+            for field in child_fields:
+                if field in properties:
+                    properties[field] = (
+                        {"type": "array", "items": {"type": "object"}}
+                        if properties[field].get("type") == "array"
+                        else {"type": "object"}
+                    )
+    definitions = schema["definitions"]
+    validators = {}
+    for option in schema["oneOf"]:
+        name = option["$ref"].rsplit("/", 1)[1]
+        validators[name] = validator_class(_inline(option, definitions))
+    return validators
+
+
+def _inline(node: Any, definitions: Dict[str, Any]) -> Any:
+    """
+    Replace the $ref of a schema by the definitions they refer to.
+
+    Resolving references once instead of on every validation makes
+    validation several times faster.
+
+    Args:
+        node: A schema without circular references.
+        definitions: The definitions by name.
+
+    Returns:
+        The schema without references.
+    """
+    if isinstance(node, dict):
+        if "$ref" in node:
+            name = node["$ref"].rsplit("/", 1)[1]
+            return _inline(definitions[name], definitions)
+        return {
+            key: _inline(value, definitions) for key, value in node.items()
+        }
+    if isinstance(node, list):
+        return [_inline(value, definitions) for value in node]
+    return node
+
+
+def validate(json: dict) -> None:
+    """
+    Validate widget JSON against widget.schema.json.
+
+    Nodes are validated one at a time against the definition of their
+    type, which avoids trying every type of the schema's oneOf on every
+    subtree. Types added with register_widget are not in the schema, their
+    nodes are not checked.
+
+    Args:
+        json: JSON dictionary.
+
+    Raises:
+        ValueError: If the JSON does not conform to the schema.
+        ImportError: If jsonschema is not installed.
+    """
+    import jsonschema  # type: ignore[import]
+
+    validators = schema_validators()
+    stack: List[Tuple[Any, str]] = [(json, "")]
+    while stack:
+        node, path = stack.pop()
+        if not isinstance(node, dict):
+            raise ValueError(
+                f"Invalid widget JSON at {path or '/'}: not an object"
+            )
+        name = str(node.get("type"))
+        child_fields = _types[name][1] if name in _types else ()
+        validator = validators.get(name)
+        if validator is not None:
+            error = jsonschema.exceptions.best_match(
+                validator.iter_errors(node)
+            )
+            if error is not None:
+                # Report the deepest failure, inside the branch of the type
+                while error.context:
+                    error = max(
+                        error.context, key=lambda e: len(e.absolute_path)
+                    )
+                location = "/".join(str(part) for part in error.absolute_path)
+                raise ValueError(
+                    f"Invalid widget JSON at {path}/{location}: "
+                    f"{error.message}"
+                )
+        for field in child_fields:
+            value = node.get(field)
+            if isinstance(value, list):
+                stack.extend(
+                    (child, f"{path}/{field}/{index}")
+                    for index, child in enumerate(value)
+                )
+            elif value is not None:
+                stack.append((value, f"{path}/{field}"))
+
+
+def load_widget(
+    json: dict,
+    slots: Optional[Mapping[str, Widget]] = None,
+    *,
+    validate_schema: bool = False,
+) -> Widget:
+    """
+    Create a Widget object from a JSON dictionary.
+
+    Args:
+        json: JSON dictionary, conforming to widget.schema.json
+        slots: Widgets to use instead of the nodes marked with these slot
+            names, see enana.template.
+        validate_schema: Validate the JSON against widget.schema.json
+            first. Types added with register_widget are not in the schema.
+
+    Returns:
+        Widget: The corresponding Widget object
+
+    Raises:
+        ValueError: If a node is invalid or has an unknown type.
+    """
+    if validate_schema:
+        validate(json)
+    return _load(json, slots)
+
+
+def _load(json: dict, slots: Optional[Mapping[str, Widget]]) -> Widget:
+    """
+    Load a node and its descendants.
+
+    The tree is walked with an explicit stack and every widget is built
+    after its children, so the depth of a document is not limited by the
+    recursion limit.
+
+    Args:
+        json: The node.
+        slots: Widgets replacing slot nodes.
+
+    Returns:
+        Widget: The widget.
+    """
+    # Widgets built so far whose parent is not built yet, in document order
+    built: List[Widget] = []
+    # Nodes to load, and nodes whose children are loaded, to build
+    stack: List[Tuple[dict, Optional[WidgetType]]] = [(json, None)]
+    while stack:
+        node, entry = stack.pop()
+        if entry is not None:
+            build, child_fields = entry
+            children: Dict[str, Any] = {}
+            # Children were built in order, take them from the end
+            for field in reversed(child_fields):
+                value = node.get(field)
+                if isinstance(value, list):
+                    start = len(built) - len(value)
+                    children[field] = built[start:]
+                    del built[start:]
+                elif value is not None:
+                    children[field] = built.pop()
+            built.append(build(node, **children))
+            continue
+        if "type" not in node:
+            raise ValueError("Widget JSON must have a 'type' field")
+        if slots is not None and node.get("slot") in slots:
+            built.append(slots[node["slot"]])
+            continue
+        entry = _types.get(node["type"])
+        if entry is None:
+            raise ValueError(f"Unknown widget type: {node['type']}")
+        stack.append((node, entry))
+        for field in reversed(entry[1]):
+            value = node.get(field)
+            if isinstance(value, list):
+                stack.extend((child, None) for child in reversed(value))
+            elif value is not None:
+                stack.append((value, None))
+    (widget,) = built
+    return widget
@@ -1,11 +1,28 @@
+import threading
+from concurrent.futures import Executor
+from contextlib import ExitStack
 from math import ceil
 from pathlib import Path
-from typing import List, Tuple
+from typing import IO, TYPE_CHECKING, Any, Iterator, List, Optional, Tuple
 
-from .generator import draw_image, draw_text, generate_image
-from .painter import ImagePainter, TextPainter
+from PIL import Image as PILImage
+
+from .generator import (
+    EncodeOptions,
+    FrameBuffer,
+    PNGStreamWriter,
+    RenderStats,
+    draw_painters,
+    save_image,
+)
+from .painter import ImagePainter, Painter
+from .spatial import PainterGrid
+from .typing import RenderQuality
 from .widget import Widget
 
+if TYPE_CHECKING:
+    from .compiled import CompiledPage
+
 
 class DrawFunction:
     """
@@ -42,6 +59,67 @@ class DrawFunction:
         return (0, 0, 0, 0)
 
 
+def _merge_boxes(
+    boxes: List[Tuple[int, int, int, int]],
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Merge overlapping (left, top, right, bottom) boxes until none overlap.
+
+    Args:
+        boxes: The boxes.
+
+    Returns:
+        List[Tuple[int, int, int, int]]: Disjoint boxes covering the input.
+    """
+    merged: List[Tuple[int, int, int, int]] = []
+    for box in boxes:
+        while True:
+            for index, other in enumerate(merged):
+                if (
+                    box[0] < other[2]
+                    and other[0] < box[2]
+                    and box[1] < other[3]
+                    and other[1] < box[3]
+                ):
+                    del merged[index]
+                    box = (
+                        min(box[0], other[0]),
+                        min(box[1], other[1]),
+                        max(box[2], other[2]),
+                        max(box[3], other[3]),
+                    )
+                    break
+            else:
+                break
+        merged.append(box)
+    return merged
+
+
+class _Frame:
+    """
+    The last rendering of a page, kept to redraw only what changed.
+    """
+
+    def __init__(
+        self,
+        key: Tuple[float, RenderQuality],
+        image: PILImage.Image,
+        painters: List[Painter],
+    ):
+        """
+        Initialize the _Frame.
+
+        Args:
+            key: The scale and quality of the rendering.
+            image: The rendered image, owned by the frame.
+            painters: The painters drawn, sorted by z-index.
+        """
+        self.key = key
+        self.image = image
+        self.painters = painters
+        self.signatures = [painter.signature() for painter in painters]
+
+
 class Page(Widget):
     """
     A page widget that serves as the root container for UI elements.
@@ -55,71 +133,489 @@ class Page(Widget):
             child: The child widget to be rendered on the page.
         """
         self.child: Widget = child
+        child._parent = self
+        # The last render, kept once the page is updated or rendered
+        # incrementally, redrawn in place after widget updates
+        self._frame: Optional[_Frame] = None
+        self._incremental = False
+        self._dirty = False
+        # The painters indexed by location for render_region, built once
+        # per layout
+        self._grid: Optional[PainterGrid] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # The lock cannot be pickled, the frame and grid are caches
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_frame"] = None
+        state["_grid"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _invalidate(self) -> None:
+        super()._invalidate()
+        self._incremental = True
+        self._dirty = True
+        self._grid = None
 
     @classmethod
-    def from_json(cls, json: dict) -> "Page":
+    def from_json(cls, json: dict, *, validate: bool = False) -> "Page":
         """
         Create a Page object from a JSON dictionary.
 
         Args:
             json: JSON dictionary, conforming to page.schema.json
+            validate: Validate the JSON against widget.schema.json first,
+                requires jsonschema.
 
         Returns:
             Page: The corresponding Page object
         """
-        widget = super().from_json(json)
+        widget = super().from_json(json, validate=validate)
         assert isinstance(widget, Page)
         return widget
 
-    def paint(self, *, scale: float = 1.0, filename: Path) -> None:
+    @classmethod
+    async def from_json_async(
+        cls, json: dict, *, executor: Optional[Executor] = None
+    ) -> "Page":
         """
-        Paint the page to an image file.
+        Create a Page object from a JSON dictionary without blocking the event loop.
+
+        Remote images are fetched concurrently with non-blocking I/O before
+        parsing and layout run on the executor.
+
+        Args:
+            json: JSON dictionary, conforming to page.schema.json
+            executor: Executor for parsing and layout, defaults to the loop's default executor.
+
+        Returns:
+            Page: The corresponding Page object
+        """
+        from .aio import page_from_json
+
+        return await page_from_json(json, executor=executor)
+
+    def compile(self) -> "CompiledPage":
+        """
+        Lay the page out once for repeated rendering.
+
+        Returns:
+            CompiledPage: A thread-safe form of the page whose layout does
+            not change, which can be rendered at any scale without walking
+            the widget tree again.
+        """
+        from .compiled import CompiledPage
+
+        return CompiledPage(
+            self._painters(), self.child.width, self.child.height
+        )
+
+    def render(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        stats: Optional[RenderStats] = None,
+        incremental: bool = False,
+    ) -> PILImage.Image:
+        """
+        Render the page to an in-memory image.
+
+        Repeated identical subtrees, such as the rows of a list, are rendered
+        once and copied wherever that gives the same pixels.
+
+        Once a widget of the page has been changed with Widget.update, or
+        after rendering with incremental=True, the page keeps its last
+        rendering. Rendering again at the same scale and quality then
+        redraws only the regions whose painters changed on top of it, with
+        the same result as a full render.
 
         Args:
             scale: Scale factor for the image, defaults to 1.0.
-            filename: Path to save the generated image.
+            quality: Render quality tier, "final" by default. "preview" trades
+                resampling, text shaping and raster precision for speed.
+            stats: Counters to update with the work done.
+            incremental: Keep the rendering for redrawing after updates.
+
+        Returns:
+            PILImage.Image: The rendered RGBA image.
+        """
+        key = (scale, RenderQuality(quality))
+        if incremental:
+            self._incremental = True
+        if not self._incremental:
+            return self._render(scale, key[1], stats=stats)
+        with self._lock:
+            frame = self._frame
+            if frame is not None and frame.key == key and not self._dirty:
+                return frame.image.copy()
+            self._dirty = False
+            painters = self._painters()
+            if (
+                frame is None
+                or frame.key != key
+                or len(frame.painters) != len(painters)
+                or frame.image.size
+                != (
+                    ceil(self.child.width * scale),
+                    ceil(self.child.height * scale),
+                )
+            ):
+                image = self._render(scale, key[1], stats=stats)
+            else:
+                image = frame.image
+                self._redraw(frame, painters, stats)
+            self._frame = _Frame(key, image, painters)
+            return image.copy()
+
+    def _redraw(
+        self,
+        frame: _Frame,
+        painters: List[Painter],
+        stats: Optional[RenderStats] = None,
+    ) -> None:
+        """
+        Redraw the regions of a frame whose painters changed.
+
+        Args:
+            frame: The previous rendering, with as many painters.
+            painters: The painters of the page now, sorted by z-index.
+            stats: Counters to update with the work done.
+        """
+        scale, quality = frame.key
+        image = frame.image
+        damage = []
+        for old, new, signature in zip(
+            frame.painters, painters, frame.signatures
+        ):
+            if new.signature() != signature:
+                damage += [old.bounds(scale), new.bounds(scale)]
+        boxes = []
+        for left, top, right, bottom in _merge_boxes(damage):
+            box = (
+                max(left, 0),
+                max(top, 0),
+                min(right, image.width),
+                min(bottom, image.height),
+            )
+            if box[0] < box[2] and box[1] < box[3]:
+                boxes.append(box)
+        if not boxes:
+            return
+        grid = PainterGrid(painters)
+        for box in boxes:
+            region = PILImage.new("RGBA", (box[2] - box[0], box[3] - box[1]))
+            draw_painters(
+                grid.query(box, scale),
+                scale,
+                quality,
+                region,
+                (box[0], box[1]),
+                stats=stats,
+            )
+            image.paste(region, (box[0], box[1]))
+            if stats is not None:
+                stats.redrawn += region.width * region.height
+
+    def render_buffer(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> FrameBuffer:
+        """
+        Render the page into a raw RGBA buffer.
+
+        The renderer draws directly into the returned buffer, which can be
+        handed to other pipelines through the buffer protocol or NumPy
+        without copying. See FrameBuffer for the lifetime rules.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            FrameBuffer: The rendered pixels.
+        """
+        frame = FrameBuffer(
+            ceil(self.child.width * scale), ceil(self.child.height * scale)
+        )
+        self._render(scale, RenderQuality(quality), frame.image)
+        return frame
+
+    def render_array(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> Any:
+        """
+        Render the page into a NumPy array.
+
+        Requires NumPy. The array wraps the renderer's pixel buffer without
+        copying and keeps it alive.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            numpy.ndarray: A uint8 array shaped (height, width, 4).
+        """
+        return self.render_buffer(scale=scale, quality=quality).to_numpy()
+
+    def _painters(self) -> List[Painter]:
+        """
+        Lay the page out and get its painters, topmost first.
+
+        Returns:
+            List[Painter]: The painters sorted by z-index.
         """
         painters = self.child.painters
         painters.sort(key=lambda x: x.z_index, reverse=True)
+        return painters
 
-        # Create a serializable drawing function object
-        draw = DrawFunction(painters, scale)
+    def _render(
+        self,
+        scale: float,
+        quality: RenderQuality,
+        image: Optional[PILImage.Image] = None,
+        stats: Optional[RenderStats] = None,
+    ) -> PILImage.Image:
+        """
+        Render the page, optionally into an existing transparent image.
 
-        # print("\n".join([repr(painter) for painter in painters]))
+        Args:
+            scale: Scale factor for the image.
+            quality: Render quality tier.
+            image: The RGBA image to draw on, a new one is created when None.
+            stats: Counters to update with the work done.
 
-        generate_image(
-            func=draw,
-            width=ceil(self.child.width * scale),
-            height=ceil(self.child.height * scale),
-            filename=filename,
+        Returns:
+            PILImage.Image: The rendered RGBA image.
+        """
+        painters = self._painters()
+        if image is None:
+            image = PILImage.new(
+                "RGBA",
+                (
+                    ceil(self.child.width * scale),
+                    ceil(self.child.height * scale),
+                ),
+            )
+        return draw_painters(
+            painters, scale, quality, image, instancing=True, stats=stats
         )
 
-        for text_painter in painters:
-            if isinstance(text_painter, TextPainter):
-                draw_text(
-                    image=filename,
-                    text=text_painter.text,
-                    position=(
-                        int(text_painter.offset_x * scale),
-                        int(text_painter.offset_y * scale),
-                    ),
-                    color=text_painter.color,
-                    font=text_painter.font,
-                    font_size=int(text_painter.font_size * scale),
-                    max_width=(
-                        int(text_painter.max_width * scale)
-                        if text_painter.max_width is not None
-                        else None
-                    ),
-                )
+    def render_region(
+        self,
+        box: Tuple[int, int, int, int],
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> PILImage.Image:
+        """
+        Render a rectangle of the page, such as a tile or a viewport.
 
-        for image_painter in painters:
-            if isinstance(image_painter, ImagePainter):
-                draw_image(
-                    image=filename,
-                    image_painter=image_painter,
-                    scale=scale,
-                )
+        The box is given in pixels of the page rendered at scale. Painters
+        are looked up through a PainterGrid, built on the first call and
+        kept until a widget is updated, so shapes, texts and images outside
+        the box are skipped entirely. The result is identical to cropping a
+        full render at the same scale.
+
+        Args:
+            box: The (left, top, right, bottom) pixel box to render.
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            PILImage.Image: The rendered RGBA region, transparent where it
+            extends past the page.
+        """
+        left, top, right, bottom = box
+        if right <= left or bottom <= top:
+            raise ValueError(f"Empty region: {box}")
+        grid = self._grid
+        if grid is None:
+            grid = self._grid = PainterGrid(self._painters())
+        painters = grid.query(box, scale)
+        image = PILImage.new("RGBA", (right - left, bottom - top))
+        return draw_painters(
+            painters, scale, RenderQuality(quality), image, (left, top)
+        )
+
+    def render_strips(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        strip_height: int = 256,
+    ) -> Iterator[Tuple[int, PILImage.Image]]:
+        """
+        Render the page as a sequence of horizontal strips, top to bottom.
+
+        The page is laid out once and every painter is assigned to the strips
+        it overlaps, so each strip only draws the shapes, texts and images
+        intersecting it. Only one strip of pixels is held at a time, which
+        keeps memory bounded for very tall pages.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+            strip_height: The height of the strips in pixels.
+
+        Yields:
+            Tuple[int, PILImage.Image]: The y-coordinate of the strip on the
+            page and the rendered RGBA strip.
+        """
+        if strip_height < 1:
+            raise ValueError("strip_height must be positive")
+        quality = RenderQuality(quality)
+        width = ceil(self.child.width * scale)
+        height = ceil(self.child.height * scale)
+        count = ceil(height / strip_height)
+        strips: List[List[Painter]] = [[] for _ in range(count)]
+        for painter in self._painters():
+            _, top, _, bottom = painter.bounds(scale)
+            first = max(top // strip_height, 0)
+            last = min((bottom - 1) // strip_height, count - 1)
+            for index in range(first, last + 1):
+                strips[index].append(painter)
+
+        for index in range(count):
+            painters, strips[index] = strips[index], []
+            top = index * strip_height
+            strip = PILImage.new(
+                "RGBA", (width, min(strip_height, height - top))
+            )
+            draw_painters(painters, scale, quality, strip, (0, top))
+            for painter in painters:
+                # Resized images are reused until their last strip
+                if (
+                    isinstance(painter, ImagePainter)
+                    and (painter.bounds(scale)[3] - 1) // strip_height <= index
+                ):
+                    painter.release()
+            yield top, strip
+
+    def paint_streaming(
+        self,
+        *,
+        scale: float = 1.0,
+        filename: Path | IO[bytes],
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        strip_height: int = 256,
+        encoding: Optional[EncodeOptions] = None,
+    ) -> None:
+        """
+        Paint the page to a PNG file strip by strip, with bounded memory.
+
+        Strips from render_strips are fed to an incremental PNG encoder as
+        they are rendered, so peak memory is about one strip rather than the
+        whole page. The output is always RGBA PNG.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            filename: Path or binary stream to write the PNG to.
+            quality: Render quality tier, "final" by default.
+            strip_height: The height of the strips in pixels.
+            encoding: Encoding options, compress_level and strategy apply.
+        """
+        if encoding is not None and encoding.format not in (None, "png"):
+            raise ValueError("Streaming output only supports PNG")
+        width = ceil(self.child.width * scale)
+        height = ceil(self.child.height * scale)
+        with ExitStack() as stack:
+            if isinstance(filename, (str, Path)):
+                fileobj: IO[bytes] = stack.enter_context(open(filename, "wb"))
+            else:
+                fileobj = filename
+            writer = PNGStreamWriter(fileobj, width, height, encoding)
+            for _, strip in self.render_strips(
+                scale=scale, quality=quality, strip_height=strip_height
+            ):
+                writer.write(strip)
+            writer.close()
+
+    def paint(
+        self,
+        *,
+        scale: float = 1.0,
+        filename: Path,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        encoding: Optional[EncodeOptions] = None,
+    ) -> None:
+        """
+        Paint the page to an image file.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            filename: Path to save the generated image.
+            quality: Render quality tier, "final" by default.
+            encoding: Encoding options, the format defaults to the file extension.
+        """
+        save_image(
+            self.render(scale=scale, quality=quality), filename, encoding
+        )
+
+    async def render_async(
+        self,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        executor: Optional[Executor] = None,
+    ) -> PILImage.Image:
+        """
+        Render the page to an in-memory image without blocking the event loop.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+            executor: Executor for rasterization, defaults to the loop's default executor.
+
+        Returns:
+            PILImage.Image: The rendered RGBA image.
+        """
+        from .aio import render
+
+        return await render(
+            self, scale=scale, quality=quality, executor=executor
+        )
+
+    async def paint_async(
+        self,
+        *,
+        scale: float = 1.0,
+        filename: Path,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+        encoding: Optional[EncodeOptions] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Paint the page to an image file without blocking the event loop.
+
+        Args:
+            scale: Scale factor for the image, defaults to 1.0.
+            filename: Path to save the generated image.
+            quality: Render quality tier, "final" by default.
+            encoding: Encoding options, the format defaults to the file extension.
+            executor: Executor for rasterization and encoding, defaults to the loop's default executor.
+        """
+        from .aio import paint
+
+        await paint(
+            self,
+            scale=scale,
+            filename=filename,
+            quality=quality,
+            encoding=encoding,
+            executor=executor,
+        )
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
@@ -1,10 +1,81 @@
 import time
-from typing import Callable, Optional, Tuple
+from functools import lru_cache
+from math import ceil
+from typing import Callable, List, Optional, Sequence, Tuple
 
 from PIL import Image as PILImage
+from PIL import ImageChops, ImageDraw
 
+from .typing import BorderRadius, RenderQuality
 from .utils import always_false
 
+# Transpositions turning the top-left corner mask into the other corners
+_CORNER_TRANSPOSE = {
+    "top_right": PILImage.Transpose.FLIP_LEFT_RIGHT,
+    "bottom_right": PILImage.Transpose.ROTATE_180,
+    "bottom_left": PILImage.Transpose.FLIP_TOP_BOTTOM,
+}
+
+
+@lru_cache(maxsize=512)
+def _corner_mask(
+    radius: float, supersample: int, corner: str = "top_left"
+) -> PILImage.Image:
+    """
+    Get the coverage mask of a rounded corner.
+
+    Masks are cached and shared between all painters, so they must not be
+    modified by the caller.
+
+    Args:
+        radius: The corner radius in pixels.
+        supersample: Samples per pixel edge, 1 gives hard edges.
+        corner: The corner the mask is oriented for.
+
+    Returns:
+        PILImage.Image: An "L" mask of ceil(radius) pixels square.
+    """
+    if corner in _CORNER_TRANSPOSE:
+        return _corner_mask(radius, supersample).transpose(
+            _CORNER_TRANSPOSE[corner]
+        )
+    size = ceil(radius)
+    canvas = PILImage.new("L", (size * supersample, size * supersample), 0)
+    diameter = max(2 * radius * supersample - 1, 0)
+    ImageDraw.Draw(canvas).ellipse((0, 0, diameter, diameter), fill=255)
+    if supersample > 1:
+        # Average the samples of each pixel into its coverage
+        canvas = canvas.resize((size, size), PILImage.Resampling.BOX)
+    return canvas
+
+
+def _fill(
+    image: PILImage.Image,
+    color: Tuple[int, int, int, int],
+    box: Tuple[int, int, int, int],
+    mask: PILImage.Image,
+) -> None:
+    """
+    Fill a box of an image with a color, weighted by a coverage mask.
+
+    Fully covered pixels are replaced by the color, partially covered ones
+    are blended over the existing pixels.
+
+    Args:
+        image: The RGBA image to fill, modified in place.
+        color: The RGBA fill color.
+        box: The (left, top, right, bottom) pixel box to fill.
+        mask: An "L" coverage mask the size of the box.
+    """
+    layer = PILImage.new("RGBA", mask.size, color)
+    if color[3] == 255:
+        layer.putalpha(mask)
+        image.alpha_composite(layer, dest=box[:2])
+        return
+    layer.putalpha(mask.point(lambda v: v * color[3] // 255))
+    image.alpha_composite(layer, dest=box[:2])
+    image.paste(color, box, mask.point(lambda v: 255 if v == 255 else 0))
+
 
 class Painter:
     """
@@ -35,6 +106,11 @@ class Painter:
         self.z_index = time.time()
         self.offset_x: int | float = 0
         self.offset_y: int | float = 0
+        # The template slot of the widget that created this painter
+        self.slot: Optional[str] = None
+        # The (instance key, widget id) of the subtrees containing this
+        # painter, innermost first
+        self.groups: List[Tuple[bytes, int]] = []
 
     def paint(self, x: int | float, y: int | float) -> bool:
         """
@@ -53,6 +129,283 @@ class Painter:
             return False
         return self.func(_x, _y)
 
+    def _pixel_box(
+        self,
+        image: PILImage.Image,
+        scale: float,
+        left: int | float,
+        top: int | float,
+        right: int | float,
+        bottom: int | float,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Convert a box in painter coordinates to a pixel box on the page.
+
+        The box is clipped to the painting area and to the image, which
+        covers the page from origin on.
+
+        Args:
+            image: The image being painted on.
+            scale: Scale factor for the drawing.
+            left: The left edge of the box.
+            top: The top edge of the box.
+            right: The right edge of the box.
+            bottom: The bottom edge of the box.
+            origin: The page pixel at the top-left corner of the image.
+
+        Returns:
+            The (left, top, right, bottom) page pixel box, or None if it is
+            empty.
+        """
+        x0 = max(ceil((self.offset_x + max(left, 0)) * scale), origin[0])
+        y0 = max(ceil((self.offset_y + max(top, 0)) * scale), origin[1])
+        x1 = min(
+            ceil((self.offset_x + min(right, self.width)) * scale),
+            origin[0] + image.width,
+        )
+        y1 = min(
+            ceil((self.offset_y + min(bottom, self.height)) * scale),
+            origin[1] + image.height,
+        )
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def signature(self) -> tuple:
+        """
+        Get the values that determine the pixels this painter draws.
+
+        Painters with equal signatures draw the same pixels, which lets an
+        incremental render redraw only the painters that changed.
+
+        Returns:
+            tuple: The class, position, size and drawing parameters.
+        """
+        return (
+            type(self),
+            self.offset_x,
+            self.offset_y,
+            self.width,
+            self.height,
+            self.color,
+            self.func,
+        )
+
+    def bounds(self, scale: float) -> Tuple[int, int, int, int]:
+        """
+        Get the page pixels this painter may draw on.
+
+        Args:
+            scale: Scale factor for the drawing.
+
+        Returns:
+            The (left, top, right, bottom) page pixel box.
+        """
+        return (
+            int(self.offset_x * scale),
+            int(self.offset_y * scale),
+            ceil((self.offset_x + self.width) * scale),
+            ceil((self.offset_y + self.height) * scale),
+        )
+
+    def rasterize(
+        self,
+        image: PILImage.Image,
+        scale: float,
+        quality: RenderQuality = RenderQuality.FINAL,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """
+        Paint the pixels selected by func onto an image.
+
+        Args:
+            image: The RGBA image to paint on, modified in place.
+            scale: Scale factor for the drawing.
+            quality: The render quality tier, selects the raster tile size.
+            origin: The page pixel at the top-left corner of the image.
+        """
+        box = self._pixel_box(
+            image, scale, 0, 0, self.width, self.height, origin
+        )
+        if box is None:
+            return
+        x0, y0, x1, y1 = box
+        tile = quality.raster_tile(scale)
+        data = bytearray()
+        for y in range(y0, y1, tile):
+            row = bytearray()
+            for x in range(x0, x1, tile):
+                hit = self.paint(x / scale, y / scale)
+                row += (b"\xff" if hit else b"\x00") * tile
+            del row[x1 - x0 :]  # noqa: E203
+            data += bytes(row) * min(tile, y1 - y)
+        mask = PILImage.frombytes("L", (x1 - x0, y1 - y0), bytes(data))
+        image.paste(
+            self.color,
+            (x0 - origin[0], y0 - origin[1], x1 - origin[0], y1 - origin[1]),
+            mask,
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
+
+
+class RectPainter(Painter):
+    """
+    Painter for rendering rectangles with anti-aliased rounded corners.
+    """
+
+    def __init__(
+        self,
+        *,
+        width: int | float,
+        height: int | float,
+        color: Tuple[int, int, int, int],
+        left: int | float = 0,
+        top: int | float = 0,
+        rect_width: Optional[int | float] = None,
+        rect_height: Optional[int | float] = None,
+        border_radius: Optional[BorderRadius] = None,
+    ):
+        """
+        Initialize the RectPainter.
+
+        Args:
+            width: The width of the painting area.
+            height: The height of the painting area.
+            color: The RGBA color to use for painting.
+            left: The left edge of the rectangle inside the painting area.
+            top: The top edge of the rectangle inside the painting area.
+            rect_width: The width of the rectangle, defaults to the painting area.
+            rect_height: The height of the rectangle, defaults to the painting area.
+            border_radius: The radius of each corner of the rectangle.
+        """
+        super().__init__(
+            width=width, height=height, func=self._contains, color=color
+        )
+        self.left = left
+        self.top = top
+        self.rect_width = width if rect_width is None else rect_width
+        self.rect_height = height if rect_height is None else rect_height
+        self.border_radius = border_radius or BorderRadius.zero()
+
+    def signature(self) -> tuple:
+        radius = self.border_radius
+        return (
+            type(self),
+            self.offset_x,
+            self.offset_y,
+            self.width,
+            self.height,
+            self.color,
+            self.left,
+            self.top,
+            self.rect_width,
+            self.rect_height,
+            radius.top_left,
+            radius.top_right,
+            radius.bottom_right,
+            radius.bottom_left,
+        )
+
+    def _contains(self, x: int | float, y: int | float) -> bool:
+        """
+        Check if a point lies inside the rounded rectangle.
+
+        Args:
+            x: The x-coordinate.
+            y: The y-coordinate.
+
+        Returns:
+            True if the point is inside the rectangle, False otherwise.
+        """
+        X = x - self.left
+        Y = y - self.top
+        width, height = self.rect_width, self.rect_height
+        if not (0 <= X < width and 0 <= Y < height):
+            return False
+        radius = self.border_radius
+        r = radius.top_left
+        if X < r and Y < r:
+            return (X - r) ** 2 + (Y - r) ** 2 <= r**2
+        r = radius.top_right
+        if X >= width - r and Y < r:
+            return (X - (width - r)) ** 2 + (Y - r) ** 2 <= r**2
+        r = radius.bottom_right
+        if X >= width - r and Y >= height - r:
+            return (X - (width - r)) ** 2 + (Y - (height - r)) ** 2 <= r**2
+        r = radius.bottom_left
+        if X < r and Y >= height - r:
+            return (X - r) ** 2 + (Y - (height - r)) ** 2 <= r**2
+        return True
+
+    def rasterize(
+        self,
+        image: PILImage.Image,
+        scale: float,
+        quality: RenderQuality = RenderQuality.FINAL,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """
+        Paint the rectangle onto an image.
+
+        Corners are filled through cached coverage masks, so anti-aliasing
+        costs no extra resolution.
+
+        Args:
+            image: The RGBA image to paint on, modified in place.
+            scale: Scale factor for the drawing.
+            quality: The render quality tier, selects the corner precision.
+            origin: The page pixel at the top-left corner of the image.
+        """
+        box = self._pixel_box(
+            image,
+            scale,
+            self.left,
+            self.top,
+            self.left + self.rect_width,
+            self.top + self.rect_height,
+            origin,
+        )
+        if box is None:
+            return
+        target = (
+            box[0] - origin[0],
+            box[1] - origin[1],
+            box[2] - origin[0],
+            box[3] - origin[1],
+        )
+        radius = self.border_radius
+        if not radius:
+            image.paste(self.color, target)
+            return
+        # The unclipped rectangle, corners are placed relative to it
+        x0 = ceil((self.offset_x + self.left) * scale)
+        y0 = ceil((self.offset_y + self.top) * scale)
+        width = (
+            ceil((self.offset_x + self.left + self.rect_width) * scale) - x0
+        )
+        height = (
+            ceil((self.offset_y + self.top + self.rect_height) * scale) - y0
+        )
+        mask = PILImage.new("L", (width, height), 255)
+        limit = min(width, height) / 2
+        for corner in ("top_left", "top_right", "bottom_right", "bottom_left"):
+            r = min(getattr(radius, corner) * scale, limit)
+            if r <= 0:
+                continue
+            corner_mask = _corner_mask(
+                round(r, 3), quality.supersample, corner
+            )
+            size = corner_mask.width
+            x = 0 if corner.endswith("left") else width - size
+            y = 0 if corner.startswith("top") else height - size
+            region = mask.crop((x, y, x + size, y + size))
+            mask.paste(ImageChops.darker(region, corner_mask), (x, y))
+        mask = mask.crop((box[0] - x0, box[1] - y0, box[2] - x0, box[3] - y0))
+        _fill(image, self.color, target, mask)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
 
@@ -67,9 +420,13 @@ class TextPainter(Painter):
         *,
         text: str,
         font: str = "Arial",
-        font_size: int = 12,
-        max_width: Optional[int] = None,
+        font_size: int | float = 12,
+        max_width: Optional[int | float] = None,
         color: Tuple[int, int, int, int],
+        width: int | float = 0,
+        height: int | float = 0,
+        lines: Optional[List[str]] = None,
+        fallback: Sequence[str] = (),
     ):
         """
         Initialize the TextPainter.
@@ -80,15 +437,72 @@ class TextPainter(Painter):
             font_size: The font size in points.
             max_width: The maximum width before wrapping occurs.
             color: The RGBA color of the text.
+            width: The width of the drawn text, at least the laid out width.
+            height: The laid out height of the text.
+            lines: The lines of a wrapped text, as broken at layout time.
+            fallback: Names of fonts for the characters the font lacks.
         """
         super().__init__(
-            width=0, height=0, func=always_false, color=(0, 0, 0, 0)
+            width=width, height=height, func=always_false, color=(0, 0, 0, 0)
         )
         self.text = text
         self.font = font
         self.font_size = font_size
         self.max_width = max_width
         self.color = color
+        self.lines = lines
+        self.fallback = tuple(fallback)
+
+    def signature(self) -> tuple:
+        return (
+            type(self),
+            self.offset_x,
+            self.offset_y,
+            self.width,
+            self.height,
+            self.color,
+            self.text,
+            self.font,
+            self.font_size,
+            self.max_width,
+            None if self.lines is None else tuple(self.lines),
+            self.fallback,
+        )
+
+    def bounds(self, scale: float) -> Tuple[int, int, int, int]:
+        """
+        Get the page pixels this painter may draw on.
+
+        Glyphs may overhang the laid out box by their bearings, accents and
+        pixel rounding at the drawn font size, so the box is padded by a
+        quarter of the font size and a pixel.
+
+        Args:
+            scale: Scale factor for the drawing.
+
+        Returns:
+            The (left, top, right, bottom) page pixel box.
+        """
+        x0, y0, x1, y1 = super().bounds(scale)
+        pad = ceil(self.font_size * scale / 4) + 1
+        return x0 - pad, y0 - pad, x1 + pad, y1 + pad
+
+    def rasterize(
+        self,
+        image: PILImage.Image,
+        scale: float,
+        quality: RenderQuality = RenderQuality.FINAL,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """
+        Do nothing, texts are drawn after all backgrounds are composited.
+
+        Args:
+            image: The RGBA image being painted on.
+            scale: Scale factor for the drawing.
+            quality: The render quality tier.
+            origin: The page pixel at the top-left corner of the image.
+        """
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
@@ -132,21 +546,87 @@ class ImagePainter(Painter):
             self.size = size
         else:
             self.size = ImageSize.DEFAULT
-        # Remove the call to _resize_image during initialization
-        # self._resized_image = self._resize_image()
+        # The last resized image, reused by region and strip renders
+        self._resized: Optional[
+            Tuple[float, RenderQuality, PILImage.Image]
+        ] = None
+
+    def signature(self) -> tuple:
+        # Images are compared by identity, updates replace the image object
+        return (
+            type(self),
+            self.offset_x,
+            self.offset_y,
+            self.width,
+            self.height,
+            id(self.image),
+            self.size,
+        )
 
-    def _resize_image(self, scale: float = 1.0) -> PILImage.Image:
+    def bounds(self, scale: float) -> Tuple[int, int, int, int]:
+        """
+        Get the page pixels this painter may draw on.
+
+        Images drawn at their own size may exceed the painting area.
+
+        Args:
+            scale: Scale factor for the drawing.
+
+        Returns:
+            The (left, top, right, bottom) page pixel box.
+        """
+        x0 = int(self.offset_x * scale)
+        y0 = int(self.offset_y * scale)
+        width = max(self.width, self.image.width)
+        height = max(self.height, self.image.height)
+        return x0, y0, x0 + ceil(width * scale), y0 + ceil(height * scale)
+
+    def resized_image(
+        self,
+        scale: float = 1.0,
+        quality: RenderQuality = RenderQuality.FINAL,
+    ) -> PILImage.Image:
+        """
+        Get the resized image, reusing the last result for the same scale.
+
+        Args:
+            scale: The scaling factor.
+            quality: The render quality tier, selects the resampling filter.
+
+        Returns:
+            PILImage.Image: The resized image object.
+        """
+        # Read the cache once, other threads may replace it concurrently
+        cached = self._resized
+        if cached is None or cached[:2] != (scale, quality):
+            cached = (scale, quality, self._resize_image(scale, quality))
+            self._resized = cached
+        return cached[2]
+
+    def release(self) -> None:
+        """
+        Drop the cached resized image.
+        """
+        self._resized = None
+
+    def _resize_image(
+        self,
+        scale: float = 1.0,
+        quality: RenderQuality = RenderQuality.FINAL,
+    ) -> PILImage.Image:
         """
         Resize the image based on the size parameter and scale factor.
 
         Args:
             scale: The scaling factor.
+            quality: The render quality tier, selects the resampling filter.
 
         Returns:
             PILImage.Image: The resized image object.
         """
         from .image import ImageSize
 
+        resampling = quality.resampling
         img_width, img_height = self.image.size
         # Apply scale factor to target width and height
         target_width, target_height = self.width * scale, self.height * scale
@@ -155,7 +635,7 @@ class ImagePainter(Painter):
             # Do not resize, return original image
             return self.image.resize(
                 (int(img_width * scale), int(img_height * scale)),
-                PILImage.Resampling.LANCZOS,
+                resampling,
             )
         elif self.size == ImageSize.COVER:
             # Maintain aspect ratio, cover the entire target area
@@ -164,9 +644,7 @@ class ImagePainter(Painter):
             )
             new_width = int(img_width * scale_factor)
             new_height = int(img_height * scale_factor)
-            resized = self.image.resize(
-                (new_width, new_height), PILImage.Resampling.LANCZOS
-            )
+            resized = self.image.resize((new_width, new_height), resampling)
             # Crop to target size
             left = (new_width - target_width) // 2
             top = (new_height - target_height) // 2
@@ -180,14 +658,29 @@ class ImagePainter(Painter):
             )
             new_width = int(img_width * scale_factor)
             new_height = int(img_height * scale_factor)
-            return self.image.resize(
-                (new_width, new_height), PILImage.Resampling.LANCZOS
-            )
+            return self.image.resize((new_width, new_height), resampling)
         else:
             return self.image.resize(
                 (int(img_width * scale), int(img_height * scale)),
-                PILImage.Resampling.LANCZOS,
+                resampling,
             )
 
+    def rasterize(
+        self,
+        image: PILImage.Image,
+        scale: float,
+        quality: RenderQuality = RenderQuality.FINAL,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """
+        Do nothing, images are drawn after all backgrounds are composited.
+
+        Args:
+            image: The RGBA image being painted on.
+            scale: Scale factor for the drawing.
+            quality: The render quality tier.
+            origin: The page pixel at the top-left corner of the image.
+        """
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
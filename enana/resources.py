@@ -0,0 +1,117 @@
+"""
+Registry of named in-memory images.
+
+Images registered here can be referenced by name from Image widgets, with
+``Image(resource=...)`` or ``{"type": "Image", "resource": ...}`` in JSON, so
+pixels that already live in memory are used without being encoded into a
+``data:`` URI and decoded again.
+
+The registry is per process: worker processes of the render server and the
+batch command do not see images registered in the parent process.
+"""
+
+import hashlib
+import io
+import threading
+from typing import Dict, Optional, Tuple
+
+from PIL import Image as PILImage
+
+# Anything Image accepts as in-memory pixels, encoded bytes or a decoded image
+ImageSource = PILImage.Image | bytes | bytearray | memoryview
+
+_images: Dict[str, PILImage.Image] = {}
+_digests: Dict[str, Tuple[int, str]] = {}
+_lock = threading.Lock()
+
+
+def decode_image(source: ImageSource) -> PILImage.Image:
+    """
+    Get an RGBA image from a decoded image or encoded image bytes.
+
+    RGBA images are returned as is, without copying.
+
+    Args:
+        source: A PIL image, or the content of an image file.
+
+    Returns:
+        PILImage.Image: The image in RGBA mode.
+    """
+    if isinstance(source, PILImage.Image):
+        return source if source.mode == "RGBA" else source.convert("RGBA")
+    return PILImage.open(io.BytesIO(source)).convert("RGBA")
+
+
+def register_image(name: str, image: ImageSource) -> None:
+    """
+    Register an image under a name, replacing any previous one.
+
+    The image is decoded once, here. Do not modify a registered PIL image in
+    place afterwards, register it again instead so caches notice the change.
+
+    Args:
+        name: The resource name.
+        image: A PIL image, or the content of an image file.
+    """
+    decoded = decode_image(image)
+    with _lock:
+        _images[name] = decoded
+        _digests.pop(name, None)
+
+
+def unregister_image(name: str) -> None:
+    """
+    Remove a registered image, if any.
+
+    Args:
+        name: The resource name.
+    """
+    with _lock:
+        _images.pop(name, None)
+        _digests.pop(name, None)
+
+
+def get_image(name: str) -> PILImage.Image:
+    """
+    Get a registered image.
+
+    Args:
+        name: The resource name.
+
+    Returns:
+        PILImage.Image: The registered RGBA image.
+
+    Raises:
+        KeyError: If no image is registered under the name.
+    """
+    with _lock:
+        image = _images.get(name)
+    if image is None:
+        raise KeyError(f"Unknown image resource: {name}")
+    return image
+
+
+def image_digest(name: str) -> Optional[str]:
+    """
+    Hash the pixels of a registered image, computed once per registration.
+
+    Args:
+        name: The resource name.
+
+    Returns:
+        The hex digest of the image, or None if it is not registered.
+    """
+    with _lock:
+        image = _images.get(name)
+        cached = _digests.get(name)
+    if image is None:
+        return None
+    if cached is not None and cached[0] == id(image):
+        return cached[1]
+    hasher = hashlib.sha256(f"{image.size}".encode("ascii"))
+    hasher.update(image.tobytes())
+    digest = hasher.hexdigest()
+    with _lock:
+        if _images.get(name) is image:
+            _digests[name] = (id(image), digest)
+    return digest
@@ -1,7 +1,6 @@
 from typing import List, Optional, Tuple
 
 from .container import Container
-from .painter import Painter
 from .typing import BorderRadius, Margin, Padding
 from .widget import Widget
 
@@ -41,16 +40,15 @@ class Row(Container):
             child=None,
         )
         self._children = children or []
+        for child in self._children:
+            child._parent = self
 
-    @property
-    def width(self) -> int | float:
+    def _measure(self) -> None:
         """
-        Get the width of the row.
-
-        If the width is not explicitly set, it will be calculated based on the sum of widths of its children.
+        Compute the size of the row from its children.
 
-        Returns:
-            The width of the row.
+        Unless set explicitly, the width is the sum of the widths of its
+        children and the height the maximum height of its children.
         """
         if self._width is None:
             total_child_width = sum(
@@ -61,18 +59,6 @@ class Row(Container):
                 + self._padding.horizontal
                 + self._margin.horizontal
             )
-        return self._width
-
-    @property
-    def height(self) -> int | float:
-        """
-        Get the height of the row.
-
-        If the height is not explicitly set, it will be calculated based on the maximum height of its children.
-
-        Returns:
-            The height of the row.
-        """
         if self._height is None:
             max_child_height = max(
                 (child.height for child in self._children), default=0
@@ -82,37 +68,21 @@ class Row(Container):
                 + self._padding.vertical
                 + self._margin.vertical
             )
-        return self._height
 
-    @property
-    def painters(self) -> List[Painter]:
-        """
-        Get the list of painters for this row.
-
-        Returns:
-            A list of Painter objects that will be used to render this row.
-        """
-        # Ensure dimensions are calculated
-        width = self.width
-        height = self.height
+    def _child_widgets(self) -> List[Widget]:
+        return self._children
 
-        # Create container painter
-        painters = [
-            Painter(
-                width=width,
-                height=height,
-                func=self._paint_func,
-                color=self._color,
-            )
-        ]
+    def _instance_fields(self) -> tuple:
+        return self._style_fields() + (
+            tuple(child.instance_key for child in self._children),
+        )
 
-        # Calculate position for each child and add their painters
+    def _placements(self) -> List[Tuple[Widget, int | float, int | float]]:
+        placements = []
         current_x = self._padding.left + self._margin.left
         for child in self._children:
-            for painter in child.painters:
-                painter.offset_x += current_x
-                painter.offset_y += self._padding.top + self._margin.top
-                painters.append(painter)
+            placements.append(
+                (child, current_x, self._padding.top + self._margin.top)
+            )
             current_x += child.width
-
-        return painters
+        return placements
@@ -0,0 +1,279 @@
+"""
+A local HTTP server rendering page JSON to images.
+
+POST a document conforming to widget.schema.json to ``/render`` and the
+server answers with the rendered image. The ``scale`` and ``format``
+(``png``, ``webp`` or ``jpeg``) query parameters control the output. Scales
+outside the configured range are answered with 400 and bodies larger than
+the configured size with 413.
+
+Renders run in a persistent pool of worker processes, so fonts and remote
+images stay loaded between requests. Responses are cached by their render
+key (see enana.cache), which is also sent as the ETag, identical concurrent
+requests share a single render, and requests beyond the queue bound are
+answered with 503.
+"""
+
+import json
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .cache import RenderCache, render_key
+from .worker import render_document
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the server has too many renders pending.
+    """
+
+
+class RenderServer(ThreadingHTTPServer):
+    """
+    HTTP server rendering page JSON with a pool of worker processes.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        *,
+        workers: Optional[int] = None,
+        max_pending: int = 64,
+        cache_bytes: int = 256 * 1024 * 1024,
+        cache_dir: Optional[Path] = None,
+        max_scale: float = 8.0,
+        max_body_bytes: int = 8 * 1024 * 1024,
+    ):
+        """
+        Initialize the RenderServer.
+
+        Args:
+            address: The (host, port) to listen on.
+            workers: The number of render processes, defaults to the CPU count.
+            max_pending: The maximum number of renders queued or running.
+            cache_bytes: The maximum total size of cached responses in memory.
+            cache_dir: The directory of the on-disk response cache, None disables it.
+            max_scale: The largest accepted scale, scales must be positive.
+            max_body_bytes: The largest accepted request body.
+        """
+        super().__init__(address, RenderRequestHandler)
+        self.max_scale = max_scale
+        self.max_body_bytes = max_body_bytes
+        # Workers are started from handler threads, so avoid fork()
+        self.executor = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.cache = RenderCache(max_bytes=cache_bytes, directory=cache_dir)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._inflight: Dict[str, Future] = {}
+        # Reentrant, done callbacks may run while the lock is held
+        self._lock = threading.RLock()
+
+    def render(
+        self, document: dict, scale: float, format: str, key: str
+    ) -> Tuple[bytes, bool]:
+        """
+        Render a document, reusing cached and in-flight results.
+
+        Args:
+            document: JSON dictionary, conforming to widget.schema.json
+            scale: Scale factor for the image.
+            format: The output format, "png", "webp" or "jpeg".
+            key: The render key of the document, see enana.cache.render_key.
+
+        Returns:
+            Tuple[bytes, bool]: The encoded image and whether it was cached.
+
+        Raises:
+            QueueFullError: If max_pending renders are already queued.
+        """
+        data = self.cache.get(key)
+        if data is not None:
+            return data, True
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                if not self._slots.acquire(blocking=False):
+                    raise QueueFullError("too many pending renders")
+                future = self.executor.submit(
+                    render_document, document, scale, format
+                )
+                self._inflight[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+        return future.result(), False
+
+    def _finish(self, key: str, future: Future) -> None:
+        """
+        Cache a finished render and release its queue slot.
+
+        Args:
+            key: The render key of the render.
+            future: The finished render.
+        """
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+        with self._lock:
+            del self._inflight[key]
+        self._slots.release()
+
+    def server_close(self) -> None:
+        """
+        Close the socket and stop the worker processes.
+        """
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for RenderServer.
+    """
+
+    server: RenderServer
+
+    def do_GET(self) -> None:
+        """
+        Answer health checks on /health.
+        """
+        if urlparse(self.path).path == "/health":
+            self._send(200, "text/plain", b"ok")
+        else:
+            self._send(404, "text/plain", b"not found")
+
+    def do_POST(self) -> None:
+        """
+        Render the posted page JSON on /render.
+        """
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self._send(404, "text/plain", b"not found")
+            return
+        query = parse_qs(url.query)
+        try:
+            scale = float(query.get("scale", ["1"])[0])
+            if not (
+                math.isfinite(scale) and 0 < scale <= self.server.max_scale
+            ):
+                raise ValueError(
+                    f"Scale must be in (0, {self.server.max_scale:g}]: {scale}"
+                )
+            format = query.get("format", ["png"])[0].lower()
+            if format not in CONTENT_TYPES:
+                raise ValueError(f"Unsupported format: {format}")
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(f"Invalid Content-Length: {length}")
+            if length > self.server.max_body_bytes:
+                message = (
+                    f"Body larger than {self.server.max_body_bytes} bytes"
+                )
+                self._send(413, "text/plain", message.encode("utf-8"))
+                return
+            document = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            self._send(400, "text/plain", str(e).encode("utf-8"))
+            return
+        try:
+            key = render_key(document, scale, format)
+            etag = f'"{key}"'
+            if etag in self.headers.get("If-None-Match", ""):
+                self._send(304, CONTENT_TYPES[format], b"", {"ETag": etag})
+                return
+            data, cached = self.server.render(document, scale, format, key)
+        except QueueFullError as e:
+            self._send(
+                503, "text/plain", str(e).encode("utf-8"), {"Retry-After": "1"}
+            )
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, "text/plain", str(e).encode("utf-8"))
+            return
+        except Exception as e:
+            self._send(500, "text/plain", str(e).encode("utf-8"))
+            return
+        self._send(
+            200,
+            CONTENT_TYPES[format],
+            data,
+            {"ETag": etag, "X-Cache": "hit" if cached else "miss"},
+        )
+
+    def _send(
+        self,
+        status: int,
+        content_type: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Send a complete response.
+
+        Args:
+            status: The HTTP status code.
+            content_type: The Content-Type of the body.
+            body: The response body.
+            headers: Additional response headers.
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    *,
+    workers: Optional[int] = None,
+    max_pending: int = 64,
+    cache_bytes: int = 256 * 1024 * 1024,
+    cache_dir: Optional[Path] = None,
+    max_scale: float = 8.0,
+    max_body_bytes: int = 8 * 1024 * 1024,
+) -> None:
+    """
+    Run a RenderServer until interrupted.
+
+    Args:
+        host: The host to listen on.
+        port: The port to listen on.
+        workers: The number of render processes, defaults to the CPU count.
+        max_pending: The maximum number of renders queued or running.
+        cache_bytes: The maximum total size of cached responses in memory.
+        cache_dir: The directory of the on-disk response cache, None disables it.
+        max_scale: The largest accepted scale, scales must be positive.
+        max_body_bytes: The largest accepted request body.
+    """
+    with RenderServer(
+        (host, port),
+        workers=workers,
+        max_pending=max_pending,
+        cache_bytes=cache_bytes,
+        cache_dir=cache_dir,
+        max_scale=max_scale,
+        max_body_bytes=max_body_bytes,
+    ) as server:
+        print(f"Serving Enana on http://{host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
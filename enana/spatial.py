@@ -0,0 +1,79 @@
+"""
+Spatial index of laid out painters.
+
+Painters are bucketed into a uniform grid in layout units, so the painters
+overlapping a region are found by visiting the grid cells under the region
+instead of every painter on the page. The index does not depend on the
+render scale and can be queried at any scale.
+"""
+
+from math import ceil, floor
+from typing import Dict, List, Set, Tuple
+
+from .painter import Painter
+
+
+def overlaps(a: Tuple[int, ...], b: Tuple[int, ...]) -> bool:
+    """
+    Check if two (left, top, right, bottom) boxes intersect.
+
+    Args:
+        a: The first box.
+        b: The second box.
+
+    Returns:
+        True if the boxes share at least one pixel, False otherwise.
+    """
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class PainterGrid:
+    """
+    Uniform grid of painters keyed by the layout cells they may draw on.
+    """
+
+    def __init__(self, painters: List[Painter], cell_size: int = 256):
+        """
+        Index painters by their bounds.
+
+        Args:
+            painters: The painters sorted by z-index, topmost first.
+            cell_size: The edge length of the grid cells in layout units.
+        """
+        self.painters = painters
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for index, painter in enumerate(painters):
+            left, top, right, bottom = painter.bounds(1.0)
+            if right <= left or bottom <= top:
+                continue
+            for cy in range(top // cell_size, (bottom - 1) // cell_size + 1):
+                for cx in range(
+                    left // cell_size, (right - 1) // cell_size + 1
+                ):
+                    self._cells.setdefault((cx, cy), []).append(index)
+
+    def query(
+        self, box: Tuple[int, int, int, int], scale: float = 1.0
+    ) -> List[Painter]:
+        """
+        Find the painters that may draw on a pixel box.
+
+        Args:
+            box: The (left, top, right, bottom) pixel box on the page.
+            scale: The scale the box is measured at.
+
+        Returns:
+            List[Painter]: The painters, in their original order.
+        """
+        size = self.cell_size
+        # Pad by a layout unit to absorb rounding at fractional scales
+        left = floor(box[0] / scale) - 1
+        top = floor(box[1] / scale) - 1
+        right = ceil(box[2] / scale) + 1
+        bottom = ceil(box[3] / scale) + 1
+        found: Set[int] = set()
+        for cy in range(top // size, (bottom - 1) // size + 1):
+            for cx in range(left // size, (right - 1) // size + 1):
+                found.update(self._cells.get((cx, cy), ()))
+        return [self.painters[index] for index in sorted(found)]
@@ -0,0 +1,334 @@
+"""
+Page templates with named slots.
+
+A template is page JSON in which some Text and Image nodes carry a
+``"slot"`` name. The values of those nodes in the JSON are the defaults.
+Everything that is not a slot, and does not overlap one, is rendered once
+per scale into a cached base layer; each render copies the base layer and
+draws only the slot contents on top of it.
+
+Layout is reused as long as the filled slots keep the size of their
+defaults, which holds for texts with a max_width that wrap into the same
+number of lines and for images of a fixed box. Otherwise the page is laid
+out again. A Text slot without max_width is as wide as its text, so nearly
+every new text lays the page out again: give text slots a max_width.
+"""
+
+import threading
+from collections import OrderedDict
+from math import ceil
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from PIL import Image as PILImage
+
+from .generator import draw_painters
+from .image import Image, ImageSize
+from .painter import ImagePainter, Painter, TextPainter
+from .spatial import PainterGrid, overlaps
+from .typing import RenderQuality
+from .utils import from_json
+from .widget import Widget
+
+
+def _slot_nodes(json: dict) -> Dict[str, dict]:
+    """
+    Find the slot nodes of a widget JSON tree.
+
+    Args:
+        json: JSON dictionary, conforming to widget.schema.json
+
+    Returns:
+        Dict[str, dict]: The nodes by slot name.
+
+    Raises:
+        ValueError: If a slot is not a Text or Image node, or a slot name is
+            used twice.
+    """
+    nodes: Dict[str, dict] = {}
+    stack: List[Any] = [json]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            if "slot" in node:
+                name = node["slot"]
+                if node.get("type") not in ("Text", "Image"):
+                    raise ValueError(
+                        f"Slot {name} must be a Text or Image widget"
+                    )
+                if name in nodes:
+                    raise ValueError(f"Duplicate slot name: {name}")
+                nodes[name] = node
+            stack.extend(
+                value
+                for value in node.values()
+                if isinstance(value, (dict, list))
+            )
+    return nodes
+
+
+def _contains(outer: Tuple[int, ...], inner: Tuple[int, ...]) -> bool:
+    """
+    Check if a (left, top, right, bottom) box lies inside another.
+
+    Args:
+        outer: The enclosing box.
+        inner: The enclosed box.
+
+    Returns:
+        True if inner is inside outer, False otherwise.
+    """
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and inner[2] <= outer[2]
+        and inner[3] <= outer[3]
+    )
+
+
+class Template:
+    """
+    A page design rendered repeatedly with different slot contents.
+
+    Templates are thread-safe, base layers are built once per scale and
+    quality and shared between threads. The most recently used base layers
+    are kept.
+    """
+
+    def __init__(self, json: dict, *, max_layers: int = 8):
+        """
+        Lay the template out with its default slot contents.
+
+        Args:
+            json: Page JSON dictionary, with "slot" names on Text and Image
+                nodes.
+            max_layers: The number of base layers to keep.
+        """
+        if json.get("type") != "Page":
+            raise ValueError("Template JSON must be a Page")
+        self._json = json
+        self._nodes = _slot_nodes(json)
+        self._defaults = {
+            name: self._slot_widget(name, None) for name in self._nodes
+        }
+        from .page import Page
+
+        page = from_json(json, self._defaults)
+        assert isinstance(page, Page)
+        painters = page.compile().painters
+        self._size = (page.child.width, page.child.height)
+        self._slot_painters = {
+            painter.slot: painter
+            for painter in painters
+            if painter.slot is not None
+        }
+
+        # Texts and images overlapping a slot, directly or through each
+        # other, are drawn with the slots to keep their stacking order
+        grid = PainterGrid(list(painters))
+        pending = list(self._slot_painters.values())
+        dynamic = {id(painter) for painter in pending}
+        while pending:
+            box = pending.pop().bounds(1.0)
+            for other in grid.query(box):
+                if (
+                    id(other) not in dynamic
+                    and isinstance(other, (TextPainter, ImagePainter))
+                    and overlaps(box, other.bounds(1.0))
+                ):
+                    dynamic.add(id(other))
+                    pending.append(other)
+        self._base_painters = [p for p in painters if id(p) not in dynamic]
+        self._dynamic = [p for p in painters if id(p) in dynamic]
+        self._layers: OrderedDict[
+            Tuple[float, RenderQuality], PILImage.Image
+        ] = OrderedDict()
+        self._max_layers = max_layers
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, json: dict, *, max_layers: int = 8) -> "Template":
+        """
+        Create a Template from a page JSON dictionary.
+
+        Args:
+            json: Page JSON dictionary, with "slot" names on Text and Image
+                nodes.
+            max_layers: The number of base layers to keep.
+
+        Returns:
+            Template: The template.
+        """
+        return cls(json, max_layers=max_layers)
+
+    @property
+    def slots(self) -> Tuple[str, ...]:
+        """
+        The slot names of the template.
+        """
+        return tuple(self._nodes)
+
+    def _slot_widget(self, name: str, value: Any) -> Widget:
+        """
+        Create the widget filling a slot.
+
+        Args:
+            name: The slot name.
+            value: None for the default, a dict of JSON fields overriding
+                the slot node, a string (the text of a Text slot or the URL
+                of an Image slot), or an in-memory image for an Image slot.
+
+        Returns:
+            Widget: The widget, tagged with the slot name.
+        """
+        node = self._nodes[name]
+        widget: Widget
+        if value is None:
+            widget = from_json(node)
+        elif node["type"] == "Text":
+            if not isinstance(value, dict):
+                value = {"text": str(value)}
+            widget = from_json({**node, **value})
+        elif isinstance(value, (str, dict)):
+            if isinstance(value, str):
+                value = {"url": value}
+            # The new source replaces the default one
+            if "url" in value or "resource" in value:
+                node = {
+                    k: v
+                    for k, v in node.items()
+                    if k not in ("url", "resource")
+                }
+            widget = from_json({**node, **value})
+        else:
+            size = node.get("size", "default")
+            widget = Image(
+                image=value,
+                width=node["width"],
+                height=node["height"],
+                size=(
+                    ImageSize(size.lower())
+                    if isinstance(size, str)
+                    else ImageSize.DEFAULT
+                ),
+            )
+        widget._slot = name
+        return widget
+
+    def _base_layer(
+        self, scale: float, quality: RenderQuality
+    ) -> PILImage.Image:
+        """
+        Get the cached rendering of everything but the slots.
+
+        Args:
+            scale: Scale factor for the image.
+            quality: Render quality tier.
+
+        Returns:
+            PILImage.Image: The base layer, must not be modified.
+        """
+        key = (scale, quality)
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is not None:
+                self._layers.move_to_end(key)
+            else:
+                width, height = self._size
+                layer = PILImage.new(
+                    "RGBA", (ceil(width * scale), ceil(height * scale))
+                )
+                draw_painters(
+                    self._base_painters,
+                    scale,
+                    quality,
+                    layer,
+                    instancing=True,
+                )
+                self._layers[key] = layer
+                if len(self._layers) > self._max_layers:
+                    self._layers.popitem(last=False)
+        return layer
+
+    def render(
+        self,
+        values: Optional[Mapping[str, Any]] = None,
+        *,
+        scale: float = 1.0,
+        quality: RenderQuality | str = RenderQuality.FINAL,
+    ) -> PILImage.Image:
+        """
+        Render the template with the given slot contents.
+
+        Slots that keep the size of their default are drawn on top of the
+        cached base layer, other slots lay the whole page out again.
+
+        Args:
+            values: The contents of the slots by name, see _slot_widget for
+                the accepted values. Missing slots keep their defaults.
+            scale: Scale factor for the image, defaults to 1.0.
+            quality: Render quality tier, "final" by default.
+
+        Returns:
+            PILImage.Image: The rendered RGBA image.
+
+        Raises:
+            KeyError: If a value is given for an unknown slot.
+        """
+        quality = RenderQuality(quality)
+        values = values or {}
+        for name in values:
+            if name not in self._nodes:
+                raise KeyError(f"Unknown slot: {name}")
+        widgets = {
+            name: self._slot_widget(name, value)
+            for name, value in values.items()
+        }
+
+        replacements: Dict[str, Painter] = {}
+        for name, widget in widgets.items():
+            default = self._defaults[name]
+            old = self._slot_painters[name]
+            (new,) = widget.painters
+            new.offset_x, new.offset_y = old.offset_x, old.offset_y
+            if (widget.width, widget.height) != (
+                default.width,
+                default.height,
+            ) or not _contains(old.bounds(1.0), new.bounds(1.0)):
+                return self._relayout(widgets, scale, quality)
+            replacements[name] = new
+
+        image = self._base_layer(scale, quality).copy()
+        painters = [
+            (
+                replacements.get(painter.slot, painter)
+                if painter.slot
+                else painter
+            )
+            for painter in self._dynamic
+        ]
+        return draw_painters(painters, scale, quality, image)
+
+    def _relayout(
+        self,
+        widgets: Dict[str, Widget],
+        scale: float,
+        quality: RenderQuality,
+    ) -> PILImage.Image:
+        """
+        Render the template from scratch, for slots that changed size.
+
+        Args:
+            widgets: The widgets filling the slots that were given.
+            scale: Scale factor for the image.
+            quality: Render quality tier.
+
+        Returns:
+            PILImage.Image: The rendered RGBA image.
+        """
+        from .page import Page
+
+        page = from_json(self._json, {**self._defaults, **widgets})
+        assert isinstance(page, Page)
+        return page.render(scale=scale, quality=quality)
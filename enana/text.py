@@ -1,7 +1,10 @@
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from PIL import Image, ImageDraw
 
+from .fallback import text_bbox
+from .fonts import DEFAULT_FALLBACK
+from .linebreak import break_lines
 from .painter import Painter, TextPainter
 from .utils import get_font
 from .widget import Widget
@@ -17,6 +20,8 @@ class Text(Widget):
         font_size: The font size in points.
         max_width: The maximum width of the text before wrapping.
         color: The text color in RGBA format.
+        fallback: Names of fonts for the characters the font lacks, tried in
+            order, defaults to enana.fonts.DEFAULT_FALLBACK.
     """
 
     def __init__(
@@ -27,12 +32,38 @@ class Text(Widget):
         font_size: int = 12,
         max_width: Optional[int] = None,
         color: Tuple[int, int, int, int] = (0, 0, 0, 255),
+        fallback: Optional[Sequence[str]] = None,
     ):
         self._text = text
         self._font = font
         self._font_size = font_size
         self._max_width = max_width
         self._color = color
+        self._fallback = tuple(
+            DEFAULT_FALLBACK if fallback is None else fallback
+        )
+        self._invalidate()
+
+    _properties = {
+        "text": "_text",
+        "font": "_font",
+        "font_size": "_font_size",
+        "max_width": "_max_width",
+        "color": "_color",
+        "fallback": "_fallback",
+    }
+
+    def _invalidate(self) -> None:
+        super()._invalidate()
+        # update() may set any sequence, or None for the default
+        fallback: Optional[Sequence[str]] = self._fallback
+        self._fallback = tuple(
+            DEFAULT_FALLBACK if fallback is None else fallback
+        )
+        # Lines of wrapped text, kept so rendering reuses the layout
+        self._lines: Optional[List[str]] = None
+        # The right edge of the drawn glyphs, which may pass the width
+        self._ink_width: int | float = 0
         # Calculate the actual text width and height
         self._width, self._height = self._calculate_text_size()
 
@@ -48,46 +79,31 @@ class Text(Widget):
         draw = ImageDraw.Draw(temp_img)
 
         # Get font object
-        font_obj = get_font(self._font, self._font_size)
+        font_obj = get_font(
+            self._font, self._font_size, fallback=self._fallback
+        )
 
         # Calculate single line height
-        line_height = int(
-            draw.textbbox((0, 0), "A", font=font_obj)[3]
-            - draw.textbbox((0, 0), "A", font=font_obj)[1]
-        )
+        bbox = text_bbox(draw, "A", font_obj)
+        line_height = int(bbox[3] - bbox[1])
         line_height = int(line_height * 1.5)  # Line height coefficient
 
         # If no max_width is set or text width is less than max_width, return single line size
         if self._max_width is None:
-            bbox = draw.textbbox((0, 0), self._text, font=font_obj)
+            bbox = text_bbox(draw, self._text, font_obj)
             width = int(bbox[2] - bbox[0])
             height = line_height
+            self._ink_width = bbox[2]
             return width, height
 
         # Implement automatic line wrapping
-        words = self._text.split()
-        if not words:
+        broken = break_lines(draw, self._text, font_obj, self._max_width)
+        lines = [line for line, _ in broken]
+        self._lines = lines
+        if not lines:
             return 0, line_height
-
-        lines = []
-        current_line = words[0]
-
-        for word in words[1:]:
-            # Test the width of current line plus the next word
-            test_line = f"{current_line} {word}"
-            test_bbox = draw.textbbox((0, 0), test_line, font=font_obj)
-            test_width = int(test_bbox[2] - test_bbox[0])
-
-            if test_width <= self._max_width:
-                # If adding the next word still fits within the max_width, continue
-                current_line = test_line
-            else:
-                # Otherwise, end the current line and start a new one
-                lines.append(current_line)
-                current_line = word
-
-        # Add the last line
-        lines.append(current_line)
+        # Lines that cannot be broken may pass max_width
+        self._ink_width = max(right for _, right in broken)
 
         # Calculate final width and height
         final_width = self._max_width
@@ -95,6 +111,17 @@ class Text(Widget):
 
         return final_width, final_height
 
+    def _instance_fields(self) -> tuple:
+        return (
+            "Text",
+            self._text,
+            self._font,
+            self._font_size,
+            self._max_width,
+            tuple(self._color),
+            self._fallback,
+        )
+
     @property
     def painters(self) -> List[Painter]:
         """
@@ -103,12 +130,16 @@ class Text(Widget):
         Returns:
             A list of Painter objects that will be used to render this text.
         """
-        return [
-            TextPainter(
-                text=self._text,
-                font=self._font,
-                font_size=self._font_size,
-                max_width=self._max_width,
-                color=self._color,
-            )
-        ]
+        painter = TextPainter(
+            text=self._text,
+            font=self._font,
+            font_size=self._font_size,
+            max_width=self._max_width,
+            color=self._color,
+            width=max(self.width, self._ink_width),
+            height=self.height,
+            lines=self._lines,
+            fallback=self._fallback,
+        )
+        painter.slot = self._slot
+        return [painter]
@@ -1,18 +1,138 @@
-class Padding:
+from enum import Enum
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from PIL import Image as PILImage
+from PIL import ImageFont
+
+# Interned values are kept until this many distinct values were seen, later
+# values are created without interning
+INTERN_LIMIT = 4096
+
+_interned: Dict[tuple, Any] = {}
+
+
+def _intern(key: tuple, value: Any) -> Any:
+    """
+    Get the interned value for a key, interning the given value if new.
+
+    Args:
+        key: The identity of the value, including the types of its parts.
+        value: The value to intern if the key was not seen.
+
+    Returns:
+        The interned value, or value if the intern table is full.
+    """
+    interned = _interned.get(key)
+    if interned is not None:
+        return interned
+    if len(_interned) < INTERN_LIMIT:
+        return _interned.setdefault(key, value)
+    return value
+
+
+def intern_color(color: Sequence[int]) -> Tuple[int, int, int, int]:
+    """
+    Get a shared RGBA tuple equal to a color.
+
+    Documents repeat a handful of colors on thousands of nodes, interning
+    keeps a single tuple of each.
+
+    Args:
+        color: The RGBA color, as any sequence.
+
+    Returns:
+        Tuple[int, int, int, int]: The shared tuple.
+    """
+    values = tuple(color)
+    return _intern(("color",) + values + tuple(map(type, values)), values)
+
+
+class _Value:
+    """
+    Base class of immutable values that are interned on creation.
+
+    Subclasses list their fields in _fields and declare them as slots.
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def _create(cls, values: Tuple[Any, ...]) -> Any:
+        """
+        Create a value, or reuse an interned one with the same fields.
+
+        Args:
+            values: The values of the fields, in the order of _fields.
+
+        Returns:
+            The object.
+        """
+        # The types are part of the key, so 1 and 1.0 are kept apart
+        key = (cls,) + values + tuple(map(type, values))
+        interned = _interned.get(key)
+        if interned is not None:
+            return interned
+        self = object.__new__(cls)
+        for name, value in zip(cls._fields, values):
+            object.__setattr__(self, name, value)
+        return _intern(key, self)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __getnewargs_ex__(self) -> Tuple[tuple, Dict[str, Any]]:
+        return (), {name: getattr(self, name) for name in self._fields}
+
+    def __getstate__(self) -> None:
+        # Everything is passed to __new__, see __getnewargs_ex__
+        return None
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            type(self) is type(other)
+            and self._values() == other._values()  # type: ignore
+        )
+
+    def __hash__(self) -> int:
+        return hash((type(self),) + self._values())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join([f'{k}={getattr(self, k)}' for k in self._fields])})"
+
+
+class Padding(_Value):
     """
     A class representing padding with top, right, bottom, and left values.
+
+    Paddings are immutable values. Objects with the same values are shared,
+    so creating one per widget costs no memory.
     """
 
-    def __init__(
-        self,
+    __slots__ = ("top", "right", "bottom", "left")
+    _fields = __slots__
+
+    top: int | float
+    right: int | float
+    bottom: int | float
+    left: int | float
+
+    def __new__(
+        cls,
         *,
         top: int | float,
         right: int | float,
         bottom: int | float,
         left: int | float,
-    ):
+    ) -> "Padding":
         """
-        Initialize the Padding object.
+        Create the Padding object, or reuse one with the same values.
 
         Args:
             top: The top padding value.
@@ -20,10 +140,7 @@ class Padding:
             bottom: The bottom padding value.
             left: The left padding value.
         """
-        self.top = top
-        self.right = right
-        self.bottom = bottom
-        self.left = left
+        return cls._create((top, right, bottom, left))
 
     @classmethod
     def zero(cls) -> "Padding":
@@ -95,39 +212,40 @@ class Padding:
         """
         return any([self.top, self.right, self.bottom, self.left])
 
-    def __repr__(self) -> str:
-        """
-        Get a string representation of the Padding object.
-
-        Returns:
-            A string representation of the Padding object.
-        """
-        return f"{self.__class__.__name__}({', '.join([f'{k}={v}' for k, v in self.__dict__.items() if not k.startswith('_')])})"
-
 
 class Margin(Padding):
     """
     A class representing margin, inheriting from Padding.
     """
 
-    pass
+    __slots__ = ()
 
 
-class BorderRadius:
+class BorderRadius(_Value):
     """
     A class representing border radius with values for all four corners.
+
+    Border radii are immutable values, shared like Padding.
     """
 
-    def __init__(
-        self,
+    __slots__ = ("top_left", "top_right", "bottom_right", "bottom_left")
+    _fields = __slots__
+
+    top_left: int | float
+    top_right: int | float
+    bottom_right: int | float
+    bottom_left: int | float
+
+    def __new__(
+        cls,
         *,
         top_left: int | float,
         top_right: int | float,
         bottom_right: int | float,
         bottom_left: int | float,
-    ):
+    ) -> "BorderRadius":
         """
-        Initialize the BorderRadius object.
+        Create the BorderRadius object, or reuse one with the same values.
 
         Args:
             top_left: The top-left border radius.
@@ -135,10 +253,7 @@ class BorderRadius:
             bottom_right: The bottom-right border radius.
             bottom_left: The bottom-left border radius.
         """
-        self.top_left = top_left
-        self.top_right = top_right
-        self.bottom_right = bottom_right
-        self.bottom_left = bottom_left
+        return cls._create((top_left, top_right, bottom_right, bottom_left))
 
     @classmethod
     def zero(cls) -> "BorderRadius":
@@ -167,3 +282,71 @@ class BorderRadius:
             bottom_right=value,
             bottom_left=value,
         )
+
+
+# The zero values, interned before any others so zero() always shares them
+_zeros = (Padding.zero(), Margin.zero(), BorderRadius.zero())
+
+
+class RenderQuality(Enum):
+    """
+    Enum for render quality tiers.
+
+    - FINAL: Full quality output, used for the images that get shipped.
+    - PREVIEW: Cheaper resampling, basic text layout, hard shape edges and
+      coarser raster tiles, used for thumbnails and live previews.
+    """
+
+    FINAL = "final"
+    PREVIEW = "preview"
+
+    @property
+    def resampling(self) -> PILImage.Resampling:
+        """
+        Get the resampling filter used when resizing images.
+
+        Returns:
+            The resampling filter for this quality tier.
+        """
+        if self == RenderQuality.PREVIEW:
+            return PILImage.Resampling.BILINEAR
+        return PILImage.Resampling.LANCZOS
+
+    @property
+    def layout_engine(self) -> Optional[ImageFont.Layout]:
+        """
+        Get the text layout engine used when loading fonts.
+
+        Returns:
+            The layout engine for this quality tier, or None to let Pillow
+            pick the best available one.
+        """
+        if self == RenderQuality.PREVIEW:
+            return ImageFont.Layout.BASIC
+        return None
+
+    @property
+    def supersample(self) -> int:
+        """
+        Get the samples per pixel edge used for anti-aliased shape edges.
+
+        Returns:
+            The supersampling factor, 1 meaning hard edges.
+        """
+        if self == RenderQuality.PREVIEW:
+            return 1
+        return 4
+
+    def raster_tile(self, scale: float) -> int:
+        """
+        Get the edge length of the pixel tiles sharing a single sample.
+
+        Args:
+            scale: The scale factor of the render.
+
+        Returns:
+            The tile size in pixels, 1 meaning every pixel is sampled.
+        """
+        if self == RenderQuality.PREVIEW:
+            return max(2, int(scale))
+        return 1
@@ -1,4 +1,5 @@
-from typing import List, Optional
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .painter import Painter
 
@@ -6,24 +7,34 @@ from .painter import Painter
 class Widget:
     _width: Optional[int | float] = None
     _height: Optional[int | float] = None
+    # The template slot this widget fills, see enana.template
+    _slot: Optional[str] = None
+    _instance_key: Optional[bytes] = None
+    # The widget containing this one, set by containers and pages
+    _parent: Optional["Widget"] = None
+    # Attributes update() may change, by property name
+    _properties: Dict[str, str] = {}
+    # Whether painters record this widget in their groups, see instance_key
+    _groups_painters = False
 
     def __init__(self):
         pass
 
     @classmethod
-    def from_json(cls, json: dict) -> "Widget":
+    def from_json(cls, json: dict, *, validate: bool = False) -> "Widget":
         """
         从JSON字典创建Widget对象
 
         Args:
             json: JSON字典，符合widget.schema.json
+            validate: 是否先按widget.schema.json校验，需要jsonschema
 
         Returns:
             Widget: 对应的Widget对象
         """
         from .utils import from_json
 
-        return from_json(json)
+        return from_json(json, validate=validate)
 
     @property
     def painters(self) -> List[Painter]:
@@ -31,6 +42,181 @@ class Widget:
             "painters property must be implemented in subclass"
         )
 
+    def update(self, **values: Any) -> None:
+        """
+        Change properties of this widget in place, such as text or color.
+
+        Only this widget and its ancestors are laid out again, and a page
+        that was rendered before redraws only the damaged region on its
+        next render.
+
+        Args:
+            values: The new property values by name.
+
+        Raises:
+            TypeError: If a property does not exist or cannot be updated.
+        """
+        for name in values:
+            if name not in self._properties:
+                raise TypeError(
+                    f"{self.__class__.__name__} has no updatable property "
+                    f"{name}"
+                )
+        for name, value in values.items():
+            setattr(self, self._properties[name], value)
+        widget: Optional[Widget] = self
+        while widget is not None:
+            widget._invalidate()
+            widget = widget._parent
+
+    def _invalidate(self) -> None:
+        """
+        Drop cached layout after this widget or a descendant changed.
+        """
+        self._instance_key = None
+
+    @property
+    def instance_key(self) -> bytes:
+        """
+        Digest of the type, style and children of this subtree.
+
+        Subtrees with equal keys lay out and render identically, so one
+        rendering can be reused for all of them.
+
+        Returns:
+            bytes: The 16 byte digest.
+        """
+        if self._instance_key is None:
+            # Descendants first, so each key only reads cached child keys
+            for widget in self._post_order(
+                lambda widget: widget._instance_key is None
+            ):
+                widget._instance_key = hashlib.blake2b(
+                    repr(widget._instance_fields()).encode("utf-8"),
+                    digest_size=16,
+                ).digest()
+        assert self._instance_key is not None
+        return self._instance_key
+
+    def _instance_fields(self) -> tuple:
+        """
+        Get the values that determine how this subtree renders.
+
+        Returns:
+            tuple: The type name followed by the style and child keys.
+        """
+        raise NotImplementedError(
+            "_instance_fields must be implemented in subclass"
+        )
+
+    def _child_widgets(self) -> List["Widget"]:
+        """
+        Get the direct children of this widget.
+
+        Returns:
+            List[Widget]: The children, in drawing order.
+        """
+        return []
+
+    def _placements(self) -> List[Tuple["Widget", int | float, int | float]]:
+        """
+        Lay out the direct children of this widget.
+
+        Returns:
+            List[Tuple[Widget, int | float, int | float]]: Each child and
+            its offset from the top-left corner of this widget.
+        """
+        return []
+
+    def _own_painters(self) -> List[Painter]:
+        """
+        Get the painters of this widget alone, without its children.
+
+        Returns:
+            List[Painter]: The painters, at offsets relative to this widget.
+        """
+        return self.painters
+
+    def _needs_measure(self) -> bool:
+        """
+        Check if the size of this widget depends on children not measured.
+
+        Returns:
+            True if _measure must run before the size is known.
+        """
+        return False
+
+    def _measure(self) -> None:
+        """
+        Compute the size of this widget from the sizes of its children.
+
+        Only called once all children that need it were measured.
+        """
+
+    def _post_order(
+        self, pending: Callable[["Widget"], bool]
+    ) -> List["Widget"]:
+        """
+        Collect the pending widgets of this subtree, children first.
+
+        The subtree is walked with an explicit stack, so its depth is not
+        limited by the recursion limit. Children of widgets that are not
+        pending are skipped.
+
+        Args:
+            pending: Whether a widget and its children need to be visited.
+
+        Returns:
+            List[Widget]: The pending widgets, each after its descendants.
+        """
+        order = []
+        stack: List[Widget] = [self]
+        while stack:
+            widget = stack.pop()
+            if pending(widget):
+                order.append(widget)
+                stack.extend(widget._child_widgets())
+        order.reverse()
+        return order
+
+    def _layout(self) -> None:
+        """
+        Measure this subtree bottom-up, without recursion.
+        """
+        for widget in self._post_order(lambda widget: widget._needs_measure()):
+            widget._measure()
+
+    def _flatten(self) -> List[Painter]:
+        """
+        Collect the painters of this subtree, without recursion.
+
+        Painters are created in the same order as drawing each widget
+        before its children, placed at their offset from this widget and
+        tagged with the groups of their enclosing widgets, innermost first.
+
+        Returns:
+            List[Painter]: All the painters of this subtree.
+        """
+        # Computes the instance keys of the whole subtree at once
+        self.instance_key
+        painters: List[Painter] = []
+        Entry = Tuple[Widget, int | float, int | float, tuple]
+        stack: List[Entry] = [(self, 0, 0, ())]
+        while stack:
+            widget, x, y, groups = stack.pop()
+            if widget._groups_painters:
+                groups = ((widget.instance_key, id(widget)),) + groups
+            for painter in widget._own_painters():
+                painter.offset_x += x
+                painter.offset_y += y
+                painter.groups.extend(groups)
+                painters.append(painter)
+            stack.extend(
+                (child, x + dx, y + dy, groups)
+                for child, dx, dy in reversed(widget._placements())
+            )
+        return painters
+
     @property
     def width(self) -> int | float:
         if self._width is None:
@@ -0,0 +1,54 @@
+"""
+Render functions run inside worker processes.
+
+Each worker keeps fonts and recently downloaded images loaded, so repeated
+documents only pay for layout, rasterization and encoding.
+"""
+
+import io
+from functools import lru_cache
+
+from PIL import Image as PILImage
+
+from .generator import EncodeOptions, encode_image
+from .image import prefetched_images, remote_image_urls
+from .page import Page
+
+
+@lru_cache(maxsize=128)
+def fetch_image(url: str) -> PILImage.Image:
+    """
+    Download a remote image, keeping recently used images in the worker.
+
+    Args:
+        url: The http(s) URL of the image.
+
+    Returns:
+        PILImage.Image: The decoded RGBA image.
+    """
+    import requests
+
+    response = requests.get(url)
+    response.raise_for_status()
+    return PILImage.open(io.BytesIO(response.content)).convert("RGBA")
+
+
+def render_document(document: dict, scale: float, format: str) -> bytes:
+    """
+    Render a page document to encoded image bytes.
+
+    Args:
+        document: JSON dictionary, conforming to widget.schema.json
+        scale: Scale factor for the image.
+        format: The output format, "png", "webp" or "jpeg".
+
+    Returns:
+        bytes: The encoded image.
+    """
+    images = {url: fetch_image(url) for url in remote_image_urls(document)}
+    token = prefetched_images.set(images)
+    try:
+        page = Page.from_json(document)
+    finally:
+        prefetched_images.reset(token)
+    return encode_image(page.render(scale=scale), EncodeOptions(format=format))
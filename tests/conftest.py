@@ -0,0 +1,50 @@
+import pytest
+
+from enana import (
+    BorderRadius,
+    Column,
+    Container,
+    Padding,
+    Page,
+    Text,
+    hex_to_rgba,
+)
+from enana.fonts import find_font
+
+
+def _installed_font(name: str) -> str:
+    # The font tests use the DejaVu fonts most systems ship
+    location = find_font(name)
+    if location is None:
+        pytest.skip(f"{name} is not installed")
+    return location[0]
+
+
+@pytest.fixture
+def page() -> Page:
+    return Page(
+        child=Container(
+            color=hex_to_rgba(0xDDAACCFF),
+            padding=Padding.all(10),
+            border_radius=BorderRadius.all(10),
+            child=Column(
+                children=[
+                    Container(
+                        color=hex_to_rgba(0x39C5BBFF),
+                        child=Text(text="Hello Hello Hello", max_width=50),
+                    ),
+                    Text(text="Plain text"),
+                ]
+            ),
+        )
+    )
+
+
+@pytest.fixture
+def dejavu_sans() -> str:
+    return _installed_font("DejaVu Sans")
+
+
+@pytest.fixture
+def dejavu_sans_mono() -> str:
+    return _installed_font("DejaVu Sans Mono")
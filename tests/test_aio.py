@@ -0,0 +1,57 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image as PILImage
+
+from enana import Page
+
+
+def test_aio(tmp_path):
+    PILImage.new("RGBA", (8, 8), (200, 30, 30, 255)).save(tmp_path / "a.png")
+    handler = functools.partial(
+        SimpleHTTPRequestHandler, directory=str(tmp_path)
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/a.png"
+
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            page = await Page.from_json_async(
+                {
+                    "type": "Page",
+                    "child": {
+                        "type": "Row",
+                        "children": [
+                            {
+                                "type": "Image",
+                                "url": url,
+                                "width": 8,
+                                "height": 8,
+                            },
+                            {
+                                "type": "Image",
+                                "url": url,
+                                "width": 8,
+                                "height": 8,
+                            },
+                        ],
+                    },
+                },
+                executor=executor,
+            )
+            await page.paint_async(
+                scale=2, filename=tmp_path / "out.png", executor=executor
+            )
+            return await page.render_async(scale=2, executor=executor)
+
+    try:
+        img = asyncio.run(main())
+    finally:
+        server.shutdown()
+    assert img.size == (32, 16)
+    assert img.getpixel((20, 8)) == (200, 30, 30, 255)
+    assert PILImage.open(tmp_path / "out.png").size == (32, 16)
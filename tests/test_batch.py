@@ -0,0 +1,37 @@
+import io
+import json
+import tarfile
+
+from enana.batch import render_batch
+
+
+def _line(width):
+    return json.dumps(
+        {
+            "type": "Page",
+            "child": {
+                "type": "Container",
+                "width": width,
+                "height": 10,
+                "color": [57, 197, 187, 255],
+            },
+        }
+    )
+
+
+def test_render_batch(tmp_path):
+    lines = [_line(width) for width in range(5, 15)] + ["", "{broken"]
+    log = io.StringIO()
+    failures = render_batch(
+        iter(lines), output=tmp_path, workers=2, max_in_flight=3, log=log
+    )
+    assert failures == 1
+    assert sorted(p.name for p in tmp_path.iterdir())[0] == "000000.png"
+    assert len(list(tmp_path.iterdir())) == 10
+    assert "pages/s" in log.getvalue()
+
+    stream = io.BytesIO()
+    render_batch(iter(lines[:3]), tar=stream, workers=1, log=io.StringIO())
+    stream.seek(0)
+    with tarfile.open(fileobj=stream) as tar:
+        assert tar.getnames() == ["000000.png", "000001.png", "000002.png"]
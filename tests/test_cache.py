@@ -0,0 +1,71 @@
+from PIL import Image as PILImage
+
+from enana import cache
+from enana.cache import RENDER_VERSION, RenderCache, render_key
+from enana.fonts import DEFAULT_FALLBACK
+from enana.worker import render_document
+
+
+def test_render_cache(tmp_path):
+    image = tmp_path / "a.png"
+    PILImage.new("RGBA", (4, 4), (200, 30, 30, 255)).save(image)
+    document = {
+        "type": "Page",
+        "child": {"type": "Image", "url": str(image), "width": 4, "height": 4},
+    }
+    calls = []
+
+    def renderer(document, scale, format):
+        calls.append(scale)
+        return render_document(document, scale, format)
+
+    cache = RenderCache(directory=tmp_path / "cache")
+    data, key = cache.render(document, scale=2, renderer=renderer)
+    assert cache.render(document, scale=2, renderer=renderer) == (data, key)
+    assert calls == [2]
+    assert cache.render(document, scale=1, renderer=renderer)[1] != key
+
+    # The disk tier survives a new cache instance
+    disk = RenderCache(directory=tmp_path / "cache")
+    assert disk.render(document, scale=2, renderer=renderer) == (data, key)
+    assert calls == [2, 1]
+
+    # Changing a referenced file changes the key
+    PILImage.new("RGBA", (4, 4), (30, 30, 200, 255)).save(image)
+    assert cache.render(document, scale=2, renderer=renderer)[1] != key
+    assert calls == [2, 1, 2]
+
+
+def test_render_key_version(monkeypatch):
+    document = {"type": "Page", "child": {"type": "Text", "text": "a"}}
+    key = render_key(document, 1, "png")
+    assert render_key({**document}, 1, "png") == key
+    # A new renderer version invalidates every key
+    monkeypatch.setattr("enana.cache.RENDER_VERSION", RENDER_VERSION + 1)
+    assert render_key(document, 1, "png") != key
+
+
+def test_render_key_default_fallback(tmp_path, monkeypatch):
+    document = {"type": "Page", "child": {"type": "Text", "text": "排行"}}
+    key = render_key(document, 1, "png")
+
+    # Installing a default fallback font changes the key of texts without
+    # a fallback list
+    font = tmp_path / "NotoSansCJK.ttc"
+    font.write_bytes(b"font")
+    find_font = cache.find_font
+    monkeypatch.setattr(
+        cache,
+        "find_font",
+        lambda name: (
+            (str(font), 0) if name == DEFAULT_FALLBACK[0] else find_font(name)
+        ),
+    )
+    assert render_key(document, 1, "png") != key
+    explicit = {
+        "type": "Page",
+        "child": {"type": "Text", "text": "排行", "fallback": []},
+    }
+    explicit_key = render_key(explicit, 1, "png")
+    monkeypatch.undo()
+    assert render_key(explicit, 1, "png") == explicit_key
@@ -0,0 +1,63 @@
+import pytest
+from PIL import Image as PILImage
+
+from enana import (
+    Column,
+    CompiledPage,
+    Container,
+    Image,
+    Padding,
+    Page,
+    RenderStats,
+    Text,
+    hex_to_rgba,
+)
+
+
+def test_compiled_page(page):
+    compiled = page.compile()
+    images = compiled.render_scales([1, 2, 3])
+    for scale, image in zip([1, 2, 3], images):
+        assert image.tobytes() == page.render(scale=scale).tobytes()
+    assert (
+        compiled.render_region((5, 5, 60, 40), scale=2).tobytes()
+        == images[1].crop((5, 5, 60, 40)).tobytes()
+    )
+    with pytest.raises(AttributeError):
+        compiled.painters = ()
+
+
+def test_compiled_page_file(tmp_path, page):
+    chart = PILImage.new("RGBA", (6, 6), (10, 200, 30, 255))
+    rows = [
+        Container(
+            color=hex_to_rgba(0xF0F0FAFF),
+            padding=Padding.all(4),
+            child=Text(text="row", font_size=12),
+        )
+        for _ in range(4)
+    ]
+    page = Page(
+        child=Column(
+            children=[
+                page.child,
+                Image(image=chart, width=6, height=6),
+                *rows,
+            ]
+        )
+    )
+    compiled = page.compile()
+    compiled.save(tmp_path / "page.enana")
+    loaded = CompiledPage.load(tmp_path / "page.enana")
+    assert (loaded.width, loaded.height) == (compiled.width, compiled.height)
+    stats, loaded_stats = RenderStats(), RenderStats()
+    assert (
+        loaded.render(scale=2, stats=loaded_stats).tobytes()
+        == compiled.render(scale=2, stats=stats).tobytes()
+    )
+    # Repeated subtrees are still instanced after loading
+    assert loaded_stats.instances == stats.instances > 0
+
+    (tmp_path / "bad.enana").write_bytes(b"not a page" * 10)
+    with pytest.raises(ValueError):
+        CompiledPage.load(tmp_path / "bad.enana")
@@ -0,0 +1,44 @@
+from PIL import Image as PILImage
+from PIL import ImageDraw
+
+from enana import Page, Text
+from enana.fallback import FallbackFont
+from enana.utils import _fallback_fonts, get_font
+
+
+def test_font_fallback(dejavu_sans, dejavu_sans_mono):
+    font = get_font("DejaVuSansMono.ttf", 20, fallback=["DejaVu Sans"])
+    assert isinstance(font, FallbackFont)
+    # U+01C4 is in DejaVu Sans but not in DejaVu Sans Mono
+    assert font.runs("a \u01c4 b") == [("a ", 0), ("\u01c4 ", 1), ("b", 0)]
+    assert get_font("DejaVuSansMono.ttf", 20, fallback=["Missing"]) is (
+        font.primary
+    )
+    # The installed fonts of a chain are looked up once per chain and size
+    hits = _fallback_fonts.cache_info().hits
+    get_font("DejaVuSansMono.ttf", 20, fallback=["Missing"])
+    assert _fallback_fonts.cache_info().hits == hits + 1
+
+    page = Page(
+        child=Text(
+            text="a\u01c4b",
+            font="DejaVuSansMono.ttf",
+            font_size=20,
+            fallback=["DejaVu Sans"],
+        )
+    )
+    expected = PILImage.new("RGBA", page.render().size)
+    draw = ImageDraw.Draw(expected)
+    for run, run_font, x, y in font.placed_runs("a\u01c4b"):
+        draw.text((x, y), run, font=run_font, fill=(0, 0, 0, 255))
+    assert page.render().tobytes() == expected.tobytes()
+
+    # Lines after a newline start again at the left
+    assert list(font.placed_runs("aǄb\ncd"))[-1][1:3] == (font.primary, 0)
+    multiline = Text(
+        text="aǄb\ncd", font="DejaVuSansMono.ttf", fallback=["DejaVu Sans"]
+    )
+    single = Text(
+        text="aǄb", font="DejaVuSansMono.ttf", fallback=["DejaVu Sans"]
+    )
+    assert multiline.width == single.width
@@ -0,0 +1,24 @@
+import os
+
+from enana.fonts import FontIndex
+
+
+def test_font_index(tmp_path, dejavu_sans):
+    source = dejavu_sans
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    (fonts / "Custom.ttf").write_bytes(open(source, "rb").read())
+    index = FontIndex.scan([fonts])
+    path = str(fonts / "Custom.ttf")
+    assert index.find("DejaVu Sans") == (path, 0)
+    assert index.find("custom.ttf") == index.find("Arial") == (path, 0)
+    assert index.find("Missing") is None
+
+    cache_file = tmp_path / "fonts.json"
+    index.save(cache_file)
+    loaded = FontIndex.load(cache_file)
+    assert loaded is not None and loaded.names == index.names
+    # Installing a font invalidates the cache
+    (fonts / "Other.ttf").write_bytes(b"")
+    os.utime(fonts, ns=(0, 0))
+    assert FontIndex.load(cache_file) is None
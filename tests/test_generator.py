@@ -0,0 +1,97 @@
+import io
+
+from PIL import Image as PILImage
+
+from enana import (
+    BorderRadius,
+    Column,
+    Container,
+    EncodeOptions,
+    Padding,
+    Page,
+    RenderQuality,
+    RenderStats,
+    Row,
+    Text,
+    encode_image,
+    hex_to_rgba,
+)
+from enana.generator import draw_painters, draw_text, draw_texts
+from enana.painter import TextPainter
+
+
+def test_encode_options(tmp_path, page):
+    opaque = Page(
+        child=Container(width=20, height=10, color=(57, 197, 187, 255))
+    ).render(scale=2)
+    png = PILImage.open(io.BytesIO(encode_image(opaque)))
+    assert png.format == "PNG" and png.mode == "RGB"
+    rgba = encode_image(opaque, EncodeOptions(opaque_rgb=False))
+    assert PILImage.open(io.BytesIO(rgba)).mode == "RGBA"
+    quantized = encode_image(opaque, EncodeOptions(quantize=16))
+    assert PILImage.open(io.BytesIO(quantized)).mode == "P"
+    for format in ("webp", "jpeg"):
+        data = encode_image(opaque, EncodeOptions(format=format))
+        assert PILImage.open(io.BytesIO(data)).format == format.upper()
+    # Transparent pages keep their alpha channel
+    assert page.render().getpixel((0, 0))[3] == 0
+    page.paint(filename=tmp_path / "page.png")
+    assert PILImage.open(tmp_path / "page.png").mode == "RGBA"
+
+
+def test_instancing():
+    def chip():
+        return Container(
+            color=hex_to_rgba(0x3366FFFF),
+            padding=Padding.all(6),
+            border_radius=BorderRadius.all(6),
+            child=Text(
+                text="tag", font_size=14, color=hex_to_rgba(0xFFFFFFFF)
+            ),
+        )
+
+    page = Page(
+        child=Container(
+            color=hex_to_rgba(0xFFFFFFFF),
+            padding=Padding.all(10),
+            child=Column(
+                children=[
+                    Container(
+                        padding=Padding.all(10),
+                        child=Row(children=[chip() for _ in range(4)]),
+                    )
+                    for _ in range(5)
+                ]
+            ),
+        )
+    )
+    painters = page.compile().painters
+    for scale in [1, 1.5, 2]:
+        stats = RenderStats()
+        image = page.render(scale=scale, stats=stats)
+        assert stats.tile_hits > 0
+        # Instanced subtrees are copied only where the pixels match
+        expected = PILImage.new("RGBA", image.size)
+        draw_painters(painters, scale, RenderQuality.FINAL, expected)
+        assert image.tobytes() == expected.tobytes()
+
+
+def test_draw_texts(page):
+    painters = page.compile().painters
+    texts = [p for p in painters if isinstance(p, TextPainter)]
+    assert texts
+    expected = PILImage.new("RGBA", (200, 200))
+    for painter in texts:
+        draw_text(
+            expected,
+            painter.text,
+            (int(painter.offset_x * 2), int(painter.offset_y * 2)),
+            painter.color,
+            painter.font,
+            int(painter.font_size * 2),
+            painter.max_width and int(painter.max_width * 2),
+            lines=painter.lines,
+        )
+    image = PILImage.new("RGBA", (200, 200))
+    draw_texts(image, painters, 2, RenderQuality.FINAL)
+    assert image.tobytes() == expected.tobytes()
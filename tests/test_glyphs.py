@@ -0,0 +1,16 @@
+from PIL import Image as PILImage
+from PIL import ImageDraw, ImageFont
+
+from enana.glyphs import draw_run
+
+
+def test_glyph_cache(dejavu_sans):
+    font = ImageFont.truetype(dejavu_sans, 15)
+    for color in [(255, 255, 255, 255), (200, 30, 60, 128)]:
+        expected = PILImage.new("RGBA", (80, 30), (20, 40, 60, 255))
+        ImageDraw.Draw(expected).text((5, 6), "Lv. 42", font=font, fill=color)
+        # The second run is a cached mask, colored when pasted
+        for _ in range(2):
+            image = PILImage.new("RGBA", (80, 30), (20, 40, 60, 255))
+            draw_run(ImageDraw.Draw(image), (5, 6), "Lv. 42", font, color)
+            assert image.tobytes() == expected.tobytes()
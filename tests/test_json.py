@@ -33,7 +33,7 @@ def test_json():
     # ).paint(scale=10, filename=Path("test.png"))
     Page.from_json(
         {
-            "$schema": "https://raw.githubusercontent.com/Parallel-SEKAI/Enana/refs/heads/main/widget.schema.json",
+            "$schema": "https://raw.githubusercontent.com/Parallel-SEKAI/Enana/refs/heads/main/enana/widget.schema.json",
             "type": "Page",
             "child": {
                 "type": "Container",
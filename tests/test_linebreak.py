@@ -0,0 +1,16 @@
+from enana import Text
+
+
+def test_cjk_line_breaking(dejavu_sans):
+    text = Text(
+        text="这是一个很长的段落，包含「括号」和English words。",
+        font=dejavu_sans,
+        font_size=14,
+        max_width=60,
+    )
+    lines = text._lines
+    assert lines is not None and len(lines) > 2
+    assert "".join(lines).replace(" ", "") == text._text.replace(" ", "")
+    for line in lines:
+        # Kinsoku: no closing punctuation first, no opening bracket last
+        assert line[0] not in "，」。" and line[-1] != "「"
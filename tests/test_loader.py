@@ -0,0 +1,60 @@
+import pytest
+
+from enana import Container, Page
+from enana.loader import register_widget
+
+
+def test_loader():
+    register_widget(
+        "Square",
+        lambda node, child=None: Container(
+            width=node["size"], height=node["size"], child=child
+        ),
+        ("child",),
+    )
+    page = Page.from_json(
+        {
+            "type": "Page",
+            "child": {
+                "type": "Square",
+                "size": 20,
+                "child": {"type": "Text", "text": "a"},
+            },
+        }
+    )
+    assert (page.child.width, page.child.height) == (20, 20)
+    with pytest.raises(ValueError, match="Unknown widget type"):
+        Page.from_json({"type": "Page", "child": {"type": "Circle"}})
+
+    pytest.importorskip("jsonschema")
+    json = {
+        "type": "Page",
+        "child": {
+            "type": "Row",
+            "children": [
+                {"type": "Text", "text": "a"},
+                {"type": "Text", "text": "b", "color": [0, 0]},
+            ],
+        },
+    }
+    with pytest.raises(ValueError, match="/child/children/1/color"):
+        Page.from_json(json, validate=True)
+    json["child"]["children"][1]["color"] = [0, 0, 0, 255]
+    assert isinstance(Page.from_json(json, validate=True), Page)
+
+
+def test_deep_document():
+    depth = 5000
+    json = {"type": "Container", "width": 2, "height": 2}
+    for level in range(depth):
+        if level % 2:
+            json = {"type": "Container", "padding": 1, "child": json}
+        else:
+            json = {"type": "Row", "children": [json]}
+    page = Page.from_json({"type": "Page", "child": json})
+    # Deeper than the recursion limit, laid out without recursion
+    assert page.child.width == page.child.height == 2 + depth
+    painters = page.compile().painters
+    assert len(painters) == depth + 1
+    innermost = max(painters, key=lambda painter: painter.offset_x)
+    assert innermost.offset_x == innermost.offset_y == depth / 2
@@ -0,0 +1,149 @@
+import asyncio
+import io
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from PIL import Image as PILImage
+
+from enana import (
+    BorderRadius,
+    Column,
+    Container,
+    Padding,
+    Page,
+    RenderQuality,
+    RenderStats,
+    Row,
+    Text,
+    hex_to_rgba,
+)
+from enana.generator import draw_painters
+
+
+def test_preview_render(page):
+    final = page.render(scale=3)
+    preview = page.render(scale=3, quality=RenderQuality.PREVIEW)
+    assert preview.size == final.size
+    assert preview.getpixel((15, 15)) == final.getpixel((15, 15))
+    assert page.render(scale=3, quality="preview").size == final.size
+
+
+def test_per_corner_border_radius():
+    color = hex_to_rgba(0x39C5BBFF)
+    img = Page(
+        child=Container(
+            width=40,
+            height=30,
+            color=color,
+            border_radius=BorderRadius(
+                top_left=10, top_right=0, bottom_right=5, bottom_left=0
+            ),
+        )
+    ).render(scale=2)
+    assert img.size == (80, 60)
+    assert img.getpixel((0, 0))[3] == 0
+    assert img.getpixel((79, 0)) == color
+    assert img.getpixel((79, 59))[3] == 0
+    assert img.getpixel((0, 59)) == color
+    assert img.getpixel((40, 30)) == color
+    # Anti-aliased edge pixels are partially covered
+    assert any(0 < img.getpixel((x, 2))[3] < 255 for x in range(20))
+
+
+def test_render_buffer(page):
+    expected = page.render(scale=2)
+    frame = page.render_buffer(scale=2)
+    assert (frame.width, frame.height) == expected.size
+    assert bytes(frame.data) == expected.tobytes()
+
+    view = memoryview(frame)
+    assert view.shape == (frame.height, frame.width, 4)
+    view[0, 0, 3] = 7
+    assert frame.image.getpixel((0, 0))[3] == 7
+
+    pytest.importorskip("numpy")
+    array = frame.to_numpy()
+    array[0, 0, 3] = 9
+    assert frame.data[3] == 9
+
+
+def test_paint_streaming(page):
+    expected = page.render(scale=3)
+    output = io.BytesIO()
+    page.paint_streaming(scale=3, filename=output, strip_height=16)
+    streamed = PILImage.open(io.BytesIO(output.getvalue()))
+    assert streamed.mode == "RGBA"
+    assert streamed.tobytes() == expected.tobytes()
+
+
+def test_render_region(page):
+    full = page.render(scale=2)
+    for box in [(0, 0, 40, 30), (17, 23, 96, 61), (50, 10, 300, 200)]:
+        region = page.render_region(box, scale=2)
+        assert region.tobytes() == full.crop(box).tobytes()
+
+    # The painter index is kept until a widget is updated
+    grid = page._grid
+    page.render_region((0, 0, 40, 30))
+    assert page._grid is grid
+    text = page.child._child._children[1]
+    text.update(text="Changed")
+    assert page._grid is None
+    box = (0, 0, 120, 80)
+    region = page.render_region(box, scale=2)
+    assert region.tobytes() == page.render(scale=2).crop(box).tobytes()
+
+
+def test_incremental_render():
+    texts = [Text(text=f"row {i}", font_size=14) for i in range(10)]
+    page = Page(
+        child=Column(
+            color=hex_to_rgba(0xFFFFFFFF),
+            padding=Padding.all(8),
+            children=[
+                Row(children=[Container(width=12, height=12), text])
+                for text in texts
+            ],
+        )
+    )
+    painters = page.compile().painters
+
+    def full_render(scale):
+        image = PILImage.new("RGBA", page.render(scale=scale).size)
+        draw_painters(painters, scale, RenderQuality.FINAL, image)
+        return image
+
+    for scale in [1, 1.5]:
+        page.render(scale=scale, incremental=True)
+        texts[3].update(text="ok", color=hex_to_rgba(0xFF0000FF))
+        stats = RenderStats()
+        image = page.render(scale=scale, stats=stats)
+        painters = page.compile().painters
+        assert 0 < stats.redrawn < image.width * image.height / 4
+        assert image.tobytes() == full_render(scale).tobytes()
+        texts[3].update(text="row 3", color=hex_to_rgba(0x000000FF))
+    with pytest.raises(TypeError):
+        texts[0].update(child=None)
+
+
+def test_render_keeps_no_frame():
+    page = Page(child=Text(text="a"))
+    page.render()
+    assert page._frame is None
+    page.child.update(text="b")
+    page.render()
+    assert page._frame is not None
+
+
+def test_from_json_async_process_pool():
+    json = {
+        "type": "Page",
+        "child": {"type": "Container", "child": {"type": "Text", "text": "a"}},
+    }
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        page = asyncio.run(Page.from_json_async(json, executor=executor))
+    page.render(incremental=True)
+    page = pickle.loads(pickle.dumps(page))
+    assert page._frame is None
+    assert page.render().tobytes() == Page.from_json(json).render().tobytes()
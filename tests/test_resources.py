@@ -0,0 +1,33 @@
+import io
+
+from PIL import Image as PILImage
+
+from enana import Image, Page
+from enana.resources import register_image, unregister_image
+
+
+def test_in_memory_images():
+    chart = PILImage.new("RGBA", (4, 4), (10, 200, 30, 255))
+    png = io.BytesIO()
+    chart.save(png, "PNG")
+
+    assert Image(image=chart, width=4, height=4)._image is chart
+    from_bytes = Image(image=memoryview(png.getvalue()), width=4, height=4)
+    assert from_bytes._image.tobytes() == chart.tobytes()
+
+    register_image("chart", chart)
+    try:
+        page = Page.from_json(
+            {
+                "type": "Page",
+                "child": {
+                    "type": "Image",
+                    "resource": "chart",
+                    "width": 4,
+                    "height": 4,
+                },
+            }
+        )
+        assert page.render().getpixel((1, 1)) == (10, 200, 30, 255)
+    finally:
+        unregister_image("chart")
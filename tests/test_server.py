@@ -0,0 +1,90 @@
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from PIL import Image as PILImage
+
+from enana.server import RenderServer
+
+DOCUMENT = {
+    "type": "Page",
+    "child": {
+        "type": "Container",
+        "width": 20,
+        "height": 10,
+        "color": [57, 197, 187, 255],
+    },
+}
+
+
+def _post(port, body, query="scale=2"):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/render?{query}", data=body, method="POST"
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.headers, response.read()
+
+
+def test_server():
+    server = RenderServer(("127.0.0.1", 0), workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        body = json.dumps(DOCUMENT).encode()
+        headers, data = _post(port, body)
+        assert headers["Content-Type"] == "image/png"
+        assert headers["X-Cache"] == "miss"
+        img = PILImage.open(io.BytesIO(data)).convert("RGBA")
+        assert img.size == (40, 20)
+        assert img.getpixel((5, 5)) == (57, 197, 187, 255)
+        headers, cached = _post(port, body)
+        assert headers["X-Cache"] == "hit"
+        assert cached == data
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/render?scale=2",
+            data=body,
+            method="POST",
+            headers={"If-None-Match": headers["ETag"]},
+        )
+        try:
+            urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            assert e.code == 304
+        else:
+            raise AssertionError("matching ETag must answer 304")
+        headers, _ = _post(port, body, "scale=1&format=webp")
+        assert headers["Content-Type"] == "image/webp"
+        try:
+            _post(port, b"{not json")
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+        else:
+            raise AssertionError("invalid JSON must be rejected")
+        for query in ["scale=nan", "scale=inf", "scale=0", "scale=1e6"]:
+            try:
+                _post(port, body, query)
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+            else:
+                raise AssertionError(f"{query} must be rejected")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_body_limit():
+    server = RenderServer(("127.0.0.1", 0), workers=1, max_body_bytes=64)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        try:
+            _post(port, json.dumps(DOCUMENT).encode())
+        except urllib.error.HTTPError as e:
+            assert e.code == 413
+        else:
+            raise AssertionError("oversized bodies must be rejected")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,43 @@
+from enana import Page, RenderQuality, Template
+
+
+def test_template():
+    card = {
+        "type": "Page",
+        "child": {
+            "type": "Container",
+            "color": [40, 40, 60, 255],
+            "padding": 8,
+            "border_radius": 6,
+            "child": {
+                "type": "Column",
+                "children": [
+                    {"type": "Text", "text": "Leaderboard"},
+                    {
+                        "type": "Text",
+                        "slot": "name",
+                        "text": "Player",
+                        "max_width": 80,
+                        "color": [255, 255, 255, 255],
+                    },
+                ],
+            },
+        },
+    }
+    template = Template.from_json(card)
+    assert template.slots == ("name",)
+
+    def expected(text):
+        card["child"]["child"]["children"][1]["text"] = text
+        return Page.from_json(card).render(scale=2).tobytes()
+
+    # Same size reuses the base layer, a longer text is laid out again
+    for text in ["Alice", "A much longer player name"]:
+        image = template.render({"name": text}, scale=2)
+        assert image.tobytes() == expected(text)
+
+    # Only the most recently used base layers are kept
+    template = Template.from_json(card, max_layers=1)
+    template.render(scale=1)
+    template.render(scale=2)
+    assert list(template._layers) == [(2, RenderQuality.FINAL)]
@@ -0,0 +1,32 @@
+import pickle
+
+import pytest
+
+from enana import BorderRadius, Margin, Padding, Page
+
+
+def test_interned_values():
+    padding = Padding(top=1, right=2, bottom=3, left=4)
+    assert padding is Padding(top=1, right=2, bottom=3, left=4)
+    assert padding != Margin(top=1, right=2, bottom=3, left=4)
+    assert Padding.zero() is Padding.all(0)
+    assert BorderRadius.all(2.0) is not BorderRadius.all(2)
+    assert pickle.loads(pickle.dumps(padding)) is padding
+    with pytest.raises(AttributeError):
+        padding.top = 0
+    with pytest.raises(AttributeError):
+        padding.extra = 0
+    page = Page.from_json(
+        {
+            "type": "Page",
+            "child": {
+                "type": "Row",
+                "children": [
+                    {"type": "Container", "color": [1, 2, 3, 255]},
+                    {"type": "Container", "color": [1, 2, 3, 255]},
+                ],
+            },
+        }
+    )
+    first, second = page.child._children
+    assert first._color is second._color